@@ -0,0 +1,41 @@
+"""Fork process pool w/ per worker state, shared by batch studies.
+
+Worker state (i.e. the model, or a shared memory result array) is set once
+per process by an init fn, instead of being pickled w/ every task, and
+task fns read it from WORKER. Pools are forked, so init and its args are
+inherited rather than pickled. With one worker, tasks run in this process.
+"""
+
+import multiprocessing as mp
+
+# Worker state, set by _init
+WORKER = {}
+
+
+def _init(init, args: tuple) -> None:
+    WORKER.update(init(*args))
+
+
+def fork_map(fn, tasks: list, n_workers: int, init, args: tuple = ()
+             ) -> list:
+    """fn(task) over tasks, in a fork process pool if n_workers > 1.
+
+    Args:
+        fn: module level fn(task), reads state from WORKER.
+        tasks: list of picklable tasks.
+        n_workers: number of processes, runs in this process if <= 1.
+        init: fn(*args) -> dict of worker state.
+        args: args of init.
+
+    Returns list of fn results, in task order.
+    """
+    n_workers = min(n_workers, len(tasks))
+    if n_workers <= 1:
+        _init(init, args)
+        try:
+            return [fn(task) for task in tasks]
+        finally:
+            WORKER.clear()
+    with mp.get_context('fork').Pool(
+            n_workers, initializer=_init, initargs=(init, args)) as pool:
+        return pool.map(fn, tasks)
@@ -0,0 +1,256 @@
+"""Steady-periodic response of lumped nodes and walls, by harmonics.
+
+A periodic forcing series (i.e. a year of hourly EPW dry bulb, which wraps
+around) is decomposed w/ an FFT into harmonics of angular frequency w. The
+response of a linear, time-invariant node to each harmonic is its transfer
+function H(w) times that harmonic, so the steady-periodic response is:
+
+    T = irfft(H(w) rfft(Te))
+
+at O(nt log nt) per node, w/o stepping through time or a spin-up period.
+This is not a fast path for large batches: the irfft per node alone costs
+more than the O(nt) recurrence of the steppers, i.e. for a year of hourly
+steps, ~5x sim.lumped_node_sim and ~2x wall.wall_sim. It is exact for
+periodic forcing, and skips the spin-up a stepper needs to reach the
+periodic state. Batches are processed in chunks of CHUNK rows, so memory
+beyond the outputs is bounded.
+
+The transfer functions are analytic:
+
+    lumped node:  dT/dt = (Te - T) / beta  ->  H(w) = 1 / (1 + i w beta)
+    wall layer:   transmission (ABCD) matrix of 1-D conduction, relating
+                  temp and heat flux on both faces (Carslaw and Jaeger)
+"""
+
+from numpy.typing import NDArray
+import numpy as np
+
+ndfloat = NDArray[np.float64]
+ndcomplex = NDArray[np.complex128]
+
+# Nodes (or walls) per FFT batch, bounds temporaries to ~CHUNK x nt
+CHUNK = 64
+
+
+def harmonic_freqs(nt: int, dt: float) -> ndfloat:
+    """Angular frequencies [rad/s] of rfft harmonics of nt samples, dt apart.
+    """
+    return 2.0 * np.pi * np.fft.rfftfreq(nt, dt)
+
+
+def periodic_response(tf: ndcomplex, series: ndfloat) -> ndfloat:
+    """Steady-periodic response to series, irfft(tf rfft(series)).
+
+    Args:
+        tf: transfer function of shape G + (nt // 2 + 1,).
+        series: periodic forcing, of shape (nt,) or G + (nt,).
+
+    Returns response of shape G + (nt,).
+    """
+    series = np.asarray(series, dtype=np.float64)
+    return np.fft.irfft(tf * np.fft.rfft(series), n=series.shape[-1])
+
+
+def lumped_node_tf(beta: ndfloat, omega: ndfloat) -> ndcomplex:
+    """Lumped node transfer function, H(w) = 1 / (1 + i w beta).
+
+    |H| is the amplitude decrement, and -arg(H) / w the time lag [s], of
+    node temp to exterior temp at angular frequency w.
+
+    Args:
+        beta: time constant pVC / hA [s], of shape G.
+        omega: (nf,) angular frequencies [rad/s].
+
+    Returns transfer function of shape G + (nf,).
+    """
+    beta = np.asarray(beta, dtype=np.float64)
+    tf = np.empty(beta.shape + np.shape(omega), dtype=np.complex128)
+    tf.real = 1.0
+    np.multiply.outer(beta, omega, out=tf.imag)
+    return np.reciprocal(tf, out=tf)
+
+
+def _rows(series: ndfloat, shape: tuple, nt: int) -> ndfloat:
+    """Series as (1, nt) row shared by all of shape, or (n, nt) rows."""
+    series = np.asarray(series, dtype=np.float64)
+    if series.ndim <= 1:
+        return np.broadcast_to(series, (1, nt))
+    return np.broadcast_to(series, shape + (nt,)).reshape(-1, nt)
+
+
+def _chunk(rows: ndfloat, s: slice) -> ndfloat:
+    """Rows in slice s, or the single shared row."""
+    return rows if len(rows) == 1 else rows[s]
+
+
+def lumped_node_periodic(
+    beta: ndfloat, temp_ext: ndfloat, dt: float, chunk: int = CHUNK
+    ) -> ndfloat:
+    """Steady-periodic lumped node temps driven by periodic exterior temp.
+
+    Usage:
+    .. code-block:: python
+
+        epw = read_epw(epw_fpath)
+        beta = mat.time_constant(mats)      # (N,) [s]
+        temps = lumped_node_periodic(beta, epw['dry_bulb'], 3600.0)
+
+    Args:
+        beta: time constant pVC / hA [s], of shape G.
+        temp_ext: periodic exterior temp series, (nt,) or G + (nt,).
+        dt: timestep of temp_ext [s].
+        chunk: nodes per FFT batch.
+
+    Returns temps of shape G + (nt,).
+    """
+    temp_ext = np.asarray(temp_ext, dtype=np.float64)
+    nt = temp_ext.shape[-1]
+    shape = np.broadcast_shapes(np.shape(beta), temp_ext.shape[:-1])
+    beta = np.broadcast_to(np.asarray(beta, dtype=np.float64), shape).ravel()
+    rows = _rows(temp_ext, shape, nt)
+    omega = harmonic_freqs(nt, dt)
+    out = np.empty((beta.size, nt))
+    for i in range(0, beta.size, chunk):
+        s = slice(i, i + chunk)
+        tf = lumped_node_tf(beta[s], omega)
+        tf *= np.fft.rfft(_chunk(rows, s))
+        out[s] = np.fft.irfft(tf, n=nt)
+    return out.reshape(shape + (nt,))
+
+
+def _layer_props(layers: list) -> list:
+    """(thickness Lc = vol / area, k, rho cp) arrays per layer."""
+    return [tuple(np.asarray(x, dtype=np.float64) for x in (
+        layer.vol / layer.area, layer.k, layer.rho * layer.cp))
+        for layer in layers]
+
+
+def wall_tf(layers: list, omega: ndfloat,
+            h_ext: ndfloat = None, h_int: ndfloat = None) -> tuple:
+    """Transmission matrix of layered wall, air to air, per harmonic.
+
+    Relates exterior air temp and flux to interior air temp and flux (flux
+    positive from exterior to interior):
+
+        [Te, qe] = [[a, b], [c, d]] [Ti, qi]
+
+    For a layer of thickness L, conductivity k, diffusivity alpha, and
+    g = sqrt(i w / alpha):
+
+        [[cosh(gL), sinh(gL) / kg], [kg sinh(gL), cosh(gL)]]
+
+    and a surface film is [[1, 1 / h], [0, 1]]. At w = 0 the wall matrix is
+    [[1, R], [0, 1]] w/ R the total resistance.
+
+    Args:
+        layers: list of Material (or MaterialSet), exterior to interior, w/
+            thickness Lc = vol / area. Fields broadcast to walls of shape G.
+        omega: (nf,) angular frequencies [rad/s].
+        h_ext: exterior film coef [W/m2-K], defaults to layers[0].hc.
+        h_int: interior film coef [W/m2-K], defaults to layers[-1].hc.
+
+    Returns tuple of (a, b, c, d), each of shape G + (nf,).
+    """
+    h_ext = layers[0].hc if h_ext is None else h_ext
+    h_int = layers[-1].hc if h_int is None else h_int
+    return _wall_tf(_layer_props(layers), np.asarray(omega, dtype=np.float64),
+                    h_ext, h_int)
+
+
+def _wall_tf(props: list, omega: ndfloat, h_ext: ndfloat,
+             h_int: ndfloat) -> tuple:
+    """wall_tf of (thickness, k, rho cp) per layer, see _layer_props."""
+
+    def film(h):
+        h = np.asarray(h, dtype=np.float64)[..., None]
+        one = np.ones_like(h)
+        return one, 1.0 / h, 0.0 * one, one
+
+    m = film(h_ext)
+    for thick, k, heat_cap in props:
+        thick, k = thick[..., None], k[..., None]
+        # gL = (1 + i) u, so cosh and sinh of gL are real fns of u
+        u = np.sqrt(0.5 * omega * heat_cap[..., None] / k) * thick
+        ch, sh, cos, sin = np.cosh(u), np.sinh(u), np.cos(u), np.sin(u)
+        cosh = ch * cos + 1j * (sh * sin)
+        sc, cs = sh * cos, ch * sin
+        # sinh(gL) / gL, w/ limit 1 at u = 0, and gL sinh(gL)
+        u2 = np.divide(0.5, u, out=np.zeros_like(u), where=u != 0)
+        sinhc = np.where(u != 0, (sc + cs) * u2 + 1j * ((cs - sc) * u2), 1.0)
+        xsinh = u * (sc - cs) + 1j * (u * (sc + cs))
+        m = _matmul(m, (cosh, thick / k * sinhc, k / thick * xsinh, cosh))
+    return _matmul(m, film(h_int))
+
+
+def _matmul(m0: tuple, m1: tuple) -> tuple:
+    """Product of 2x2 matrices given as (a, b, c, d) arrays."""
+    a0, b0, c0, d0 = m0
+    a1, b1, c1, d1 = m1
+    return (a0 * a1 + b0 * c1, a0 * b1 + b0 * d1,
+            c0 * a1 + d0 * c1, c0 * b1 + d0 * d1)
+
+
+def wall_periodic(
+    layers: list, temp_ext: ndfloat, temp_int: ndfloat, dt: float,
+    h_ext: ndfloat = None, h_int: ndfloat = None, chunk: int = CHUNK
+    ) -> tuple:
+    """Steady-periodic layered wall response to periodic air temps.
+
+    Exact in space (no cells), so the frequency domain counterpart of
+    wall.wall_sim once it has spun up, w/ the same outputs.
+
+    Usage:
+    .. code-block:: python
+
+        epw = read_epw(epw_fpath)
+        ts_ext, ts_int, q_int = wall_periodic(
+            [brick, insul, gypsum], epw['dry_bulb'], 21.0, 3600.0)
+
+    Args:
+        layers: list of Material (or MaterialSet), exterior to interior,
+            see wall_tf. Fields broadcast to walls of shape G.
+        temp_ext: periodic exterior air temp, (nt,) or G + (nt,).
+        temp_int: interior air temp, scalar, (nt,) or G + (nt,).
+        dt: timestep of temp series [s].
+        h_ext, h_int: exterior and interior film coefs [W/m2-K].
+        chunk: walls per FFT batch.
+
+    Returns tuple of exterior surface temp, interior surface temp, and heat
+        flux into interior air [W/m2], each of shape G + (nt,).
+    """
+    h_ext = layers[0].hc if h_ext is None else h_ext
+    h_int = layers[-1].hc if h_int is None else h_int
+    temp_ext = np.asarray(temp_ext, dtype=np.float64)
+    nt = temp_ext.shape[-1]
+    props = _layer_props(layers)
+    shape = np.broadcast_shapes(
+        *(np.shape(x) for p in props for x in p), np.shape(h_ext),
+        np.shape(h_int), temp_ext.shape[:-1], np.shape(temp_int)[:-1])
+    props = [tuple(np.broadcast_to(x, shape).ravel() for x in p)
+             for p in props]
+    h_ext, h_int = (np.broadcast_to(np.asarray(h, dtype=np.float64),
+                                    shape).ravel() for h in (h_ext, h_int))
+    ext_rows = _rows(temp_ext, shape, nt)
+    int_rows = _rows(np.broadcast_to(temp_int, np.shape(temp_int)[:-1]
+                                     + (nt,)), shape, nt)
+    omega = harmonic_freqs(nt, dt)
+
+    n = h_ext.size
+    ts_ext, ts_int, q_int = (np.empty((n, nt)) for _ in range(3))
+    for i in range(0, n, chunk):
+        s = slice(i, i + chunk)
+        a, b, c, d = _wall_tf([tuple(x[s] for x in p) for p in props],
+                              omega, h_ext[s], h_int[s])
+        te, ti = (np.fft.rfft(_chunk(x, s)) for x in (ext_rows, int_rows))
+        # qi = (te - a ti) / b, and qe = c ti + d qi, in place
+        a *= ti
+        np.subtract(te, a, out=a)
+        a /= b
+        c *= ti
+        d *= a
+        c += d
+        q_int[s] = np.fft.irfft(a, n=nt)
+        q_ext = np.fft.irfft(c, n=nt)
+        ts_ext[s] = _chunk(ext_rows, s) - q_ext / h_ext[s, None]
+        ts_int[s] = _chunk(int_rows, s) + q_int[s] / h_int[s, None]
+    return tuple(x.reshape(shape + (nt,)) for x in (ts_ext, ts_int, q_int))
@@ -40,8 +40,66 @@ def lumped_node(bi: ndfloat, fo: ndfloat) -> ndfloat:
     Returns dimensionless temp, theta = (T - T_ext) / (T0 - T_ext) [-]
     """
     # T =  (theta * (T0 - T_ext)) + T_ext)
-    if bi >= 0.1:
+    if np.any(bi >= 0.1):
         print("Warning: Biot must be <= 0.1 for lumped node assumption, "
-              f"but got Biot of `{bi}`")
+              f"but got Biot of `{np.max(bi)}`")
 
     return np.exp(-1 * bi * fo)
+
+
+def lumped_node_valid(bi: ndfloat, bi_max: float = 0.1) -> NDArray[np.bool_]:
+    """Boolean mask of where lumped node assumption holds (Bi < bi_max)."""
+    return np.asarray(bi) < bi_max
+
+
+def lumped_node_batch(mat, nt: ndfloat, bi_max: float = 0.1) -> tuple:
+    """Dimensionless lumped node eqn over broadcastable material grid.
+
+    Vectorized form of lumped_node for sweeps over material and geometry
+    params. The fields of mat (hc, area, vol, k, rho, cp) are broadcast
+    together into a grid of shape G, and evaluated against the time vector
+    nt in one pass:
+        Bi Fo(t) = (h-Lc / k) (alpha-t / Lc2) = t / beta
+        theta[G, t] = exp(-t / beta)
+
+    Usage:
+    .. code-block:: python
+
+        # V-A meshgrid, w/ Lc = V / A
+        vol, area = np.meshgrid(vols, areas, indexing='ij')
+        mats = mat.Material(hc=hc, area=area, vol=vol, k=k, rho=rho, cp=cp)
+        theta, valid = lumped_node_batch(mats, nt)
+        temps = theta_to_temp(theta, T0[..., None], T_ext)
+
+    Args:
+        mat: Material (or any object w/ same fields) of broadcastable arrays.
+        nt: 1D elapsed time vector [s].
+        bi_max: Biot number upper bound for lumped node validity.
+
+    Returns tuple of dimensionless temp, theta, of shape G + nt.shape, and
+        validity mask of shape G.
+    """
+    hc, area, vol, k, rho, cp = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in
+          (mat.hc, mat.area, mat.vol, mat.k, mat.rho, mat.cp)))
+    char_len = vol / area
+    bi = (hc * char_len) / k
+    beta_inv = hc / (rho * cp * char_len)  # 1/beta = hA / pVC [1/s]
+    nt = np.asarray(nt, dtype=np.float64)
+
+    theta = np.multiply.outer(beta_inv, -1.0 * nt)
+    np.exp(theta, out=theta)
+    return theta, lumped_node_valid(bi, bi_max)
+
+
+def theta_to_temp(theta: ndfloat, temp_0: ndfloat, temp_ext: ndfloat) -> ndfloat:
+    """Dimensionless temp to temp, T = theta (T0 - T_ext) + T_ext.
+
+    Args:
+        theta: dimensionless temp [-]
+        temp_0: initial temp, broadcastable w/ theta [C or K]
+        temp_ext: exterior temp, broadcastable w/ theta [C or K]
+
+    Returns temp in units of temp_0.
+    """
+    return (theta * (temp_0 - temp_ext)) + temp_ext
@@ -0,0 +1,180 @@
+"""Natural ventilation w/ thermal mass, nondimensional model from Holford.
+
+Holford and Woods (2007) model a naturally ventilated zone (air) coupled
+to a thin thermal mass, driven by a periodic exterior temp. In
+dimensionless temp theta and time phi = t / tau (forcing period):
+
+    eps d(theta_z)/d(phi) = 1/chi (theta_m - theta_z)
+                            + eps Rn g(theta_e - theta_z)
+        d(theta_m)/d(phi) = 1/chi (theta_z - theta_m)
+
+where g(x) = x |x|^0.5 is the buoyancy driven ventilation flux, and:
+    chi: ratio of convection to forcing time scale (material.time_scale_chi)
+    eps: ratio of air to mass heat capacity (material.time_scale_epsilon)
+    Rn: ratio of forcing to ventilation flushing time (material.time_scale_Rn)
+
+Small eps makes the zone eqn stiff, and g is not smooth at zero, so the
+system is integrated w/ an implicit, L-stable scheme (see holford_sim).
+"""
+
+from numpy.typing import NDArray
+import numpy as np
+
+ndfloat = NDArray[np.float64]
+
+# TR-BDF2 as ESDIRK (Hosea and Shampine, 1996): TR stage to t + GAMMA h,
+# then BDF2 stage to t + h. Both implicit stages have diagonal coef D.
+GAMMA = 2.0 - np.sqrt(2.0)
+D = GAMMA / 2.0
+W = np.sqrt(2.0) / 4.0
+# Weights of 2nd order solution (b = [W, W, D]) minus embedded 3rd order
+ERR_WEIGHTS = (W - (1.0 - W) / 3.0, W - (3.0 * W + 1.0) / 3.0, D - D / 3.0)
+
+
+def vent_flux(dtheta: ndfloat) -> ndfloat:
+    """Ventilation heat flux g(x) = x |x|^0.5."""
+    return dtheta * np.sqrt(np.abs(dtheta))
+
+
+def sinusoid(phi: ndfloat) -> ndfloat:
+    """Unit sinusoid exterior temp, theta_e = sin(2 pi phi)."""
+    return np.sin(2.0 * np.pi * phi)
+
+
+def holford_rhs(theta_z: ndfloat, theta_m: ndfloat, theta_e: ndfloat,
+                chi: ndfloat, eps: ndfloat, rn: ndfloat) -> tuple:
+    """Time derivatives (d(theta_z)/d(phi), d(theta_m)/d(phi))."""
+    exch = (theta_m - theta_z) / chi
+    return exch / eps + rn * vent_flux(theta_e - theta_z), -exch
+
+
+def _stage(c_z, c_m, z, theta_e, a, chi, eps, rn, tol, n_iter):
+    """Solve implicit stage Y = c + a f(Y) for zone and mass temps.
+
+    The mass eqn is linear, so Y_m = (c_m + p Y_z) / (1 + p), p = a / chi,
+    which leaves a scalar eqn in Y_z that is monotone increasing, solved w/
+    Newton from initial guess z.
+    """
+    p = a / chi
+    q = a / (chi * eps * (1.0 + p))
+    ar = a * rn
+    for _ in range(n_iter):
+        dtheta = theta_e - z
+        root = np.sqrt(np.abs(dtheta))
+        res = z - c_z - q * (c_m - z) - ar * dtheta * root
+        dz = res / (1.0 + q + 1.5 * ar * root)
+        z = z - dz
+        if np.max(np.abs(dz)) < tol:
+            break
+    return z, (c_m + p * z) / (1.0 + p)
+
+
+def holford_sim(
+    chi: ndfloat, eps: ndfloat, rn: ndfloat, phi: ndfloat,
+    theta_e=sinusoid, theta_z0: ndfloat = 0.0, theta_m0: ndfloat = 0.0,
+    rtol: float = 1e-4, atol: float = 1e-6, h0: float = 1e-3,
+    max_steps: int = 100_000
+    ) -> tuple:
+    """Integrate Holford zone/mass temps for a batch of parameter sets.
+
+    Uses TR-BDF2, a 2nd order, L-stable implicit Runge-Kutta w/ an embedded
+    3rd order error estimate, so each parameter set takes its own adaptive
+    steps: large where the response is smooth, small where the zone is
+    stiff (small eps, large Rn) or theta_e - theta_z crosses zero. All sets
+    are stepped together as arrays, and sets are dropped from the active
+    batch once they reach the last output time.
+
+    Usage:
+    .. code-block:: python
+
+        chi, eps, rn = np.meshgrid(chis, epss, rns, indexing='ij')
+        phi = np.linspace(0, 3, 301)     # 3 forcing periods
+        theta_z, theta_m = holford_sim(chi, eps, rn, phi)  # G + (301,)
+
+    Args:
+        chi, eps, rn: broadcastable dimensionless params, of shape G.
+        phi: (M,) increasing output times [-], starting at initial time.
+        theta_e: fn(phi) -> exterior theta, vectorized over (n,) times.
+        theta_z0, theta_m0: initial zone and mass temps, broadcastable to G.
+        rtol, atol: relative and absolute local error tolerance.
+        h0: initial step.
+        max_steps: max number of batch steps, raises RuntimeError after.
+
+    Returns tuple of (theta_z, theta_m), each of shape G + (M,).
+    """
+    phi = np.asarray(phi, dtype=np.float64)
+    shape = np.broadcast_shapes(*(np.shape(x) for x in (
+        chi, eps, rn, theta_z0, theta_m0)))
+    chi, eps, rn, z, m = (np.broadcast_to(x, shape).astype(np.float64).ravel()
+                          for x in (chi, eps, rn, theta_z0, theta_m0))
+    n, n_out = chi.size, phi.size
+    out_z, out_m = np.empty((n, n_out)), np.empty((n, n_out))
+    out_z[:, 0], out_m[:, 0] = z, m
+    # State of active sets only, compacted as sets finish
+    idx = np.arange(n)
+    t = np.full(n, phi[0])
+    h = np.full(n, h0)
+    k = np.ones(n, dtype=np.intp)  # next output index
+    # Newton tolerance, well below the step error tolerance
+    tol = 1e-2 * atol
+    e1, e2, e3 = ERR_WEIGHTS
+
+    for _ in range(max_steps):
+        live = k < n_out
+        if not live.any():
+            break
+        # Finished sets not yet compacted take dummy steps, never accepted
+        gap = np.where(live, phi[np.minimum(k, n_out - 1)] - t, np.inf)
+        hit = h >= gap
+        hs = np.where(hit, gap, h)
+        a = D * hs
+
+        # Explicit 1st stage, TR stage to t + gamma h, BDF2 stage to t + h
+        te3 = theta_e(t + hs)
+        k1_z, k1_m = holford_rhs(z, m, theta_e(t), chi, eps, rn)
+        c_z, c_m = z + a * k1_z, m + a * k1_m
+        y2_z, y2_m = _stage(c_z, c_m, z + 2.0 * a * k1_z, theta_e(t + 2.0 * a),
+                            a, chi, eps, rn, tol, 20)
+        k2_z, k2_m = (y2_z - c_z) / a, (y2_m - c_m) / a
+        c_z = z + W * hs * (k1_z + k2_z)
+        c_m = m + W * hs * (k1_m + k2_m)
+        y3_z, y3_m = _stage(c_z, c_m, y2_z + (hs - 2.0 * a) * k2_z, te3,
+                            a, chi, eps, rn, tol, 20)
+        k3_z, k3_m = (y3_z - c_z) / a, (y3_m - c_m) / a
+
+        # Error estimate, filtered by (I - a J)^-1 so stiff components
+        # don't force tiny steps (Shampine)
+        est_z = hs * (e1 * k1_z + e2 * k2_z + e3 * k3_z)
+        est_m = hs * (e1 * k1_m + e2 * k2_m + e3 * k3_m)
+        j12 = a / (chi * eps)
+        j11 = 1.0 + j12 + 1.5 * a * rn * np.sqrt(np.abs(te3 - y3_z))
+        j21 = a / chi
+        j22 = 1.0 + j21
+        det = j11 * j22 - j12 * j21
+        err_z = (j22 * est_z + j12 * est_m) / det
+        err_m = (j21 * est_z + j11 * est_m) / det
+        scale_z = atol + rtol * np.maximum(np.abs(z), np.abs(y3_z))
+        scale_m = atol + rtol * np.maximum(np.abs(m), np.abs(y3_m))
+        err = np.maximum(np.abs(err_z) / scale_z, np.abs(err_m) / scale_m)
+        ok = (err <= 1.0) & live
+        with np.errstate(divide='ignore'):
+            fac = np.clip(0.9 * err ** (-1.0 / 3.0), 0.2, 5.0)
+        # Don't shrink step after it was clipped to hit an output time
+        h = np.where(ok & hit, np.maximum(h, hs * fac), hs * fac)
+
+        t = np.where(ok, np.where(hit, t + gap, t + hs), t)
+        z = np.where(ok, y3_z, z)
+        m = np.where(ok, y3_m, m)
+        rec = np.flatnonzero(ok & hit)
+        out_z[idx[rec], k[rec]], out_m[idx[rec], k[rec]] = z[rec], m[rec]
+        k[rec] += 1
+        if rec.size and np.count_nonzero(k >= n_out) > idx.size // 8:
+            keep = k < n_out
+            idx, t, h, k, z, m, chi, eps, rn = (
+                x[keep] for x in (idx, t, h, k, z, m, chi, eps, rn))
+    else:
+        raise RuntimeError(f"holford_sim exceeded {max_steps} steps, "
+                           f"{np.count_nonzero(k < n_out)} parameter sets "
+                           f"unfinished.")
+
+    return out_z.reshape(shape + (n_out,)), out_m.reshape(shape + (n_out,))
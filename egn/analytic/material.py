@@ -36,8 +36,125 @@ class Material:
     cp: np.float64
 
 
+MATERIAL_FIELDS = ('hc', 'area', 'vol', 'k', 'rho', 'cp')
+
+
+class MaterialSet:
+    """Columnar (struct-of-arrays) set of Material rows.
+
+    Fields are stored as rows of a single contiguous (6, N) float64 array,
+    so each field is a contiguous view, and slicing returns a MaterialSet
+    view of the same memory (no copy). Rows can optionally be named for
+    lookup.
+
+    Usage:
+    .. code-block:: python
+
+        mats = MaterialSet(hc=hc, area=area, vol=vol, k=k, rho=rho, cp=cp,
+                           names=names)
+        brick = mats['brick']           # Material of np.float64
+        sub = mats[100:200]             # MaterialSet view, zero-copy
+        bi = biot_num(sub)              # (100,) array aligned w/ rows
+
+    Args:
+        hc, area, vol, k, rho, cp: broadcastable arrays, see Material.
+            Rows are the broadcast shape flattened in C order.
+        names: optional sequence of unique row names.
+    """
+    __slots__ = ('_data', '_names', '_index')
+
+    def __init__(self, hc, area, vol, k, rho, cp, names=None):
+        # Broadcast (i.e. np.ix_ grids) before flattening to rows
+        cols = np.broadcast_arrays(
+            *(np.asarray(x, dtype=np.float64)
+              for x in (hc, area, vol, k, rho, cp)))
+        self._data = np.stack([c.ravel() for c in cols])
+        self._names = None if names is None else np.asarray(names, dtype=object)
+        self._index = None
+        if self._names is not None:
+            assert len(self._names) == self._data.shape[1], \
+                f"Expected {self._data.shape[1]} names, got {len(self._names)}"
+
+    @classmethod
+    def _view(cls, data, names):
+        """Wrap existing (6, N) data w/o copying."""
+        obj = cls.__new__(cls)
+        obj._data, obj._names, obj._index = data, names, None
+        return obj
+
+    @classmethod
+    def from_materials(cls, materials, names=None):
+        """Build from iterable of Material."""
+        materials = list(materials)
+        cols = {f: [np.float64(np.ravel(getattr(m, f))[0]) for m in materials]
+                for f in MATERIAL_FIELDS}
+        return cls(**cols, names=names)
+
+    def __len__(self):
+        return self._data.shape[1]
+
+    def __repr__(self):
+        return f"MaterialSet(n={len(self)})"
+
+    def __getitem__(self, key):
+        """Named or int row lookup as Material, else MaterialSet rows.
+
+        Slices return views, index arrays and boolean masks return copies.
+        """
+        if isinstance(key, str):
+            key = self.index(key)
+        if isinstance(key, (int, np.integer)):
+            return Material(*(np.float64(x) for x in self._data[:, key]))
+        names = None if self._names is None else self._names[key]
+        return MaterialSet._view(self._data[:, key], names)
+
+    @property
+    def names(self):
+        return self._names
+
+    def index(self, name:str) -> int:
+        """Row index of named material."""
+        assert self._names is not None, "MaterialSet has no names."
+        if self._index is None:
+            self._index = {n: i for i, n in enumerate(self._names)}
+        return self._index[name]
+
+    def to_material(self) -> Material:
+        """Material w/ (N,) array fields (views)."""
+        return Material(*self._data)
+
+    @property
+    def hc(self):
+        return self._data[0]
+
+    @property
+    def area(self):
+        return self._data[1]
+
+    @property
+    def vol(self):
+        return self._data[2]
+
+    @property
+    def k(self):
+        return self._data[3]
+
+    @property
+    def rho(self):
+        return self._data[4]
+
+    @property
+    def cp(self):
+        return self._data[5]
+
+    @property
+    def char_len(self):
+        """Characteristic length, Lc = V / A [m]."""
+        return self.vol / self.area
+
+
 def diffusivity_coef(
-    k:np.float64, rho:np.float64, c_p:np.float64
+    k:np.float64, rho:np.float64=None, c_p:np.float64=None
     ) -> np.float64:
     """diffusivity coefficient alpha = k / rho-c [m2/s].
 
@@ -46,16 +163,18 @@ def diffusivity_coef(
         = m2/s
 
     args:
-        k: conductivity [w/m-k]
+        k: conductivity [w/m-k], or MaterialSet
         rho: density [kg/m3]
         c_p: specific heat capacity at constant pressure [j/kg-k]
 
     returns diffusivity coefficient [m2/s].
     """
+    if isinstance(k, MaterialSet):
+        k, rho, c_p = k.k, k.rho, k.cp
     return k / (rho * c_p)
 
 
-def time_constant(rho, vol, cp, hc, area):
+def time_constant(rho, vol=None, cp=None, hc=None, area=None):
     """Time constant (beta) for lumped node = pVC / hA [s].
 
     The reciprocal the time constant (beta) is the constant
@@ -75,14 +194,18 @@ def time_constant(rho, vol, cp, hc, area):
         rho: float   # [kg/m3] density
         cp: float    # [J/kg-K] specific heat capacity at constant pressure
 
+    If rho is a MaterialSet, the remaining args are taken from it.
+
     Returns time constant.
     """
+    if isinstance(rho, MaterialSet):
+        rho, vol, cp, hc, area = rho.rho, rho.vol, rho.cp, rho.hc, rho.area
     return (rho * vol * cp) / (hc * area)
 
 
 
 def fourier_num(
-    alpha:np.float64, char_len:np.float64, nt:np.float64
+    alpha:np.float64, char_len:np.float64=None, nt:np.float64=None
     ) -> np.float64:
     """Dimensionless fourier number (alpha-dt / L2) [-].
 
@@ -96,13 +219,25 @@ def fourier_num(
         char_len: characteristic length [m]
         nt: elapsed time [s]
 
+    If alpha is a MaterialSet, pass nt by keyword (char_len is taken from
+    it, so a positional nt raises TypeError); the result has shape (N,) +
+    nt.shape, aligned w/ the rows.
+
     Returns Fourier coefficient.
     """
+    if isinstance(alpha, MaterialSet):
+        if char_len is not None:
+            raise TypeError(
+                'fourier_num(MaterialSet, ...) takes nt by keyword, char_len '
+                'is taken from the MaterialSet.')
+        char_len = alpha.char_len
+        alpha = diffusivity_coef(alpha)
+        return np.multiply.outer(alpha / (char_len * char_len), nt)
     return (alpha * nt) / (char_len * char_len)
 
 
 def biot_num(
-    h_c:np.float64, char_len:np.float64, k:np.float64
+    h_c:np.float64, char_len:np.float64=None, k:np.float64=None
     ) -> np.float64:
     """Dimensionless Biot number (h-Lc / k) [-].
 
@@ -126,11 +261,15 @@ def biot_num(
         char_len: Characteristic length [m]
         k: Conductivity [W/m-K]
 
+    If h_c is a MaterialSet, Lc = V / A and k are taken from it.
+
     Returns Biot coefficient.
     """
-    assert h_c >- 1e-10  # not adiabatic
-    assert char_len >= 1e-10  # must have thickness
-    assert k >= 1e-10  # must have Conductivity
+    if isinstance(h_c, MaterialSet):
+        h_c, char_len, k = h_c.hc, h_c.char_len, h_c.k
+    assert np.all(h_c > -1e-10)  # not adiabatic
+    assert np.all(char_len >= 1e-10)  # must have thickness
+    assert np.all(k >= 1e-10)  # must have Conductivity
 
     return (h_c * char_len) / k
 
@@ -140,7 +279,6 @@ def tau(delta_time:np.float64, t:np.float64)->np.float64:
     return t / delta_time
 
 
-@staticmethod
 def time_scale_nu(tau, Fo):
     """Time scale 2η^2, ratio of mass diffusion to forcing time scale.
 
@@ -159,7 +297,7 @@ def time_scale_chi(tau, Fo, Bi):
     to thermal mass before environmental temperature changes (forcing).
     """
 
-    return tau / Fo-Bi
+    return tau / (Fo * Bi)
 
 
 def time_scale_Rn(area_vent, beta, neutral_height, delta_temp):
@@ -179,6 +317,6 @@ def time_scale_epsilon(vol_z, rho_z, c_pz, area_m, char_len_m, rho_m, c_m):
     = kg_z-C_z / kg_m-C_m = K / K
 
     """
-    return (vol_z, rho_z, c_pz) / (area_m * char_len_m * rho_m * c_m)
+    return (vol_z * rho_z * c_pz) / (area_m * char_len_m * rho_m * c_m)
 
 
@@ -0,0 +1,211 @@
+"""Global sensitivity of lumped node response to Material params.
+
+Sample matrices are built as (n, d) arrays over the param bounds, and the
+model is evaluated on whole chunks of rows at once, so a study of 10^6
+model evaluations is a few hundred vectorized calls. Chunks are
+independent (each draws from its own spawned seed), so they can be fanned
+out over a process pool, and only small sums are returned per chunk.
+
+    Sobol: first order S_i and total order ST_i variance indices, from
+        Saltelli matrices A, B and AB_i (A w/ column i from B), w/ the
+        Saltelli (2010) and Jansen estimators, n (d + 2) evaluations.
+    Morris: mean |elementary effect| mu*, mean mu and std sigma, from r
+        one-at-a-time trajectories, r (d + 1) evaluations.
+"""
+
+from numpy.typing import NDArray
+import numpy as np
+import material as mat
+import heat
+from forkpool import WORKER, fork_map
+
+ndfloat = NDArray[np.float64]
+
+
+def lumped_node_theta(params: dict, t: float = 3600.0) -> ndfloat:
+    """Lumped node dimensionless temp theta at time t, of params rows.
+
+    Evaluated w/o a validity check per call, see lumped_node_valid_frac to
+    check the bounds once.
+
+    Args:
+        params: dict of Material field name to (n,) arrays.
+        t: elapsed time [s].
+
+    Returns (n,) theta.
+    """
+    theta, _ = heat.lumped_node_batch(mat.Material(**params), [t])
+    return theta[..., 0]
+
+
+def lumped_node_valid_frac(bounds: dict, n: int = 10_000, seed=None,
+                           bi_max: float = 0.1) -> float:
+    """Fraction of uniform samples in bounds where lumped node is valid.
+
+    Args:
+        bounds: dict of Material field name to (lo, hi).
+        n: number of samples.
+        seed: seed or np.random.SeedSequence.
+        bi_max: Biot number upper bound, see heat.lumped_node_valid.
+
+    Returns fraction in [0, 1].
+    """
+    p = scale(np.random.default_rng(seed).random((n, len(bounds))), bounds)
+    bi = mat.biot_num(p['hc'], p['vol'] / p['area'], p['k'])
+    return float(heat.lumped_node_valid(bi, bi_max).mean())
+
+
+def scale(unit: ndfloat, bounds: dict) -> dict:
+    """Unit cube samples (..., d) to dict of param arrays within bounds."""
+    return {name: lo + (hi - lo) * unit[..., i]
+            for i, (name, (lo, hi)) in enumerate(bounds.items())}
+
+
+def saltelli_matrices(n: int, d: int, seed=None) -> tuple:
+    """Saltelli sample matrices in unit cube.
+
+    Args:
+        n: number of base samples.
+        d: number of params.
+        seed: seed or np.random.SeedSequence.
+
+    Returns tuple of A, B (n, d), and AB (d, n, d), where AB[i] is A w/
+        column i from B.
+    """
+    rng = np.random.default_rng(seed)
+    a, b = rng.random((n, d)), rng.random((n, d))
+    ab = np.repeat(a[None], d, axis=0)
+    i = np.arange(d)
+    ab[i, :, i] = b[:, i].T
+    return a, b, ab
+
+
+def morris_trajectories(r: int, d: int, levels: int = 4, seed=None
+                        ) -> ndfloat:
+    """Morris one-at-a-time trajectories in unit cube.
+
+    Each trajectory starts at a random grid point of levels values per
+    param, and moves one param at a time, in random order and direction,
+    by delta = levels / (2 (levels - 1)).
+
+    Args:
+        r: number of trajectories.
+        d: number of params.
+        levels: number of grid levels (even).
+        seed: seed or np.random.SeedSequence.
+
+    Returns (r, d + 1, d) trajectories.
+    """
+    rng = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+    # Strictly lower triangular steps, w/ random direction per param
+    steps = np.tril(np.ones((d + 1, d)), -1)
+    sign = rng.choice([-1.0, 1.0], size=(r, 1, d))
+    moves = 0.5 * delta * ((2.0 * steps - 1.0) * sign + 1.0)
+    base = rng.integers(0, levels // 2, size=(r, 1, d)) / (levels - 1.0)
+    # Random param order per trajectory
+    order = np.argsort(rng.random((r, d)), axis=1)
+    moves = np.take_along_axis(moves, order[:, None, :], axis=2)
+    return base + moves
+
+
+def _init(model, bounds: dict) -> dict:
+    return {'model': model, 'bounds': bounds}
+
+
+def _sobol_chunk(task: tuple) -> ndfloat:
+    n, seed = task
+    model, bounds = WORKER['model'], WORKER['bounds']
+    d = len(bounds)
+    a, b, ab = saltelli_matrices(n, d, seed)
+    f_a, f_b = model(scale(a, bounds)), model(scale(b, bounds))
+    f_ab = model(scale(ab.reshape(d * n, d), bounds)).reshape(d, n)
+    f = np.concatenate([f_a, f_b])
+    mean = f.mean()
+    # Count, mean and centered sum of squares of f, and S_i, ST_i numerator
+    # sums. f_b is centered too (E[f_ab - f_a] = 0), so the sums don't lose
+    # precision when the mean of f is large relative to its spread.
+    return np.concatenate([
+        [f.size, mean, ((f - mean) ** 2).sum()],
+        ((f_b - mean) * (f_ab - f_a)).sum(axis=1),
+        ((f_a - f_ab) ** 2).sum(axis=1)])
+
+
+def sobol_indices(model, bounds: dict, n: int, chunk: int = 10_000,
+                  seed=None, n_workers: int = 0) -> tuple:
+    """First and total order Sobol indices of model over uniform bounds.
+
+    Usage:
+    .. code-block:: python
+
+        bounds = {'hc': (5, 25), 'area': (0.5, 2.0), 'vol': (1e-3, 1e-2),
+                  'k': (10, 50), 'rho': (2000, 9000), 'cp': (200, 1000)}
+        model = functools.partial(lumped_node_theta, t=600.0)
+        if lumped_node_valid_frac(bounds) < 1.0:
+            print('Warning: Bi >= 0.1 for some params in bounds.')
+        s1, st = sobol_indices(model, bounds, n=100_000)  # 8e5 evals
+
+    Args:
+        model: fn(params dict of (m,) arrays) -> (m,) outputs.
+        bounds: dict of param name to (lo, hi).
+        n: number of base samples, model is evaluated n (d + 2) times.
+        chunk: base samples per chunk.
+        seed: seed of spawned per chunk seeds.
+        n_workers: number of processes, runs in this process if <= 1.
+
+    Returns tuple of first order S_i and total order ST_i, each (d,)
+        aligned w/ bounds.
+    """
+    d = len(bounds)
+    sizes = [min(chunk, n - i) for i in range(0, n, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    parts = np.array(fork_map(_sobol_chunk, list(zip(sizes, seeds)),
+                              n_workers, _init, (model, bounds)))
+    # Variance of f from per chunk centered moments (Chan et al.)
+    count, means, m2 = parts[:, 0], parts[:, 1], parts[:, 2]
+    mean = (count * means).sum() / count.sum()
+    var = (m2.sum() + (count * (means - mean) ** 2).sum()) / count.sum()
+    sums = parts[:, 3:].sum(axis=0)
+    s1 = sums[:d] / n / var
+    st = 0.5 * sums[d:] / n / var
+    return s1, st
+
+
+def _morris_chunk(task: tuple) -> ndfloat:
+    r, d, levels, seed = task
+    model, bounds = WORKER['model'], WORKER['bounds']
+    x = morris_trajectories(r, d, levels, seed)
+    f = model(scale(x.reshape(r * (d + 1), d), bounds)).reshape(r, d + 1)
+    # Param moved at each step, and elementary effect in unit cube
+    dx = np.diff(x, axis=1)
+    moved = np.argmax(np.abs(dx), axis=2)
+    step = np.take_along_axis(dx, moved[..., None], axis=2)[..., 0]
+    ee = np.empty((r, d))
+    np.put_along_axis(ee, moved, np.diff(f, axis=1) / step, axis=1)
+    return ee
+
+
+def morris_effects(model, bounds: dict, r: int, levels: int = 4,
+                   chunk: int = 10_000, seed=None, n_workers: int = 0
+                   ) -> tuple:
+    """Morris elementary effects screening of model over uniform bounds.
+
+    Args:
+        model: fn(params dict of (m,) arrays) -> (m,) outputs.
+        bounds: dict of param name to (lo, hi).
+        r: number of trajectories, model is evaluated r (d + 1) times.
+        levels: number of grid levels (even).
+        chunk: trajectories per chunk.
+        seed: seed of spawned per chunk seeds.
+        n_workers: number of processes, runs in this process if <= 1.
+
+    Returns tuple of mu* (mean |EE|), mu and sigma of elementary effects,
+        per unit of param range, each (d,) aligned w/ bounds.
+    """
+    d = len(bounds)
+    sizes = [min(chunk, r - i) for i in range(0, r, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(size, d, levels, s) for size, s in zip(sizes, seeds)]
+    ee = np.concatenate(fork_map(_morris_chunk, tasks, n_workers, _init,
+                                 (model, bounds)))
+    return np.abs(ee).mean(axis=0), ee.mean(axis=0), ee.std(axis=0)
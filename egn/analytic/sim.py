@@ -0,0 +1,82 @@
+"""Transient simulation of lumped nodes under time-varying forcing."""
+
+from numpy.typing import NDArray
+import numpy as np
+
+ndfloat = NDArray[np.float64]
+
+
+def exp_coefs(beta: ndfloat, dt: float) -> tuple:
+    """Exact exponential recurrence coefficients for lumped node.
+
+    For a lumped node, dT/dt = (Te(t) - T) / beta, w/ Te varying linearly
+    over the timestep dt (first-order hold), the exact solution is:
+        T[n+1] = Te[n+1] + a (T[n] - Te[n]) - beta (1 - a) (Te[n+1] - Te[n]) / dt
+    where a = exp(-dt / beta). Collecting terms:
+        T[n+1] = c0 T[n] + c1 Te[n] + c2 Te[n+1]
+
+    Args:
+        beta: time constant pVC / hA [s]
+        dt: timestep [s]
+
+    Returns tuple of coefficients (c0, c1, c2), each shaped like beta.
+    """
+    beta = np.asarray(beta, dtype=np.float64)
+    a = np.exp(-dt / beta)
+    b = (beta / dt) * -np.expm1(-dt / beta)  # beta (1 - a) / dt
+    return a, b - a, 1.0 - b
+
+
+def lumped_node_sim(
+    beta: ndfloat, temp_ext: ndfloat, dt: float,
+    temp_0: ndfloat = None, stride: int = 1
+    ) -> ndfloat:
+    """Simulate lumped node temps driven by exterior temp series.
+
+    Steps the exact exponential recurrence (see exp_coefs) through time,
+    vectorized over all nodes, so cost is one fused multiply-add per node
+    per step. Since the recurrence is exact for piecewise-linear forcing,
+    dt can be hourly (EPW) or sub-hourly w/o loss of stability.
+
+    Usage:
+    .. code-block:: python
+
+        beta = mat.time_constant(mats)          # (N,) [s]
+        temp_ext = weather['dry_bulb']          # (8760,) [C]
+        temps = lumped_node_sim(beta, temp_ext, dt=3600.0)  # (N, 8760)
+
+    Args:
+        beta: time constant pVC / hA [s], of shape G.
+        temp_ext: exterior temp series, of shape (nt,) or G + (nt,).
+        dt: timestep of temp_ext [s].
+        temp_0: initial temp, broadcastable to G. Defaults to temp_ext[..., 0].
+        stride: record every stride-th step, to bound output memory.
+
+    Returns temps of shape G + (ceil(nt / stride),).
+    """
+    beta = np.asarray(beta, dtype=np.float64)
+    temp_ext = np.asarray(temp_ext, dtype=np.float64)
+    nt = temp_ext.shape[-1]
+    shape = np.broadcast_shapes(beta.shape, temp_ext.shape[:-1])
+    # Time-major for contiguous per-step reads/writes
+    te = np.moveaxis(temp_ext, -1, 0)
+    c0, c1, c2 = (np.broadcast_to(c, shape) for c in exp_coefs(beta, dt))
+
+    if temp_0 is None:
+        temp_0 = te[0]
+    temp = np.array(np.broadcast_to(temp_0, shape), dtype=np.float64)
+    temps = np.empty(((nt + stride - 1) // stride,) + shape)
+    temps[0] = temp
+    tmp = np.empty(shape)
+
+    for i in range(1, nt):
+        # T = c0 T + c1 Te[i-1] + c2 Te[i]
+        np.multiply(temp, c0, out=temp)
+        np.multiply(c1, te[i - 1], out=tmp)
+        temp += tmp
+        np.multiply(c2, te[i], out=tmp)
+        temp += tmp
+        if i % stride == 0:
+            temps[i // stride] = temp
+
+    return np.moveaxis(temps, 0, -1)
@@ -0,0 +1,200 @@
+"""Parallel parameter sweep of lumped node comfort cost over design grids.
+
+Evaluates the cost Z = |T <= T_comf|, the number of timesteps a lumped node
+driven by an exterior temp series stays at or below a comfort temp, over a
+grid of Material params (i.e. V-A meshgrid, w/ Lc = V / A). Points where
+Bi >= bi_max (lumped node invalid, see heat.lumped_node_valid) are pruned
+before simulating. The remaining points are split in chunks over a process
+pool (see forkpool), and each worker writes its costs into a shared memory
+result array, so nothing but flat indices is sent to workers. optimize refines the grid around the argmax.
+"""
+
+import os
+from multiprocessing import shared_memory
+from numpy.typing import NDArray
+import numpy as np
+import material as mat
+import heat
+import sim
+from forkpool import WORKER, fork_map
+
+ndfloat = NDArray[np.float64]
+
+
+def comfort_cost(beta: ndfloat, temp_ext: ndfloat, dt: float,
+                 temp_comf: float, temp_0: ndfloat = None) -> ndfloat:
+    """Number of timesteps lumped node temp is <= temp_comf.
+
+    Steps the same exact recurrence as sim.lumped_node_sim, but only counts
+    comfortable steps, so memory doesn't grow w/ the length of temp_ext.
+
+    Args:
+        beta: time constant pVC / hA [s], of shape G.
+        temp_ext: (nt,) exterior temp series.
+        dt: timestep of temp_ext [s].
+        temp_comf: comfort temp upper bound.
+        temp_0: initial temp, broadcastable to G. Defaults to temp_ext[0].
+
+    Returns cost of shape G, as float64.
+    """
+    beta = np.asarray(beta, dtype=np.float64)
+    temp_ext = np.asarray(temp_ext, dtype=np.float64)
+    c0, c1, c2 = sim.exp_coefs(beta, dt)
+    temp_0 = temp_ext[0] if temp_0 is None else temp_0
+    temp = np.array(np.broadcast_to(temp_0, beta.shape), dtype=np.float64)
+    count = np.zeros(beta.shape, dtype=np.int64)
+    count += temp <= temp_comf
+    tmp = np.empty(beta.shape)
+    ok = np.empty(beta.shape, dtype=bool)
+    for i in range(1, temp_ext.size):
+        np.multiply(temp, c0, out=temp)
+        np.multiply(c1, temp_ext[i - 1], out=tmp)
+        temp += tmp
+        np.multiply(c2, temp_ext[i], out=tmp)
+        temp += tmp
+        np.less_equal(temp, temp_comf, out=ok)
+        count += ok
+    return count.astype(np.float64)
+
+
+def grid_material(params: dict) -> mat.Material:
+    """Material from dict of fields, w/ vol = char_len * area if char_len.
+    """
+    params = dict(params)
+    if 'char_len' in params:
+        params['vol'] = params.pop('char_len') * params['area']
+    return mat.Material(**{f: params[f] for f in mat.MATERIAL_FIELDS})
+
+
+def grid_params(axes: dict, fixed: dict, index: ndfloat) -> mat.Material:
+    """Material of grid points at flat index, from axes and fixed params."""
+    shape = tuple(len(x) for x in axes.values())
+    subs = np.unravel_index(index, shape)
+    params = dict(fixed)
+    for (name, values), sub in zip(axes.items(), subs):
+        params[name] = np.asarray(values, dtype=np.float64)[sub]
+    return grid_material(params)
+
+
+def _init(shm_name: str, n: int, axes: dict, fixed: dict,
+          temp_ext: ndfloat, dt: float, temp_comf: float) -> dict:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    return dict(shm=shm, cost=np.ndarray((n,), np.float64, shm.buf),
+                axes=axes, fixed=fixed, temp_ext=temp_ext, dt=dt,
+                temp_comf=temp_comf)
+
+
+def _run_chunk(index: ndfloat) -> int:
+    w = WORKER
+    m = grid_params(w['axes'], w['fixed'], index)
+    beta = mat.time_constant(m.rho, m.vol, m.cp, m.hc, m.area)
+    w['cost'][index] = comfort_cost(beta, w['temp_ext'], w['dt'],
+                                    w['temp_comf'])
+    return index.size
+
+
+def sweep(axes: dict, temp_ext: ndfloat, dt: float, temp_comf: float,
+          fixed: dict = None, bi_max: float = 0.1, n_workers: int = None,
+          chunk: int = 4096) -> tuple:
+    """Comfort cost over grid of Material params, pruned by Biot number.
+
+    Usage:
+    .. code-block:: python
+
+        axes = {'vol': np.linspace(0.01, 1.0, 1000),
+                'area': np.linspace(0.1, 10.0, 1000)}
+        fixed = {'hc': 10.0, 'k': 1.4, 'rho': 2300.0, 'cp': 880.0}
+        cost, valid = sweep(axes, epw['dry_bulb'], 3600.0, 26.0, fixed)
+        best = np.unravel_index(np.nanargmax(cost), cost.shape)
+
+    Args:
+        axes: dict of Material field name (or 'char_len', for vol =
+            char_len * area) to 1D array, in grid axis order.
+        temp_ext: (nt,) exterior temp series.
+        dt: timestep of temp_ext [s].
+        temp_comf: comfort temp upper bound.
+        fixed: dict of remaining Material fields, as scalars.
+        bi_max: Biot number upper bound, points at or above are not
+            simulated.
+        n_workers: number of processes, defaults to cpu count. If 0, or the
+            grid fits in one chunk, runs in this process.
+        chunk: number of grid points per task.
+
+    Returns tuple of cost, NaN where pruned, and validity mask, each of
+        grid shape (len of each axis).
+    """
+    fixed = {} if fixed is None else fixed
+    shape = tuple(len(x) for x in axes.values())
+    n = int(np.prod(shape))
+    temp_ext = np.ascontiguousarray(temp_ext, dtype=np.float64)
+
+    # Prune on Bi over whole (open) grid, vectorized, before simulating
+    mesh = grid_material({**fixed, **dict(zip(axes, np.ix_(
+        *(np.asarray(x, dtype=np.float64) for x in axes.values()))))})
+    bi = mat.biot_num(mesh.hc, mesh.vol / mesh.area, mesh.k)
+    valid = heat.lumped_node_valid(bi, bi_max)
+    valid = np.broadcast_to(valid, shape).copy()
+    index = np.flatnonzero(valid)
+    chunks = [index[i:i + chunk] for i in range(0, index.size, chunk)]
+
+    n_workers = os.cpu_count() if n_workers is None else n_workers
+    shm = shared_memory.SharedMemory(create=True, size=max(n, 1) * 8)
+    try:
+        shared = np.ndarray((n,), np.float64, shm.buf)
+        shared[:] = np.nan
+        fork_map(_run_chunk, chunks, n_workers, _init,
+                 (shm.name, n, axes, fixed, temp_ext, dt, temp_comf))
+        cost = shared.reshape(shape).copy()
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return cost, valid
+
+
+def refine_axes(axes: dict, best: tuple, n: int = None) -> dict:
+    """Axes spanning the neighbours of best grid index, w/ n points each.
+
+    Args:
+        axes: dict of name to 1D array.
+        best: grid index tuple of optimum.
+        n: number of points per axis, defaults to current length.
+
+    Returns dict of finer axes.
+    """
+    fine = {}
+    for (name, values), i in zip(axes.items(), best):
+        values = np.asarray(values, dtype=np.float64)
+        lo, hi = values[max(i - 1, 0)], values[min(i + 1, values.size - 1)]
+        fine[name] = np.linspace(lo, hi, n or values.size)
+    return fine
+
+
+def optimize(axes: dict, temp_ext: ndfloat, dt: float, temp_comf: float,
+             fixed: dict = None, levels: int = 2, n: int = None,
+             **kwargs) -> tuple:
+    """Argmax of comfort cost, w/ sweep refined around optimum per level.
+
+    Args:
+        axes, temp_ext, dt, temp_comf, fixed: see sweep.
+        levels: number of refinements after the initial sweep.
+        n: points per axis of refined grids, defaults to axes lengths.
+        kwargs: passed to sweep (bi_max, n_workers, chunk).
+
+    Returns tuple of best params dict, best cost, and list of (axes, cost)
+        per level. Best params are None if no point is valid.
+    """
+    history = []
+    best_params, best_cost = None, -np.inf
+    for _ in range(levels + 1):
+        cost, _ = sweep(axes, temp_ext, dt, temp_comf, fixed, **kwargs)
+        history.append((axes, cost))
+        if np.all(np.isnan(cost)):
+            break
+        best = np.unravel_index(np.nanargmax(cost), cost.shape)
+        if cost[best] > best_cost:
+            best_cost = cost[best]
+            best_params = {name: float(np.asarray(values)[i])
+                           for (name, values), i in zip(axes.items(), best)}
+        axes = refine_axes(axes, best, n)
+    return best_params, (best_cost if best_params else np.nan), history
@@ -1,7 +1,14 @@
 # Unit test for analytical models
+import pytest
 import numpy as np
 import material as mat
 import heat as heat
+import sim as sim
+import holford
+import wall
+import harmonic
+import sweep
+import sensitivity
 
 # utility fns to wrap scalars as arrays
 # TODO: might be good to find this from Rust
@@ -164,61 +171,407 @@ def test_thermocouple():
     assert abs(temps[10] - 1.0) < 1e-1
 
 
+def test_lumped_node_batch():
+    """Test batch lumped node over V-A grid matches scalar lumped node."""
+
+    tc = _thermocouple()
+    nt = np.arange(0, 11)
+    # V-A meshgrid around thermocouple, w/ one bad (Bi > 0.1) column
+    vol, area = np.meshgrid(
+        tc.vol * np.array([1.0, 2.0, 1e6]), tc.area * np.array([1.0, 0.5]),
+        indexing='ij')
+    mats = mat.Material(
+        hc=tc.hc, area=area, vol=vol, k=tc.k, rho=tc.rho, cp=tc.cp)
+    theta, valid = heat.lumped_node_batch(mats, nt)
+    assert theta.shape == (3, 2, 11), theta.shape
+    assert valid.shape == (3, 2), valid.shape
+    assert valid[:2].all() and not valid[2].any()
+
+    # Compare against scalar solution
+    lc = tc.vol / tc.area
+    alpha = mat.diffusivity_coef(tc.k, tc.rho, tc.cp)
+    bi = mat.biot_num(tc.hc, lc, tc.k)
+    fo = mat.fourier_num(alpha, lc, nt)
+    theta_ = heat.lumped_node(bi, fo)
+    assert np.all(np.abs(theta[0, 0] - theta_) < 1e-10)
+
+    # 99% of temp diff achieved after 10s
+    temps = heat.theta_to_temp(theta, f64(100.0), f64(0.0))
+    assert abs(temps[0, 0, 10] - 1.0) < 1e-1
+
+
+def test_material_set():
+    """Test columnar MaterialSet lookup, views and coefficient fns."""
+
+    tc = _thermocouple()
+    tc2 = _thermocouple()
+    tc2.hc = f64(420)
+    mats = mat.MaterialSet.from_materials([tc, tc2], names=['tc', 'tc2'])
+    assert len(mats) == 2
+
+    # Named-row lookup
+    assert np.abs(mats['tc2'].hc - 420) < 1e-10
+    assert np.abs(mats['tc'].area - tc.area[0]) < 1e-10
+
+    # Slices are views of the same memory
+    sub = mats[1:]
+    assert np.shares_memory(sub.hc, mats.hc)
+    assert sub.names[0] == 'tc2'
+    assert sub.hc.flags['C_CONTIGUOUS']
+
+    # 2D params grid broadcasts, then flattens to rows in C order
+    grid = mat.MaterialSet(hc=10.0, area=np.ones((3, 1)),
+                           vol=np.array([[1.0, 2.0]]) * 1e-3, k=1.0,
+                           rho=[[1000.0], [2000.0], [3000.0]], cp=900.0)
+    assert len(grid) == 6 and grid.hc.flags['C_CONTIGUOUS']
+    assert np.array_equal(grid.rho, np.repeat([1000.0, 2000.0, 3000.0], 2))
+    assert np.array_equal(grid.vol, np.tile([1e-3, 2e-3], 3))
+
+    # Coefficient fns return arrays aligned w/ rows
+    lc = tc.vol / tc.area
+    bi = mat.biot_num(mats)
+    assert bi.shape == (2,)
+    assert np.abs(bi[0] - mat.biot_num(tc.hc, lc, tc.k)) < 1e-10
+    assert np.abs(bi[1] - 2.0 * bi[0]) < 1e-10
+    alpha = mat.diffusivity_coef(mats)
+    assert np.all(np.abs(alpha - mat.diffusivity_coef(tc.k, tc.rho, tc.cp))
+                  < 1e-10)
+    beta = mat.time_constant(mats)
+    assert np.abs(beta[0] - mat.time_constant(
+        tc.rho, tc.vol, tc.cp, tc.hc, tc.area)) < 1e-10
+    nt = np.arange(11)
+    fo = mat.fourier_num(mats, nt=nt)
+    assert fo.shape == (2, 11)
+    assert np.all(np.abs(fo[0] - mat.fourier_num(alpha[0], lc, nt)) < 1e-10)
+    with pytest.raises(TypeError):  # nt would bind to char_len
+        mat.fourier_num(mats, nt)
+
+    # MaterialSet works w/ batch lumped node
+    theta, valid = heat.lumped_node_batch(mats, nt)
+    assert theta.shape == (2, 11) and valid.all()
+
+
+def test_lumped_node_sim():
+    """Test time-stepping lumped node against analytic solutions."""
+
+    tc = _thermocouple()
+    beta = mat.time_constant(tc.rho, tc.vol, tc.cp, tc.hc, tc.area)
+    nt = np.arange(0, 11)
+
+    # Constant exterior temp matches closed form lumped node
+    temps = sim.lumped_node_sim(beta, np.zeros(nt.shape), dt=1.0,
+                                temp_0=f64(100.0))
+    assert temps.shape == (1, 11), temps.shape
+    theta = np.exp(-nt / beta)
+    assert np.all(np.abs(temps[0] - 100.0 * theta) < 1e-8)
+
+    # Linear ramp Te = s t, steady lag T = Te - beta s, is exact
+    s = 0.5
+    beta = f64(3600.0)
+    te = s * np.arange(100) * 600.0
+    temps = sim.lumped_node_sim(beta, te, dt=600.0, temp_0=-beta * s)
+    assert np.all(np.abs(temps[0] - (te - beta * s)) < 1e-8)
+
+    # Sinusoidal forcing damped by 1/sqrt(1 + (w beta)^2)
+    period = 86400.0
+    dt = 600.0
+    beta = np.array([3600.0, 7200.0])
+    t = np.arange(0, 10 * period, dt)
+    w = 2.0 * np.pi / period
+    temps = sim.lumped_node_sim(beta, np.sin(w * t), dt=dt)
+    amp = np.max(temps[:, -int(period / dt):], axis=1)
+    amp_ = 1.0 / np.sqrt(1.0 + (w * beta) ** 2)
+    assert np.all(np.abs(amp - amp_) < 1e-3), (amp, amp_)
+
+    # Stride bounds output
+    temps_ = sim.lumped_node_sim(beta, np.sin(w * t), dt=dt, stride=6)
+    assert np.all(np.abs(temps_ - temps[:, ::6]) < 1e-10)
+
+
+def test_wall_sim():
+    """Test layered wall conduction against steady and plane wall solutions.
+    """
+
+    # Steady flux through 3 layers is 1 / total resistance
+    layers = [
+        mat.Material(hc=25.0, area=1.0, vol=0.1, k=0.7, rho=1900.0, cp=840.0),
+        mat.Material(hc=0.0, area=1.0, vol=0.05, k=0.04, rho=30.0, cp=1400.0),
+        mat.Material(hc=8.0, area=1.0, vol=0.0125, k=0.16, rho=800.0,
+                     cp=1090.0)]
+    res = 1 / 25.0 + 0.1 / 0.7 + 0.05 / 0.04 + 0.0125 / 0.16 + 1 / 8.0
+    _, ts_int, q_int = wall.wall_sim(layers, np.full(50, -10.0), 20.0, 3600.0)
+    assert np.allclose(q_int, -30.0 / res)
+    assert np.allclose(ts_int, 20.0 + q_int / 8.0)
+
+    # Slab cooling on both sides, Bi = hL / k = 5 (L half thickness), so
+    # not a lumped node. Compare to series solution w/ roots z tan(z) = Bi.
+    h, k, rho, cp, half = 50.0, 1.0, 2000.0, 1000.0, 0.1
+    slab = mat.Material(hc=h, area=1.0, vol=2 * half, k=k, rho=rho, cp=cp)
+    bi = mat.biot_num(h, half, k)
+    assert not heat.lumped_node_valid(bi)
+    nt, dt = 1001, 60.0
+    ts, _, _ = wall.wall_sim([slab], np.zeros(nt), 0.0, dt, nodes=40,
+                             temp_0=1.0)
+    lo = np.arange(20) * np.pi
+    hi = lo + np.pi / 2 - 1e-12
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        below = mid * np.tan(mid) < bi
+        lo, hi = np.where(below, mid, lo), np.where(below, hi, mid)
+    z = lo
+    c = 4 * np.sin(z) / (2 * z + np.sin(2 * z))
+    fo = mat.fourier_num(mat.diffusivity_coef(k, rho, cp), half,
+                         np.arange(nt) * dt)
+    theta = (c[:, None] * np.exp(-np.outer(z * z, fo))
+             * np.cos(z)[:, None]).sum(axis=0)
+    assert np.all(np.abs(ts[10:] - theta[10:]) < 1e-3)
+
+    # Batch of walls, w/ MaterialSet layers, matches each wall alone
+    layers = [mat.MaterialSet(hc=25.0, area=1.0, vol=[0.1, 0.2], k=0.7,
+                              rho=1900.0, cp=840.0),
+              mat.MaterialSet(hc=8.0, area=1.0, vol=[0.05, 0.01], k=0.04,
+                              rho=30.0, cp=1400.0)]
+    temp_ext = 10.0 + 10.0 * np.sin(np.arange(48) * 2 * np.pi / 24)
+    q_int = wall.wall_sim(layers, temp_ext, 20.0, 3600.0, stride=2)[2]
+    assert q_int.shape == (2, 24)
+    q_int1 = wall.wall_sim([l[1] for l in layers], temp_ext, 20.0, 3600.0,
+                           stride=2)[2]
+    assert np.allclose(q_int[1], q_int1)
+
+
+def test_harmonic():
+    """Test steady-periodic solvers against analytic and time-stepped.
+    """
+
+    # Daily sinusoid is a single harmonic, so lumped node response is exact:
+    # amplitude 1 / |1 + i w beta|, lag atan(w beta) / w
+    nt, dt = 24 * 4, 3600.0
+    t = np.arange(nt) * dt
+    w = 2 * np.pi / 86400.0
+    beta = np.array([600.0, 3600.0, 36000.0])
+    temps = harmonic.lumped_node_periodic(beta, 10.0 * np.sin(w * t) + 5, dt)
+    amp = 10.0 / np.sqrt(1 + (w * beta) ** 2)
+    lag = np.arctan(w * beta) / w
+    expected = 5 + amp[:, None] * np.sin(w * (t - lag[:, None]))
+    assert temps.shape == (3, nt)
+    assert np.allclose(temps, expected)
+
+    # Lumped node matches time stepping after spin-up, for smooth forcing
+    temp_ext = 15.0 + 10.0 * np.sin(w * t)
+    temps_sim = sim.lumped_node_sim(beta, np.tile(temp_ext, 8), dt)[:, -nt:]
+    assert np.all(np.abs(temps + 10.0 - temps_sim) < 0.1)
+
+    # Wall mean flux is steady flux, and matches refined time stepping
+    layers = [
+        mat.Material(hc=25.0, area=1.0, vol=0.1, k=0.7, rho=1900.0, cp=840.0),
+        mat.Material(hc=8.0, area=1.0, vol=0.05, k=0.04, rho=30.0, cp=1400.0)]
+    res = 1 / 25.0 + 0.1 / 0.7 + 0.05 / 0.04 + 1 / 8.0
+    ts_ext, ts_int, q_int = harmonic.wall_periodic(
+        layers, temp_ext, 20.0, dt)
+    assert np.abs(q_int.mean() - (15.0 - 20.0) / res) < 1e-10
+    sub = 4
+    temp_fine = 15.0 + 10.0 * np.sin(w * np.arange(nt * sub * 4) * dt / sub)
+    sim_out = wall.wall_sim(layers, temp_fine, 20.0, dt / sub, nodes=8)
+    for x, x_sim in zip((ts_ext, ts_int, q_int), sim_out):
+        assert np.all(np.abs(x - x_sim[-nt * sub::sub]) < 0.02)
+
+    # Chunked batches of walls match each wall alone, w/ per wall forcing
+    thick = np.array([[0.05], [0.1], [0.2]])
+    batch = [mat.Material(hc=25.0, area=1.0, vol=thick, k=0.7, rho=1900.0,
+                          cp=840.0), layers[1]]
+    temp_int = 20.0 + np.arange(2)[:, None] * np.cos(w * t)
+    out = harmonic.wall_periodic(batch, temp_ext, temp_int, dt, chunk=4)
+    assert out[0].shape == (3, 2, nt)
+    layers[0].vol = 0.2
+    for x, x_one in zip(out, harmonic.wall_periodic(
+            layers, temp_ext, temp_int[1], dt)):
+        assert np.allclose(x[2, 1], x_one)
+
+
+def test_sweep():
+    """Test comfort cost sweep over Lc-A grid, pruned by Biot number."""
+
+    nt = np.arange(24 * 20)
+    temp_ext = 22.0 + 8.0 * np.sin(nt * 2 * np.pi / 24)
+    axes = {'char_len': np.geomspace(1e-3, 0.2, 12),
+            'area': np.linspace(0.5, 10.0, 5)}
+    fixed = {'hc': 10.0, 'k': 1.4, 'rho': 2300.0, 'cp': 880.0}
+    cost, valid = sweep.sweep(axes, temp_ext, 3600.0, 24.0, fixed,
+                              n_workers=0, chunk=16)
+    assert cost.shape == valid.shape == (12, 5)
+    assert valid.flags.writeable
+
+    # Pruned where Bi >= 0.1, i.e. hc Lc / k >= 0.1, as lumped_node_valid
+    bi = fixed['hc'] * axes['char_len'] / fixed['k']
+    assert np.array_equal(valid[:, 0], bi < 0.1)
+    # Bi exactly at bi_max is invalid
+    edge = {'char_len': [0.01], 'area': [1.0]}
+    assert not sweep.sweep(edge, temp_ext, 3600.0, 24.0, {**fixed, 'k': 1.0},
+                           n_workers=0)[1].any()
+    assert np.all(np.isnan(cost[~valid])) and np.all(cost[valid] >= 0)
+
+    # Cost counts comfortable steps of lumped_node_sim
+    m = sweep.grid_params(axes, fixed, np.flatnonzero(valid))
+    beta = mat.time_constant(m.rho, m.vol, m.cp, m.hc, m.area)
+    temps = sim.lumped_node_sim(beta, temp_ext, 3600.0)
+    assert np.array_equal(cost[valid], (temps <= 24.0).sum(axis=1))
+
+    # Process pool w/ shared memory results matches in-process sweep
+    cost_pool, _ = sweep.sweep(axes, temp_ext, 3600.0, 24.0, fixed,
+                               n_workers=2, chunk=16)
+    assert np.array_equal(cost_pool, cost, equal_nan=True)
+
+    # Each level spans the neighbours of the previous level's argmax
+    best, best_cost, history = sweep.optimize(
+        axes, temp_ext, 3600.0, 24.0, fixed, levels=2, n=5, n_workers=0)
+    assert len(history) == 3
+    assert np.array_equal(history[0][1], cost, equal_nan=True)
+    for (axes0, cost0), (axes1, _) in zip(history[:-1], history[1:]):
+        i = np.unravel_index(np.nanargmax(cost0), cost0.shape)
+        for (name, x0), j in zip(axes0.items(), i):
+            lo, hi = x0[max(j - 1, 0)], x0[min(j + 1, len(x0) - 1)]
+            assert np.allclose(axes1[name], np.linspace(lo, hi, 5))
+
+    # Best is the argmax over all levels, w/ params at its grid point
+    level = np.argmax([np.nanmax(c) for _, c in history])
+    axes_, cost_ = history[level]
+    i = np.unravel_index(np.nanargmax(cost_), cost_.shape)
+    assert best_cost == max(np.nanmax(c) for _, c in history)
+    assert best == {name: x[j] for (name, x), j in zip(axes_.items(), i)}
+
+
+def test_sensitivity(capsys):
+    """Test Sobol and Morris indices against known and lumped node cases."""
+
+    # Ishigami fn has analytic Sobol indices
+    def ishigami(p):
+        return (np.sin(p['x1']) + 7.0 * np.sin(p['x2']) ** 2
+                + 0.1 * p['x3'] ** 4 * np.sin(p['x1']))
+
+    bounds = {x: (-np.pi, np.pi) for x in ('x1', 'x2', 'x3')}
+    s1, st = sensitivity.sobol_indices(ishigami, bounds, 50_000, seed=0)
+    assert np.allclose(s1, [0.314, 0.442, 0.0], atol=0.03)
+    assert np.allclose(st, [0.558, 0.442, 0.244], atol=0.03)
+
+    # Elementary effects of linear fn are its slopes per unit of range
+    def linear(p):
+        return 2.0 * p['a'] - 3.0 * p['b']
+
+    mu_star, mu, sigma = sensitivity.morris_effects(
+        linear, {'a': (0.0, 1.0), 'b': (0.0, 2.0)}, 20, seed=0)
+    assert np.allclose(mu, [2.0, -6.0]) and np.allclose(mu_star, [2.0, 6.0])
+    assert np.allclose(sigma, 0.0)
+
+    # Lumped node Bi Fo = hc t / (rho cp Lc) doesn't depend on k
+    bounds = {'hc': (5.0, 25.0), 'area': (0.5, 2.0), 'vol': (1e-3, 1e-2),
+              'k': (10.0, 50.0), 'rho': (2000.0, 9000.0),
+              'cp': (200.0, 1000.0)}
+    s1, st = sensitivity.sobol_indices(
+        sensitivity.lumped_node_theta, bounds, 20_000, chunk=4096, seed=0)
+    assert np.abs(st[3]) < 1e-10
+    assert np.all(st[[0, 1, 2, 4, 5]] > 0.05)
+    s1_pool, _ = sensitivity.sobol_indices(
+        sensitivity.lumped_node_theta, bounds, 20_000, chunk=4096, seed=0,
+        n_workers=2)
+    assert np.allclose(s1_pool, s1)
+    assert sensitivity.lumped_node_valid_frac(bounds, seed=0) == 1.0
+
+    # Bi >= 0.1 for some samples is reported once by the caller, not per
+    # chunk
+    bounds['k'] = (0.5, 50.0)
+    assert 0.0 < sensitivity.lumped_node_valid_frac(bounds, seed=0) < 1.0
+    sensitivity.sobol_indices(
+        sensitivity.lumped_node_theta, bounds, 1000, chunk=100, seed=0)
+    assert capsys.readouterr().out == ''
+
+    # Indices don't lose precision if mean of f is large vs its spread
+    def offset(p):
+        return 1e8 + linear(p)
+
+    bounds = {'a': (0.0, 1.0), 'b': (0.0, 2.0)}
+    s1, st = sensitivity.sobol_indices(linear, bounds, 20_000, seed=0)
+    s1_off, st_off = sensitivity.sobol_indices(offset, bounds, 20_000, seed=0)
+    assert np.allclose(s1, [0.1, 0.9], atol=0.02)
+    assert np.allclose(s1_off, s1, atol=1e-3)
+    assert np.allclose(st_off, st, atol=1e-3)
+
+
 def test_numeric():
-    """Numeric lumped node.
+    """Numeric Holford zone/mass model, batched over parameter sets.
 
-    dtheta = (theta_eps - theta_i)
-    eps d(theta)/d(phi) = \
-        1/chi (theta|x1 - theta|xi) + eps Rn dtheta |dtheta|^0.5
+    dtheta = (theta_e - theta_z)
+    eps d(theta_z)/d(phi) = \
+        1/chi (theta_m - theta_z) + eps Rn dtheta |dtheta|^0.5
     """
 
+    # From the first step after t = 0, where Fo = tau = 0
     nt = np.arange(11)
     dnt = nt[-1] - nt[0]
+    nt = nt[1:]
     tau = mat.tau(dnt, nt)
-    Te = np.sin(np.pi * 2) * 30.0
-    T = 23.0
 
     # Materials
     mass = _thermocouple()
     iair = _thermocouple()
-
-    #
     mass_lc = mass.vol / mass.area
     mass_alpha = mat.diffusivity_coef(mass.k, mass.rho, mass.cp)
     mass_fo = mat.fourier_num(mass_alpha, mass_lc, nt)
     mass_bi = mat.biot_num(mass.hc, mass_lc, mass.k)
-    mass_beta = (mass.rho * mass.vol * mass.cp) / (mass.hc * mass.area)  # [s]
 
     # Time-scale factors
-    # 1. chi ξ - ratio of convection to forcing time scale.
-    # indicates whether there is time for significant heat to be transferred
-    # to thermal mass before environmental temperature changes (forcing).
     chi = mat.time_scale_chi(tau, mass_fo, mass_bi)
-
-    # 2. epsilon ε, Cp of interior air to Cp of thermal mass.
     eps = mat.time_scale_epsilon(
-        iair.vol, iair.rho, iair.rho,
-        mass.area, mass_lc, mass.rho, mass.cp)
-
-    # 3. Rn, ratio of forcing to ventilation flushing time.
-    area_vent = 1 # m^2
-    neutral_height = 1.5
-    dTi = Te[0] - T # ??
-    # TODO: check beta
-    Rn = mat.time_scale_Rn(area_vent, mass_beta, neutral_height, dTi)
-
-    # 4. 2η^2, ratio of mass diffusion to forcing time scale.
+        iair.vol, iair.rho, iair.cp, mass.area, mass_lc, mass.rho, mass.cp)
     dnusq = mat.time_scale_nu(tau, mass_fo)
-
-    dT = np.abs(T[0] - Te)
-    theta = T / (dT - Te)
-    # theta(t) = T(t) / delta_T: dimensionless temp
-    # dtheta = (theta_eps - theta_i)
-    # eps d(theta)/d(phi) = \
-    #     1/chi (theta_m|x1 - theta_z|xi) + eps Rn dtheta_? |dtheta_?|^0.5
-
-    # eps d(theta)/d(phi) = \
-    #     1/chi (theta_m|x1 - theta_z|xi) + eps Rn dtheta_? |dtheta_?|^0.5
-
-
-
+    assert np.all(np.isfinite(eps))
+    assert np.all(np.isfinite(chi)) and np.all(np.isfinite(dnusq))
+
+    # Batch of (chi, eps, Rn) over 3 forcing periods
+    phi = np.linspace(0, 3, 31)
+    chis, epss, rns = np.meshgrid(
+        [0.1, 1.0, 10.0], [1e-3, 0.1, 1.0], [0.0, 1.0, 10.0], indexing='ij')
+    theta_z, theta_m = holford.holford_sim(chis, epss, rns, phi)
+    assert theta_z.shape == theta_m.shape == (3, 3, 3, 31)
+    assert np.all(np.abs(theta_z) <= 1.0 + 1e-6)
+
+    # No ventilation, so heat is only exchanged b/w zone and mass, and
+    # eps theta_z + theta_m is conserved while theta_z - theta_m decays
+    # as exp(-(1 + eps) / (chi eps) phi)
+    theta_z, theta_m = holford.holford_sim(
+        1.0, 0.2, 0.0, phi, theta_z0=1.0)
+    assert np.allclose(0.2 * theta_z + theta_m, 0.2, atol=1e-12)
+    diff = np.exp(-(1.0 + 0.2) / (1.0 * 0.2) * phi)
+    assert np.allclose(theta_z, (0.2 + diff) / 1.2, atol=1e-3)
+    assert np.allclose(theta_m, (0.2 + diff) / 1.2 - diff, atol=1e-3)
+
+    # Batch matches fixed step explicit RK4 of the model eqns, w/ a step
+    # well inside its stability bound of ~2.8 chi eps
+    theta_z, theta_m = holford.holford_sim(chis, epss, rns, phi)
+    cases = ([0, 1, 2], [0, 1, 2], [2, 1, 2])
+    chi, eps, rn = chis[cases], epss[cases], rns[cases]
+
+    def rhs(t, y):
+        z, m = y
+        dtheta = np.sin(2.0 * np.pi * t) - z
+        exch = (m - z) / chi
+        return np.array([exch / eps + rn * dtheta * np.abs(dtheta) ** 0.5,
+                         -exch])
+
+    n_sub = 1000
+    h = (phi[1] - phi[0]) / n_sub
+    y = np.zeros((2, 3))
+    ref = [y]
+    for t0 in phi[:-1]:
+        for i in range(n_sub):
+            t = t0 + i * h
+            k1 = rhs(t, y)
+            k2 = rhs(t + h / 2, y + h / 2 * k1)
+            k3 = rhs(t + h / 2, y + h / 2 * k2)
+            k4 = rhs(t + h, y + h * k3)
+            y = y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        ref.append(y)
+    ref = np.stack(ref, axis=-1)
+    # Error relative to each case's amplitude, which spans 3e-3 to 0.7
+    for sim_, ref_ in ((theta_z[cases], ref[0]), (theta_m[cases], ref[1])):
+        err = np.abs(sim_ - ref_).max(axis=-1)
+        assert np.all(err <= 5e-3 * np.abs(ref_).max(axis=-1) + 1e-6)
@@ -16,6 +16,8 @@ if lump_path not in sys.path:
     sys.path.insert(0, lump_path)
 
 import material as mat
+import heat
+import sim
 print('First cell loaded.')
 
 
@@ -118,19 +120,9 @@ ax.set_title('Temp [C] vs Time [s]'); ax.grid(True);
 dT = 30 - 15
 nt = np.arange(24)
 temps = np.sin(nt * 180.0 / np.pi) * dT + 15
-tempsi = []
-for temp_ext in temps:
-    alpha = mat.diffusivity_coef(tc.k, tc.rho, tc.cp)
-    _nt = np.arange(10)
-    fo = mat.fourier_num(alpha, lc, _nt)
-    bi = (tc.hc * (tc.vol / tc.area)) / tc.k
-    # Get theta, dimensionless temp
-    theta = heat.lumped_node(bi, fo)
-    Ti = (theta * dT)
-    Ti += np.random.normal(0, 5, _nt.shape) + (temp_ext + 10)
-    #Ti = Ti_ - temp_ext
-    #dT = (beta * (Ti))
-    tempsi.append(Ti[-1] / 2.0)
+# Step lumped node through exterior temps w/ exact exponential recurrence
+beta = mat.time_constant(tc.rho, tc.vol, tc.cp, tc.hc, tc.area)  # [s]
+tempsi = sim.lumped_node_sim(beta, temps, dt=1.0)[0]
 
 _, ax = plt.subplots(1,1, figsize=(8, 4))
 ax.plot(nt, temps, color='r')
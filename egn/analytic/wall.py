@@ -0,0 +1,183 @@
+"""Transient 1-D conduction through multi-layer walls, by finite volumes.
+
+Unlike heat.lumped_node, which assumes uniform temp in the body (Bi <= 0.1),
+each layer is split into cells, so temp gradients through thick or
+insulating layers are resolved. Per unit wall area, cell i has capacitance
+C_i = rho-cp-dx [J/m2-K], and adjacent cells (and the air on either side,
+through a surface film hc) are joined by conductances G [W/m2-K]:
+
+    C dT/dt = -K T + b(t),  b = G_ext Te e_0 + G_int Ti e_n
+
+which is stepped w/ Crank-Nicolson:
+
+    (C/dt + K/2) T[n+1] = (C/dt - K/2) T[n] + (b[n] + b[n+1]) / 2
+
+The lhs matrix is tridiagonal and constant in time, so its LU factors are
+computed once (see cn_factor), and each step is a forward and back sweep,
+vectorized over all walls.
+"""
+
+from numpy.typing import NDArray
+import numpy as np
+
+ndfloat = NDArray[np.float64]
+
+
+def wall_grid(layers: list, nodes: int = 4,
+              h_ext: ndfloat = None, h_int: ndfloat = None) -> tuple:
+    """Cell capacitances and conductances of layered walls.
+
+    Args:
+        layers: list of Material (or MaterialSet) from exterior to interior.
+            Layer thickness is Lc = vol / area. Fields broadcast to walls of
+            shape G.
+        nodes: number of cells per layer.
+        h_ext: exterior film coef [W/m2-K], defaults to layers[0].hc.
+        h_int: interior film coef [W/m2-K], defaults to layers[-1].hc.
+
+    Returns tuple of capacitance (n,) + G [J/m2-K], and conductance
+        (n + 1,) + G [W/m2-K] from exterior air, b/w cells, to interior air,
+        where n = nodes * len(layers).
+    """
+    h_ext = layers[0].hc if h_ext is None else h_ext
+    h_int = layers[-1].hc if h_int is None else h_int
+    props = [(np.asarray(layer.vol / layer.area, dtype=np.float64) / nodes,
+              layer.k, layer.rho * layer.cp) for layer in layers]
+    shape = np.broadcast_shapes(
+        np.shape(h_ext), np.shape(h_int),
+        *(np.shape(x) for p in props for x in p))
+    n = nodes * len(layers)
+    dx, k, cap = (np.empty((n,) + shape) for _ in range(3))
+    for i, (dx_, k_, rho_cp) in enumerate(props):
+        cells = slice(i * nodes, (i + 1) * nodes)
+        dx[cells], k[cells], cap[cells] = dx_, k_, rho_cp * dx_
+
+    # Half cell resistances, in series b/w cell centres
+    r_half = dx / (2.0 * k)
+    cond = np.empty((cap.shape[0] + 1,) + cap.shape[1:])
+    cond[0] = 1.0 / (1.0 / h_ext + r_half[0])
+    cond[1:-1] = 1.0 / (r_half[:-1] + r_half[1:])
+    cond[-1] = 1.0 / (1.0 / h_int + r_half[-1])
+    return cap, cond
+
+
+def cn_factor(cap: ndfloat, cond: ndfloat, dt: float) -> tuple:
+    """LU (Thomas) factors of Crank-Nicolson lhs, C/dt + K/2.
+
+    Args:
+        cap: (n,) + G cell capacitances [J/m2-K].
+        cond: (n + 1,) + G conductances [W/m2-K], see wall_grid.
+        dt: timestep [s].
+
+    Returns tuple of (lower, diag, upper), each (n,) + G, where lower[i] is
+    the elimination multiplier of row i, diag is the U diagonal, and
+    upper[i] the (unchanged) superdiagonal of row i.
+    """
+    diag = cap / dt + 0.5 * (cond[:-1] + cond[1:])
+    upper = np.zeros_like(diag)
+    upper[:-1] = -0.5 * cond[1:-1]
+    lower = np.zeros_like(diag)
+    for i in range(1, diag.shape[0]):
+        lower[i] = upper[i - 1] / diag[i - 1]  # sub == super, symmetric
+        diag[i] -= lower[i] * upper[i - 1]
+    return lower, diag, upper
+
+
+def surface_temps(temps: ndfloat, air: ndfloat, cond: ndfloat,
+                  h: ndfloat) -> ndfloat:
+    """Surface temp b/w edge cell and air, from conductance cell to air."""
+    # flux = cond (air - T_cell) = h (air - T_surf)
+    return air - cond * (air - temps) / h
+
+
+def wall_sim(
+    layers: list, temp_ext: ndfloat, temp_int: ndfloat, dt: float,
+    nodes: int = 4, h_ext: ndfloat = None, h_int: ndfloat = None,
+    temp_0: ndfloat = None, stride: int = 1
+    ) -> tuple:
+    """Simulate layered wall temps and heat flux driven by air temps.
+
+    Crank-Nicolson is unconditionally stable, and 2nd order in time, so dt
+    can be hourly (EPW) or sub-hourly. Use more nodes per layer for thick,
+    massive layers, where the cell size should be comparable to the
+    penetration depth sqrt(alpha dt).
+
+    Usage:
+    .. code-block:: python
+
+        # N walls of brick | insulation | gypsum, ext to int
+        brick = mat.MaterialSet(hc=25.0, area=1.0, vol=d_brick, k=0.7,
+                                rho=1900.0, cp=840.0)
+        ...
+        temp_ext = weather['dry_bulb']                  # (8760,) [C]
+        ts_ext, ts_int, q_int = wall_sim(
+            [brick, insul, gypsum], temp_ext, 21.0, dt=3600.0)  # (N, 8760)
+
+    Args:
+        layers: list of Material (or MaterialSet), exterior to interior,
+            see wall_grid. Fields broadcast to walls of shape G.
+        temp_ext: exterior air temp series, of shape (nt,) or G + (nt,).
+        temp_int: interior air temp, scalar, (nt,) or G + (nt,).
+        dt: timestep of temp series [s].
+        nodes: number of cells per layer.
+        h_ext, h_int: exterior and interior film coefs [W/m2-K].
+        temp_0: initial cell temps, broadcastable to (n,) + G. Defaults to
+            steady state w/ initial air temps.
+        stride: record every stride-th step, to bound output memory.
+
+    Returns tuple of exterior surface temp, interior surface temp, and heat
+        flux into interior air [W/m2], each of shape G + (ceil(nt / stride),).
+    """
+    cap, cond = wall_grid(layers, nodes, h_ext, h_int)
+    h_ext = layers[0].hc if h_ext is None else h_ext
+    h_int = layers[-1].hc if h_int is None else h_int
+    temp_ext = np.asarray(temp_ext, dtype=np.float64)
+    temp_int = np.asarray(temp_int, dtype=np.float64)
+    if temp_int.ndim == 0:
+        temp_int = np.broadcast_to(temp_int, temp_ext.shape[-1:])
+    nt = temp_ext.shape[-1]
+    shape = np.broadcast_shapes(
+        cap.shape[1:], temp_ext.shape[:-1], temp_int.shape[:-1])
+    n = cap.shape[0]
+    cap = np.broadcast_to(cap, (n,) + shape)
+    cond = np.ascontiguousarray(np.broadcast_to(cond, (n + 1,) + shape))
+    lower, diag, upper = cn_factor(cap, cond, dt)
+    # Time-major for contiguous per-step reads
+    te = np.moveaxis(temp_ext, -1, 0)
+    ti = np.moveaxis(temp_int, -1, 0)
+
+    if temp_0 is None:
+        # Steady state, linear in cumulative resistance
+        res = np.cumsum(1.0 / cond, axis=0)
+        temp_0 = te[0] + (res[:-1] / res[-1]) * (ti[0] - te[0])
+    temp = np.array(np.broadcast_to(temp_0, (n,) + shape), dtype=np.float64)
+
+    n_out = (nt + stride - 1) // stride
+    ts_ext, ts_int, q_int = (np.empty((n_out,) + shape) for _ in range(3))
+
+    def record(j, temp, te_, ti_):
+        ts_ext[j] = surface_temps(temp[0], te_, cond[0], h_ext)
+        ts_int[j] = surface_temps(temp[-1], ti_, cond[-1], h_int)
+        q_int[j] = cond[-1] * (temp[-1] - ti_)
+
+    record(0, temp, te[0], ti[0])
+    half = 0.5 * cond
+    diag_rhs = cap / dt - half[:-1] - half[1:]
+    rhs = np.empty((n,) + shape)
+    for i in range(1, nt):
+        # rhs = (C/dt - K/2) T + (b[i-1] + b[i]) / 2
+        np.multiply(diag_rhs, temp, out=rhs)
+        rhs[1:] += half[1:-1] * temp[:-1]
+        rhs[:-1] += half[1:-1] * temp[1:]
+        rhs[0] += half[0] * (te[i - 1] + te[i])
+        rhs[-1] += half[-1] * (ti[i - 1] + ti[i])
+        # Forward and back sweeps w/ precomputed factors
+        for j in range(1, n):
+            rhs[j] -= lower[j] * rhs[j - 1]
+        temp[-1] = rhs[-1] / diag[-1]
+        for j in range(n - 2, -1, -1):
+            temp[j] = (rhs[j] - upper[j] * temp[j + 1]) / diag[j]
+        if i % stride == 0:
+            record(i // stride, temp, te[i], ti[i])
+
+    return tuple(np.moveaxis(x, 0, -1) for x in (ts_ext, ts_int, q_int))
@@ -0,0 +1,22 @@
+"""Content hashes used as cache keys (OSM and EPW caches, server images)."""
+
+import hashlib
+
+DIGEST_SIZE = 16  # 128 bit
+CHUNK = 2**20
+
+
+def digest(data:bytes) -> str:
+    """BLAKE2 content hash of bytes, as hex."""
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def file_hash(fpath:str) -> str:
+    """BLAKE2 content hash of file, read in chunks. Same as digest of its
+    bytes.
+    """
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(fpath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK), b''):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,116 @@
+"""Feather cache of OSM tables, invalidated by .osm content hash.
+
+Each table from extract.model_tables is written uncompressed to
+<stem>.<table>.fth next to the .osm (or in cache_dir), w/ the BLAKE2 hash of
+the .osm stored in the Arrow schema metadata. On load, files are
+memory-mapped, and used only if every table's hash matches the current
+.osm, so repeated analyses of an unchanged model skip parsing entirely.
+
+Usage:
+.. code-block:: python
+
+    tables = load_tables('ref.osm')
+    zones = extract.zone_materials(tables=tables)
+"""
+
+import os
+import numpy as np
+import pyarrow as pa
+from pyarrow import feather
+from egn.osm import parser, extract
+from egn.hashing import file_hash
+path = os.path
+
+
+HASH_KEY = b'egn_osm_hash'
+TABLES = ('materials', 'constructions', 'surfaces', 'zones', 'schedules')
+
+
+def cache_fpath(osm_fpath:str, table:str, cache_dir:str=None) -> str:
+    """Feather filepath of table for .osm file."""
+    cache_dir = path.dirname(path.abspath(osm_fpath)) \
+        if cache_dir is None else cache_dir
+    stem = path.splitext(path.basename(osm_fpath))[0]
+    return path.join(cache_dir, f'{stem}.{table}.fth')
+
+
+def to_arrow(table:dict, osm_hash:str) -> pa.Table:
+    """Dict of arrays to Arrow table, w/ 2D arrays as fixed size lists."""
+    cols = {}
+    for name, arr in table.items():
+        if arr.ndim == 2:
+            flat = pa.array(np.ascontiguousarray(arr).ravel())
+            cols[name] = pa.FixedSizeListArray.from_arrays(flat, arr.shape[1])
+        else:
+            cols[name] = pa.array(arr)
+    tbl = pa.table(cols)
+    return tbl.replace_schema_metadata({HASH_KEY: osm_hash.encode()})
+
+
+def from_arrow(tbl:pa.Table) -> dict:
+    """Arrow table to dict of arrays, zero-copy for numeric columns."""
+    table = {}
+    for name in tbl.column_names:
+        col = tbl.column(name).combine_chunks()
+        if pa.types.is_fixed_size_list(col.type):
+            vals = col.flatten().to_numpy(zero_copy_only=False)
+            table[name] = vals.reshape(-1, col.type.list_size)
+        elif pa.types.is_string(col.type):
+            table[name] = col.to_numpy(zero_copy_only=False).astype(str)
+        else:
+            table[name] = col.to_numpy(zero_copy_only=False)
+    return table
+
+
+def write_tables(tables:dict, osm_fpath:str, cache_dir:str=None,
+                 osm_hash:str=None) -> None:
+    """Write tables to Feather, tagged w/ hash of .osm."""
+    osm_hash = file_hash(osm_fpath) if osm_hash is None else osm_hash
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    for name, table in tables.items():
+        fpath = cache_fpath(osm_fpath, name, cache_dir)
+        tmp_fpath = fpath + '.tmp'
+        feather.write_feather(
+            to_arrow(table, osm_hash), tmp_fpath, compression='uncompressed')
+        os.replace(tmp_fpath, fpath)
+
+
+def read_tables(osm_fpath:str, cache_dir:str=None,
+                osm_hash:str=None) -> dict:
+    """Memory-map cached tables, or None if any are missing or stale."""
+    osm_hash = file_hash(osm_fpath) if osm_hash is None else osm_hash
+    tables = {}
+    for name in TABLES:
+        fpath = cache_fpath(osm_fpath, name, cache_dir)
+        if not path.isfile(fpath):
+            return None
+        tbl = feather.read_table(fpath, memory_map=True)
+        meta = tbl.schema.metadata or {}
+        if meta.get(HASH_KEY, b'').decode() != osm_hash:
+            return None
+        tables[name] = from_arrow(tbl)
+    return tables
+
+
+def load_tables(osm_fpath:str, cache_dir:str=None,
+                use_cache:bool=True) -> dict:
+    """Load OSM tables from cache, else parse .osm and rewrite cache.
+
+    Args:
+        osm_fpath: .osm filepath.
+        cache_dir: directory of Feather files, defaults to .osm directory.
+        use_cache: read/write cache if True, else always parse.
+
+    Returns dict of extract.model_tables.
+    """
+    osm_hash = file_hash(osm_fpath)
+    if use_cache:
+        tables = read_tables(osm_fpath, cache_dir, osm_hash)
+        if tables is not None:
+            return tables
+
+    tables = extract.model_tables(parser.read_osm(osm_fpath))
+    if use_cache:
+        write_tables(tables, osm_fpath, cache_dir, osm_hash)
+    return tables
@@ -0,0 +1,291 @@
+"""Extract lumped node materials per thermal zone from OSM models.
+
+Walks OS:Surface -> OS:Construction -> OS:Material, and builds columnar
+tables (dict of arrays) of materials, constructions, surfaces, zones and
+schedules. Surfaces are aggregated per OS:ThermalZone into a MaterialSet,
+w/ one row per zone, for batch lumped node evaluation.
+
+Usage:
+.. code-block:: python
+
+    model = parser.read_osm('ref.osm')
+    zones = zone_materials(model)           # MaterialSet, one row per zone
+    theta, valid = heat.lumped_node_batch(zones, nt)
+"""
+
+import numpy as np
+from egn.analytic import material as mat
+from egn.osm import parser
+
+
+HC_INTERIOR = 3.076  # [W/m2-K] EnergyPlus simple interior convection, wall
+
+# Field indices of OSM objects, from handle at 0
+SRF_TYPE, SRF_CONSTR, SRF_SPACE, SRF_BC, SRF_VERTS = 2, 3, 4, 5, 11
+SUBSRF_PARENT, SUBSRF_VERTS = 4, 10
+SPACE_STYPE, SPACE_SET, SPACE_STORY, SPACE_ZONE = 2, 3, 9, 10
+STYPE_SET, STORY_SET, BLDG_STYPE, BLDG_SET = 2, 4, 5, 6
+CONSTR_LAYERS = 3
+# Thermal resistance of massless materials by type
+MAT_R = {'OS:Material:NoMass': 3, 'OS:Material:AirGap': 2}
+SCHED_DAY_VALUES, SCHED_RULESET_DAY = 4, 3
+# OS:DefaultConstructionSet surface constructions by boundary condition
+SET_EXT, SET_INT, SET_GND = 2, 3, 4
+# OS:DefaultSurfaceConstructions by surface type
+DSC_IDX = {'Floor': 2, 'Wall': 3, 'RoofCeiling': 4}
+
+
+def polygon_area(verts:np.ndarray) -> np.ndarray:
+    """Area of planar 3D polygons by Newell's method.
+
+    Args:
+        verts: (S, M, 3) vertices of S polygons, padded by repeating the
+            last vertex for polygons w/ less than M vertices.
+
+    Returns (S,) areas.
+    """
+    cross = np.cross(verts, np.roll(verts, -1, axis=1)).sum(axis=1)
+    return 0.5 * np.linalg.norm(cross, axis=-1)
+
+
+def _verts(objs:list, start:int) -> np.ndarray:
+    """(S, M, 3) padded vertex array from objects' vertex fields."""
+    pts = [np.array(o.floats(start)).reshape(-1, 3) for o in objs]
+    m = max((len(p) for p in pts), default=1)
+    verts = np.zeros((len(objs), m, 3))
+    for i, p in enumerate(pts):
+        verts[i, :len(p)] = p
+        verts[i, len(p):] = p[-1]
+    return verts
+
+
+def material_table(model:parser.OSMModel) -> dict:
+    """Table of OS:Material, OS:Material:NoMass and OS:Material:AirGap.
+
+    Massless layers have zero thickness and only thermal resistance.
+
+    Returns dict of handle, name, thickness [m], k [W/m-K], rho [kg/m3],
+        cp [J/kg-K] and r [m2-K/W] arrays.
+    """
+    objs, rows = [], []
+    for o in model.objects('OS:Material'):
+        t, k, rho, cp = o.floats(3, 7)
+        objs.append(o)
+        rows.append((t, k, rho, cp, t / k))
+    for obj_type, i in MAT_R.items():
+        for o in model.objects(obj_type):
+            objs.append(o)
+            rows.append((0.0, np.nan, 0.0, 0.0, float(o[i])))
+    vals = np.array(rows, dtype=np.float64).reshape(-1, 5)
+    return {
+        'handle': np.array([o.handle for o in objs], dtype=str),
+        'name': np.array([o.name for o in objs], dtype=str),
+        'thickness': vals[:, 0], 'k': vals[:, 1], 'rho': vals[:, 2],
+        'cp': vals[:, 3], 'r': vals[:, 4]}
+
+
+def construction_table(model:parser.OSMModel, materials:dict=None) -> dict:
+    """Table of OS:Construction w/ layer properties summed per construction.
+
+    Returns dict of handle, name, thickness [m], r [m2-K/W], mass [kg/m2]
+        and heat_cap [J/m2-K] arrays, per unit area.
+    """
+    materials = material_table(model) if materials is None else materials
+    mat_idx = {h: i for i, h in enumerate(materials['handle'])}
+    t, r = materials['thickness'], materials['r']
+    mass = t * materials['rho']
+    heat_cap = mass * materials['cp']
+
+    objs = [o for o in model.objects('OS:Construction')]
+    # Sparse (construction, layer) pairs, reduced w/ bincount
+    ci, li = [], []
+    for i, o in enumerate(objs):
+        for h in o.fields[CONSTR_LAYERS:]:
+            if h in mat_idx:
+                ci.append(i)
+                li.append(mat_idx[h])
+    ci, li = np.array(ci, dtype=int), np.array(li, dtype=int)
+    n = len(objs)
+    return {
+        'handle': np.array([o.handle for o in objs], dtype=str),
+        'name': np.array([o.name for o in objs], dtype=str),
+        'thickness': np.bincount(ci, t[li], minlength=n),
+        'r': np.bincount(ci, r[li], minlength=n),
+        'mass': np.bincount(ci, mass[li], minlength=n),
+        'heat_cap': np.bincount(ci, heat_cap[li], minlength=n)}
+
+
+def _default_sets(space:parser.OSMObject) -> list:
+    """Default construction sets that apply to space, in priority order."""
+    model = space.model
+    stype, story = space.ref(SPACE_STYPE), space.ref(SPACE_STORY)
+    sets = [space.ref(SPACE_SET),
+            stype.ref(STYPE_SET) if stype else None,
+            story.ref(STORY_SET) if story else None]
+    for bldg in model.objects('OS:Building'):
+        btype = bldg.ref(BLDG_STYPE)
+        sets += [bldg.ref(BLDG_SET), btype.ref(STYPE_SET) if btype else None]
+    return [s for s in sets if s is not None]
+
+
+def surface_construction(srf:parser.OSMObject) -> parser.OSMObject:
+    """Construction of surface, or its default from construction sets."""
+    constr = srf.ref(SRF_CONSTR)
+    space = srf.ref(SRF_SPACE)
+    if constr is not None or space is None:
+        return constr
+    bc = srf.get(SRF_BC)
+    if bc == 'Outdoors':
+        set_idx = SET_EXT
+    elif bc.startswith(('Ground', 'Foundation')):
+        set_idx = SET_GND
+    else:
+        set_idx = SET_INT
+    dsc_idx = DSC_IDX.get(srf.get(SRF_TYPE))
+    for cset in _default_sets(space):
+        dsc = cset.ref(set_idx)
+        constr = dsc.ref(dsc_idx) if dsc and dsc_idx else None
+        if constr is not None:
+            return constr
+    return None
+
+
+def surface_table(model:parser.OSMModel) -> dict:
+    """Table of OS:Surface w/ zone, construction and net opaque area.
+
+    Net area is the gross vertex area less the area of child OS:SubSurfaces.
+
+    Returns dict of handle, name, srf_type, bc, zone, constr (handles), and
+        gross_area, area [m2] arrays.
+    """
+    srfs = model.objects('OS:Surface')
+    gross = polygon_area(_verts(srfs, SRF_VERTS))
+    srf_idx = {s.handle: i for i, s in enumerate(srfs)}
+
+    subs = model.objects('OS:SubSurface')
+    sub_area = polygon_area(_verts(subs, SUBSRF_VERTS))
+    parent = np.array([srf_idx.get(s.get(SUBSRF_PARENT), -1) for s in subs],
+                      dtype=int)
+    keep = parent >= 0
+    area = gross - np.bincount(parent[keep], sub_area[keep],
+                               minlength=len(srfs))
+
+    zones, constrs = [], []
+    for s in srfs:
+        space = s.ref(SRF_SPACE)
+        zone = space.ref(SPACE_ZONE) if space else None
+        constr = surface_construction(s)
+        zones.append(zone.handle if zone else '')
+        constrs.append(constr.handle if constr else '')
+    return {
+        'handle': np.array([s.handle for s in srfs], dtype=str),
+        'name': np.array([s.name for s in srfs], dtype=str),
+        'srf_type': np.array([s.get(SRF_TYPE) for s in srfs], dtype=str),
+        'bc': np.array([s.get(SRF_BC) for s in srfs], dtype=str),
+        'zone': np.array(zones, dtype=str),
+        'constr': np.array(constrs, dtype=str),
+        'gross_area': gross, 'area': area}
+
+
+def zone_table(model:parser.OSMModel) -> dict:
+    """Table of OS:ThermalZone handle and name."""
+    zones = model.objects('OS:ThermalZone')
+    return {
+        'handle': np.array([z.handle for z in zones], dtype=str),
+        'name': np.array([z.name for z in zones], dtype=str)}
+
+
+def day_values(day:parser.OSMObject) -> np.ndarray:
+    """Hourly (24,) values of OS:Schedule:Day from (hour, minute, value)."""
+    vals = np.array(day.floats(SCHED_DAY_VALUES)).reshape(-1, 3)
+    until = vals[:, 0] + (vals[:, 1] / 60.0)
+    idx = np.searchsorted(until, np.arange(24), side='right')
+    return vals[np.minimum(idx, len(vals) - 1), 2]
+
+
+def schedule_table(model:parser.OSMModel) -> dict:
+    """Table of day, constant and ruleset schedules as hourly profiles.
+
+    OS:Schedule:Ruleset rows hold the profile of their default day schedule,
+    rules are not applied.
+
+    Returns dict of handle, name, sched_type, day (default day handle) and
+        values (N, 24) arrays.
+    """
+    rows = []
+    for o in model.objects('OS:Schedule:Day'):
+        rows.append((o, '', day_values(o)))
+    for o in model.objects('OS:Schedule:Constant'):
+        rows.append((o, '', np.full(24, float(o[3]))))
+    for o in model.objects('OS:Schedule:Ruleset'):
+        day = o.ref(SCHED_RULESET_DAY)
+        vals = day_values(day) if day else np.full(24, np.nan)
+        rows.append((o, day.handle if day else '', vals))
+    return {
+        'handle': np.array([r[0].handle for r in rows], dtype=str),
+        'name': np.array([r[0].name for r in rows], dtype=str),
+        'sched_type': np.array([r[0].type for r in rows], dtype=str),
+        'day': np.array([r[1] for r in rows], dtype=str),
+        'values': np.array([r[2] for r in rows]).reshape(-1, 24)}
+
+
+def zone_materials(model:parser.OSMModel=None, hc:float=HC_INTERIOR,
+                   tables:dict=None) -> mat.MaterialSet:
+    """Aggregate opaque surface constructions into one lumped node per zone.
+
+    Per zone, w/ surface net area A_i and construction thickness t_i:
+        area = sum(A_i)
+        vol = sum(A_i t_i)
+        rho = sum(A_i mass_i) / vol
+        cp = sum(A_i heat_cap_i) / sum(A_i mass_i)
+        k = vol / sum(A_i r_i), so Lc / k matches the mean layer resistance
+    Surfaces w/ an interzone ('Surface') boundary condition contribute half
+    their construction, since the other half belongs to the adjacent zone.
+    Surfaces w/o a layered OS:Construction (i.e. F-factor ground floors) are
+    excluded.
+
+    Args:
+        model: parsed OSMModel, not needed if tables given.
+        hc: interior convective coefficient [W/m2-K].
+        tables: optional dict of model_tables, i.e. from cache, to skip
+            parsing and rebuilding them.
+
+    Returns MaterialSet w/ one row per OS:ThermalZone, named by zone.
+    """
+    if tables is None:
+        tables = model_tables(model)
+    constrs, srfs = tables['constructions'], tables['surfaces']
+    zones = tables['zones']
+
+    zone_idx = {h: i for i, h in enumerate(zones['handle'])}
+    constr_idx = {h: i for i, h in enumerate(constrs['handle'])}
+    zi = np.array([zone_idx.get(h, -1) for h in srfs['zone']], dtype=int)
+    ci = np.array([constr_idx.get(h, -1) for h in srfs['constr']], dtype=int)
+    keep = (zi >= 0) & (ci >= 0)
+    zi, ci = zi[keep], ci[keep]
+    area = srfs['area'][keep]
+    frac = np.where(srfs['bc'][keep] == 'Surface', 0.5, 1.0)
+
+    n = len(zones['handle'])
+    _sum = (lambda x: np.bincount(zi, x, minlength=n))
+    zone_area = _sum(area)
+    zone_vol = _sum(area * frac * constrs['thickness'][ci])
+    zone_mass = _sum(area * frac * constrs['mass'][ci])
+    zone_heat_cap = _sum(area * frac * constrs['heat_cap'][ci])
+    zone_r = _sum(area * frac * constrs['r'][ci])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return mat.MaterialSet(
+            hc=hc, area=zone_area, vol=zone_vol, k=zone_vol / zone_r,
+            rho=zone_mass / zone_vol, cp=zone_heat_cap / zone_mass,
+            names=zones['name'])
+
+
+def model_tables(model:parser.OSMModel) -> dict:
+    """Material, construction, surface, zone and schedule tables of model."""
+    materials = material_table(model)
+    return {
+        'materials': materials,
+        'constructions': construction_table(model, materials),
+        'surfaces': surface_table(model),
+        'zones': zone_table(model),
+        'schedules': schedule_table(model)}
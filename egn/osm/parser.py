@@ -0,0 +1,149 @@
+"""Streaming OpenStudio model (OSM) parser.
+
+Pure python alternative to loading the openstudio SDK, for reading objects
+out of an .osm file. Objects are streamed one at a time, and indexed by
+handle and type. References ({uuid} fields) are resolved lazily.
+
+Usage:
+.. code-block:: python
+
+    model = read_osm('ref.osm')
+    for srf in model.objects('OS:Surface'):
+        space = srf.ref(4)          # OS:Space, resolved on access
+        zone = space.ref(10)        # OS:ThermalZone
+
+    # Only index what's needed
+    model = read_osm('ref.osm', types={'OS:Material', 'OS:Surface'})
+"""
+
+import typing as typ
+
+
+def _is_handle(value:str) -> bool:
+    return value.startswith('{') and value.endswith('}')
+
+
+class OSMObject:
+    """OSM object as type and list of str fields.
+
+    Fields are indexed from the handle, i.e. fields[0] is the handle and
+    fields[1] is typically the name.
+    """
+    __slots__ = ('type', 'fields', 'model')
+
+    def __init__(self, obj_type:str, fields:list, model=None):
+        self.type = obj_type
+        self.fields = fields
+        self.model = model
+
+    def __repr__(self):
+        return f"OSMObject({self.type}, {self.name})"
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __getitem__(self, i):
+        return self.fields[i]
+
+    @property
+    def handle(self) -> str:
+        return self.fields[0]
+
+    @property
+    def name(self) -> str:
+        return self.fields[1] if len(self.fields) > 1 else ''
+
+    def get(self, i:int, default:str='') -> str:
+        """Field i, or default if missing or empty."""
+        if i < len(self.fields) and self.fields[i]:
+            return self.fields[i]
+        return default
+
+    def ref(self, i:int):
+        """Resolve {uuid} field i to OSMObject, or None if empty/unindexed."""
+        value = self.get(i)
+        if self.model is None or not _is_handle(value):
+            return None
+        return self.model.get(value)
+
+    def refs(self, start:int=0, stop:int=None) -> list:
+        """Resolve all {uuid} fields in range to OSMObjects."""
+        return [self.model.get(v) for v in self.fields[start:stop]
+                if _is_handle(v)]
+
+    def floats(self, start:int=0, stop:int=None) -> list:
+        """Fields in range as floats."""
+        return [float(v) for v in self.fields[start:stop]]
+
+
+def iter_objects(lines:typ.Iterable[str], types:set=None) -> typ.Iterator:
+    """Stream (type, fields) tuples from lines of an .osm file.
+
+    Objects are comma-separated fields terminated by ';', w/ '!' comments.
+    Only objects w/ type in types are split into fields, if given.
+
+    Args:
+        lines: iterable of lines, i.e. open file.
+        types: optional set of object types to yield.
+
+    Yields tuple of object type and list of str fields.
+    """
+    buf = []
+    for line in lines:
+        code = line.split('!', 1)[0].strip()
+        if not code:
+            continue
+        buf.append(code)
+        if not code.endswith(';'):
+            continue
+        text = ''.join(buf)[:-1]
+        buf = []
+        obj_type, _, text = text.partition(',')
+        if types is not None and obj_type not in types:
+            continue
+        yield obj_type, [v.strip() for v in text.split(',')]
+
+
+class OSMModel:
+    """Index of OSMObjects by handle and by type."""
+
+    def __init__(self, objects:typ.Iterable = ()):
+        self.by_handle = {}
+        self.by_type = {}
+        for obj in objects:
+            self.add(obj)
+
+    def __len__(self):
+        return len(self.by_handle)
+
+    def add(self, obj:OSMObject) -> None:
+        obj.model = self
+        self.by_handle[obj.handle] = obj
+        self.by_type.setdefault(obj.type, []).append(obj)
+
+    def get(self, handle:str) -> OSMObject:
+        """Object by {uuid} handle, or None."""
+        return self.by_handle.get(handle)
+
+    def objects(self, obj_type:str) -> list:
+        """All objects of type, i.e. 'OS:Surface'."""
+        return self.by_type.get(obj_type, [])
+
+    def types(self) -> list:
+        return list(self.by_type.keys())
+
+
+def read_osm(fpath:str, types:set=None) -> OSMModel:
+    """Read .osm file into OSMModel, streaming objects from disk.
+
+    Args:
+        fpath: .osm filepath.
+        types: optional set of object types to index, others are skipped.
+
+    Returns OSMModel.
+    """
+    model = OSMModel()
+    with open(fpath, 'r') as f:
+        for obj_type, fields in iter_objects(f, types):
+            model.add(OSMObject(obj_type, fields))
+    return model
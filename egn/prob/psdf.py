@@ -10,22 +10,97 @@ x_vec: x_org + x_dir
 """
 
 
+def _as_columns(b_vec:npt.NDArray[float], dim:int) -> npt.NDArray[float]:
+    """Points as (d, N) columns, from (d,), (d, N) or (N, d) arrays.
+
+    If ambiguous (N == d), points are assumed to be columns (d, N).
+    """
+    b_vec = np.asarray(b_vec, dtype=np.float64)
+    if b_vec.ndim == 1:
+        return b_vec[:, np.newaxis]
+    if b_vec.shape[0] != dim and b_vec.shape[-1] == dim:
+        return b_vec.T
+    return b_vec
+
+
+def _squeeze(dist:npt.NDArray[float], b_vec:npt.NDArray[float]):
+    """Scalar distance for single (d,) point, else (N,) distances."""
+    return dist[0] if np.ndim(b_vec) == 1 else dist
+
+
 def point_sdf(a_vec:npt.NDArray[float]) -> Callable:
-    """Returns SDF for shape vector A given input vector B."""
+    """Returns SDF for shape vector A given input vector B.
+
+    B can be a (d,) point, or batch of (d, N) or (N, d) points.
+    """
+    a_vec = np.asarray(a_vec, dtype=np.float64).reshape(-1, 1)
+    dim = a_vec.shape[0]
 
-    def _point_fn(b_vec:npt.NDArray[float]) -> np.float64:
-        return np.linalg.norm(b_vec - a_vec)
+    def _point_fn(b_vec:npt.NDArray[float]) -> npt.NDArray[float]:
+        c_vec = _as_columns(b_vec, dim) - a_vec
+        return _squeeze(np.linalg.norm(c_vec, axis=0), b_vec)
 
     return _point_fn
 
 
 def circle_sdf(a_vec:npt.NDArray[float], radius:float) -> Callable:
-    """Circle SDF."""
+    """Circle SDF.
 
-    def _circle_fn(b_vec:npt.NDArray[float]) -> np.float64:
-        c_vec = b_vec - a_vec  # vector pointing from A to B
-        return radius - np.linalg.norm(c_vec)
+    B can be a (d,) point, or batch of (d, N) or (N, d) points.
+    """
+    a_vec = np.asarray(a_vec, dtype=np.float64).reshape(-1, 1)
+    dim = a_vec.shape[0]
+
+    def _circle_fn(b_vec:npt.NDArray[float]) -> npt.NDArray[float]:
+        c_vec = _as_columns(b_vec, dim) - a_vec  # vector pointing from A to B
+        return _squeeze(radius - np.linalg.norm(c_vec, axis=0), b_vec)
 
     return _circle_fn
 
 
+def grid_points(bounds:list, shape:tuple, idx:npt.NDArray[int]
+                ) -> npt.NDArray[float]:
+    """(d, N) points of lattice at flat indices idx.
+
+    Lattice axis i spans bounds[i] = (lo, hi) w/ shape[i] samples, i.e.
+    point coordinate i varies along array axis i (ij indexing).
+    """
+    sub = np.unravel_index(idx, shape)
+    pts = np.empty((len(shape), len(idx)))
+    for i, ((lo, hi), n) in enumerate(zip(bounds, shape)):
+        step = (hi - lo) / (n - 1) if n > 1 else 0.0
+        np.multiply(sub[i], step, out=pts[i])
+        pts[i] += lo
+    return pts
+
+
+def sample_grid(sdf:Callable, bounds:list, shape:tuple,
+                chunk_size:int=2**16) -> npt.NDArray[float]:
+    """Evaluate SDF on 2D (H, W) or 3D (D, H, W) lattice in chunks.
+
+    Only chunk_size points are materialized at a time, so memory is bounded
+    regardless of lattice size.
+
+    Usage:
+    .. code-block:: python
+
+        sdf = circle_sdf(np.array([0, 0]), 1.0)
+        dist = sample_grid(sdf, [(-2, 2), (-2, 2)], (1024, 1024))
+
+    Args:
+        sdf: SDF closure accepting (d, N) points.
+        bounds: (lo, hi) of each lattice axis.
+        shape: number of samples per lattice axis.
+        chunk_size: number of points per SDF evaluation.
+
+    Returns SDF values of lattice shape.
+    """
+    shape = tuple(shape)
+    assert len(bounds) == len(shape), \
+        f"Got {len(bounds)} bounds for {len(shape)}D lattice."
+    out = np.empty(int(np.prod(shape)))
+    for start in range(0, out.size, chunk_size):
+        stop = min(start + chunk_size, out.size)
+        idx = np.arange(start, stop)
+        out[start:stop] = sdf(grid_points(bounds, shape, idx))
+    return out.reshape(shape)
@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+
+
+# Width buckets [px], so clients w/ similar viewports share encodes
+WIDTHS = (320, 480, 640, 960, 1280, 1920, 2560, 3840)
+# (min downlink [Mbps], JPEG quality), highest first
+QUALITIES = ((10.0, 90), (2.0, 80), (0.5, 70), (0.0, 50))
+# Round trip time [ms] above which quality drops one level
+SLOW_RTT = 300.0
+DEFAULT_PROFILE = {'width': 640, 'quality': 90}
+
+
+def bucket_width(width:float) -> int:
+    """Smallest width bucket >= width."""
+    for w in WIDTHS:
+        if w >= width:
+            return w
+    return WIDTHS[-1]
+
+
+def _number(viewport:dict, key:str) -> float:
+    """Finite float of viewport field, or None if missing or malformed."""
+    try:
+        value = float(viewport[key])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) else None
+
+
+def negotiate(viewport:dict) -> dict:
+    """Pick image width and JPEG quality for client viewport and network.
+
+    Args:
+        viewport: dict w/ 'width' [device px], and optional 'downlink'
+            bandwidth [Mbps] and 'rtt' [ms] (i.e. browser
+            navigator.connection), or 'quality' to force quality. Comes
+            from clients, so malformed fields fall back to DEFAULT_PROFILE.
+
+    Returns profile dict w/ 'width' and 'quality'.
+    """
+    if not isinstance(viewport, dict):
+        return dict(DEFAULT_PROFILE)
+    width = _number(viewport, 'width') or DEFAULT_PROFILE['width']
+    quality = _number(viewport, 'quality')
+    if quality:
+        return {'width': bucket_width(width),
+                'quality': int(np.clip(quality, 10, 95))}
+    downlink = _number(viewport, 'downlink')
+    if downlink is None:
+        return {'width': bucket_width(width),
+                'quality': DEFAULT_PROFILE['quality']}
+    level = next((i for i, (bw, _) in enumerate(QUALITIES) if downlink >= bw),
+                 len(QUALITIES) - 1)
+    if (_number(viewport, 'rtt') or 0.0) > SLOW_RTT:
+        level = min(level + 1, len(QUALITIES) - 1)
+    return {'width': bucket_width(width), 'quality': QUALITIES[level][1]}
+
+
+def resize_width(image:np.ndarray, width:int) -> np.ndarray:
+    """Downscale image to width, keeping aspect. Doesn't upscale."""
+    h, w = image.shape[:2]
+    if w <= width:
+        return image
+    height = max(1, round(h * width / w))
+    return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def variant(data:bytes, width:int, quality:int) -> bytes:
+    """Encoded image downscaled to width, as JPEG of quality."""
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    image = resize_width(image, width)
+    _, encoded = cv2.imencode(
+        ".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return encoded.tobytes()
@@ -1,11 +1,21 @@
 import base64
 import os
+import time
 import cv2
 import numpy as np
 import numpy.typing as npt
-from flask import Flask, session, request, url_for, redirect
+from flask import Flask, request, url_for, redirect, abort, g
 from flask_socketio import SocketIO, emit
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
 from jinja2 import Environment, PackageLoader, select_autoescape
+import imgio
+import frames
+import history
+import imgcache
+import adapt
+import delta
+import metrics
 
 
 app = Flask(__name__, static_folder="./templates/static")
@@ -20,9 +30,97 @@ ENV = Environment(
     lstrip_blocks=True,         # remove leading space/tabs from block start
     keep_trailing_newline=True  # keep newline at end of template
 )
+# Bounded server side history of posted items, replayed to new clients
+HISTORY = history.History(
+    maxlen=int(os.environ.get("EGN_HISTORY_LEN", 100)),
+    spill_dir=os.environ.get("EGN_HISTORY_DIR"))
+# Number of items per channel replayed on connect
+REPLAY = {'text': int(os.environ.get("EGN_REPLAY_TEXT", 10)),
+          'image': int(os.environ.get("EGN_REPLAY_IMAGE", 1))}
+# Content addressed cache of posted images, served from /frame/<key>
+IMAGE_CACHE = imgcache.ImageCache(
+    max_bytes=int(os.environ.get("EGN_IMAGE_CACHE_MB", 256)) * 2**20)
+LAST_IMAGE_KEY = None
+# Negotiated image width and quality per client sid
+PROFILES = {}
+# If EGN_DELTA is set, stream images as changed tiles vs last image
+DELTA = delta.TileDiffer(
+    tile=int(os.environ.get("EGN_DELTA_TILE", 64)),
+    keyframe_every=int(os.environ.get("EGN_DELTA_KEYFRAME", 60))
+    ) if os.environ.get("EGN_DELTA") else None
+DELTA_LOCK = Semaphore(1)
+# Connected client sids
+CLIENTS = set()
+
+# Instrumentation, exposed as Prometheus text on /metrics
+METRICS = metrics.Registry()
+HTTP_SECONDS = METRICS.histogram(
+    'egn_http_request_seconds', 'HTTP request latency.',
+    ('route', 'method', 'status'))
+EVENT_SECONDS = METRICS.histogram(
+    'egn_socketio_event_seconds', 'Socket.IO event handler latency.',
+    ('event',))
+STAGE_SECONDS = METRICS.histogram(
+    'egn_stage_seconds', 'Image pipeline stage time.', ('pipeline', 'stage'))
+PAYLOAD_BYTES = METRICS.histogram(
+    'egn_payload_bytes', 'Received and sent payload size.', ('kind',),
+    buckets=metrics.SIZE_BUCKETS)
+METRICS.gauge('egn_connected_clients', 'Connected Socket.IO clients.',
+              fn=lambda: len(CLIENTS))
+METRICS.gauge('egn_frame_queue_depth', 'Frames pending in frame pool.',
+              fn=lambda: FRAME_POOL.queue_depth)
+METRICS.gauge('egn_frame_active_clients', 'Clients w/ frames processing.',
+              fn=lambda: FRAME_POOL.active_clients)
+METRICS.counter('egn_frames_processed_total', 'Frames processed.',
+                fn=lambda: FRAME_POOL.n_processed)
+METRICS.counter('egn_frames_dropped_total', 'Stale frames dropped.',
+                fn=lambda: FRAME_POOL.n_dropped)
+METRICS.counter('egn_frame_errors_total', 'Frame processing errors.',
+                fn=lambda: FRAME_POOL.n_errors)
+METRICS.gauge('egn_image_cache_bytes', 'Image cache size.',
+              fn=lambda: IMAGE_CACHE.n_bytes)
+METRICS.gauge('egn_image_cache_entries', 'Image cache entries.',
+              fn=lambda: len(IMAGE_CACHE))
+METRICS.counter('egn_image_cache_hits_total', 'Image cache hits.',
+                fn=lambda: IMAGE_CACHE.n_hits)
+METRICS.counter('egn_image_cache_misses_total', 'Image cache misses.',
+                fn=lambda: IMAGE_CACHE.n_misses)
+METRICS.counter('egn_images_posted_total', 'Images posted.',
+                fn=lambda: HISTORY.count('image'))
+METRICS.counter('egn_texts_posted_total', 'Texts posted.',
+                fn=lambda: HISTORY.count('text'))
+# Sampling profiler, toggled from /profile/start and /profile/stop
+PROFILER = metrics.Sampler(
+    interval=float(os.environ.get("EGN_PROFILE_INTERVAL", 0.005)))
+if os.environ.get("EGN_PROFILE"):
+    PROFILER.start()
+
+
+@app.before_request
+def start_timer():
+    g.t0 = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    """Record latency and payload sizes of every route."""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_SECONDS.observe(time.perf_counter() - g.t0, route=route,
+                         method=request.method, status=response.status_code)
+    if request.content_length:
+        PAYLOAD_BYTES.observe(request.content_length, kind=f'recv {route}')
+    if response.content_length:
+        PAYLOAD_BYTES.observe(response.content_length, kind=f'send {route}')
+    return response
+
+
+def observe_stages(pipeline:str, timings:dict) -> None:
+    for stage, dt in timings.items():
+        STAGE_SECONDS.observe(dt, pipeline=pipeline, stage=stage)
 
 
 @socketio.on("connect")
+@EVENT_SECONDS.time(event="connect")
 def test_connect():
     """Send message to client from server to confirm client-server connection.
 
@@ -32,8 +130,19 @@ def test_connect():
     Returns A 'connected' string
     """
     print("Connected")
+    CLIENTS.add(request.sid)
     # emit("connect_response", {"data": "Connected"})
     emit(event="connect_response", data={"data": "Connected"}, callback=None)
+    # Replay recent history, so late joining clients see current state
+    if DELTA is not None:
+        send_keyframe()
+    else:
+        for entry in HISTORY.last('image', REPLAY['image']):
+            if entry['key']:
+                IMAGE_CACHE.put(entry)  # in case evicted
+            emit('stream_image', image_message(entry))
+    for text in HISTORY.last('text', REPLAY['text']):
+        emit('stream_text', text)
 
 
 def base64_to_image(base64_str:str)->npt.NDArray:
@@ -57,27 +166,151 @@ def base64_to_image(base64_str:str)->npt.NDArray:
     return image
 
 
-@socketio.on("image")
-def receive_image(image:str):
-    """Receive base64 string image, convert to string and sends to client.
+def process_image(image:str, width:int=640, quality:int=90) -> tuple:
+    """Decode base64 image, convert to gray jpg of width, encode as data uri.
 
     Args:
-        image: Pass the image data to the receive_image function
+        image: base64 encoded image string.
+        width: max width of output, aspect is kept.
+        quality: JPEG quality.
 
-    Returns the image that was received from the client
+    Returns tuple of image data uri, and dict of stage timings [s].
     """
+    timings = {}
+    t0 = time.perf_counter()
     # Decode the base64-encoded image data
     image = base64_to_image(image)
+    t1 = time.perf_counter()
+    timings['decode'] = t1 - t0
 
     # Image processing (convert RGB to color)
     gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    frame_resized = cv2.resize(gray, (640, 360))
+    frame_resized = adapt.resize_width(gray, width)
+    t2 = time.perf_counter()
+    timings['cv2'] = t2 - t1
+
     # Encode image to string
-    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 90]
+    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
     _, frame_encoded = cv2.imencode(".jpg", frame_resized, encode_param)
     image_uri_ = base64.b64encode(frame_encoded).decode()
     image_uri = "data:image/jpg;base64," + image_uri_
-    emit("processed_image", image_uri)
+    timings['encode'] = time.perf_counter() - t2
+    return image_uri, timings
+
+
+# Process frames off the eventlet hub, dropping stale frames per client
+FRAME_POOL = frames.FramePool(
+    process=lambda frame: process_image(*frame),
+    emit=lambda sid, uri: socketio.emit("processed_image", uri, room=sid),
+    max_workers=int(os.environ.get("EGN_FRAME_WORKERS", 4)),
+    observe=lambda timings: observe_stages('frame', timings))
+
+
+@socketio.on("image")
+@EVENT_SECONDS.time(event="image")
+def receive_image(image:str):
+    """Receive base64 string image, queue processing and send to client.
+
+    The latest frame per client is processed in the frame pool, at the
+    client's negotiated width and quality, and the processed image is
+    emitted to the client as "processed_image".
+
+    Args:
+        image: Pass the image data to the receive_image function
+    """
+    PAYLOAD_BYTES.observe(len(image), kind='recv image')
+    profile = PROFILES.get(request.sid, adapt.DEFAULT_PROFILE)
+    FRAME_POOL.submit(
+        request.sid, (image, profile['width'], profile['quality']))
+
+
+@socketio.on("viewport")
+@EVENT_SECONDS.time(event="viewport")
+def viewport(viewport:dict):
+    """Negotiate image width and quality from client viewport and network.
+
+    Args:
+        viewport: dict w/ 'width' [device px], and optional 'downlink'
+            [Mbps], 'rtt' [ms] or 'quality', see adapt.negotiate.
+    """
+    profile = adapt.negotiate(viewport)
+    PROFILES[request.sid] = profile
+    emit('profile', profile)
+
+
+@socketio.on("keyframe")
+@EVENT_SECONDS.time(event="keyframe")
+def keyframe():
+    """Send full frame of delta stream to client, i.e. after missed delta."""
+    send_keyframe()
+
+
+def send_keyframe() -> None:
+    if DELTA is None:  # not in delta mode, clients get stream_image
+        return
+    with DELTA_LOCK:
+        message = tpool.execute(DELTA.keyframe)
+    if message is not None:
+        emit('stream_delta', message)
+
+
+@socketio.on("disconnect")
+@EVENT_SECONDS.time(event="disconnect")
+def test_disconnect():
+    """Discard pending frames and profile of disconnected client."""
+    FRAME_POOL.discard(request.sid)
+    PROFILES.pop(request.sid, None)
+    CLIENTS.discard(request.sid)
+
+
+@app.route("/profiles", methods=['GET'])
+def profiles():
+    """Largest negotiated image width and quality over clients.
+
+    Image producers can render at this size, instead of a fixed dpi.
+    """
+    ps = list(PROFILES.values()) or [adapt.DEFAULT_PROFILE]
+    return {'clients': len(PROFILES),
+            'width': max(p['width'] for p in ps),
+            'quality': max(p['quality'] for p in ps)}
+
+
+@app.route("/frame_stats", methods=['GET'])
+def frame_stats():
+    """Frame pool queue depth, drop counts and stage timings."""
+    return FRAME_POOL.stats()
+
+
+@app.route("/metrics", methods=['GET'])
+def metrics_text():
+    """Metrics in Prometheus text format."""
+    return app.response_class(
+        METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route("/profile/<action>", methods=['GET', 'POST'])
+def profile(action:str):
+    """Toggle sampling profiler w/ start and stop, or get its stacks.
+
+    start, stop and clear change state, so are POST only (not triggered by
+    link prefetch or crawlers), stacks is GET. Stacks are in collapsed
+    format, i.e. for flamegraph.pl:
+        $ curl -X POST localhost:8100/profile/start
+        $ curl -X POST localhost:8100/profile/stop > egn.folded
+    """
+    if action not in ('start', 'stop', 'clear', 'stacks'):
+        abort(404)
+    if action != 'stacks' and request.method != 'POST':
+        abort(405)
+    if action == 'start':
+        PROFILER.stacks.clear()
+        PROFILER.start()
+        return {'running': True}
+    if action == 'stop':
+        PROFILER.stop()
+    elif action == 'clear':
+        PROFILER.stacks.clear()
+    return app.response_class(PROFILER.collapsed(), mimetype='text/plain')
 
 
 @app.route("/status", methods=['GET'])
@@ -86,44 +319,167 @@ def status():
     return { 'statusCode': 200 }
 
 
+def request_image_bytes() -> bytes:
+    """Raw image bytes from octet-stream, multipart or base64 json request.
+
+    Binary bodies avoid the ~33% base64 overhead, and the decode. The json
+    {'message': base64_str} body is still accepted for older clients.
+    """
+    if request.mimetype == 'application/json':
+        return base64.b64decode(request.get_json()['message'])
+    if request.files:
+        return next(iter(request.files.values())).read()
+    return request.get_data()
+
+
+def image_message(entry:dict) -> dict:
+    """Stream_image message of cache entry, clients fetch image from url."""
+    url = f"/frame/{entry['key']}" if entry['key'] else ""
+    return {'url':url, 'mime':entry['mime'], 'stats':entry['stats']}
+
+
+def broadcast_image(image_bytes:bytes) -> None:
+    """Store image in history and stream it to all clients.
+
+    Images are keyed by content hash. A repost of the image clients already
+    show is ignored, and a repost of an older cached image isn't probed
+    again. Image dimensions are read from the header, so the image isn't
+    decoded, and clients fetch the bytes from the cacheable /frame/<key>.
+
+    In delta mode (EGN_DELTA), only tiles changed since the last image are
+    sent as "stream_delta", see delta.TileDiffer.
+    """
+    global LAST_IMAGE_KEY
+    timings = {}
+    t0 = time.perf_counter()
+    if not image_bytes.strip():
+        entry = {'key':'', 'data':b'', 'shape':(0, 0), 'mime':'', 'stats':''}
+    else:
+        key = imgcache.digest(image_bytes)
+        timings['hash'] = time.perf_counter() - t0
+        if key == LAST_IMAGE_KEY:
+            observe_stages('image', timings)
+            return
+        entry = IMAGE_CACHE.get(key)
+        if entry is None:
+            shape = imgio.image_size(image_bytes)
+            if shape is None:  # unknown header, fallback to full decode
+                image_arr = np.frombuffer(image_bytes, dtype=np.uint8)
+                shape = cv2.imdecode(image_arr, cv2.IMREAD_COLOR).shape[:2]
+            entry = {'key':key, 'data':image_bytes, 'shape':tuple(shape),
+                     'mime':imgio.mime_type(image_bytes),
+                     'stats':f"matrix: {tuple(shape)}"}
+            IMAGE_CACHE.put(entry)
+            timings['probe'] = time.perf_counter() - t0 - timings['hash']
+
+    LAST_IMAGE_KEY = entry['key'] or None
+    HISTORY.append('image', entry)
+    if DELTA is not None and entry['key']:
+        t1 = time.perf_counter()
+        with DELTA_LOCK:
+            message = tpool.execute(DELTA.update, entry['data'], entry['mime'])
+        message['stats'] = entry['stats']
+        t2 = time.perf_counter()
+        timings['delta'] = t2 - t1
+        PAYLOAD_BYTES.observe(sum(len(t[2]) for t in message['tiles']),
+                              kind='send stream_delta')
+        socketio.emit('stream_delta', message)
+        timings['emit'] = time.perf_counter() - t2
+        observe_stages('image', timings)
+        return
+    if DELTA is not None:
+        DELTA.reset()
+    t1 = time.perf_counter()
+    # Use socketio.emit(), not emit() else sends to orig socketio.on event.
+    socketio.emit('stream_image', image_message(entry))
+    timings['emit'] = time.perf_counter() - t1
+    observe_stages('image', timings)
+
+
+def broadcast_text(raw_text:str) -> None:
+    """Store text in history and stream it to all clients."""
+    parsed_text = raw_text.replace('\n', '<br>')
+    HISTORY.append('text', parsed_text)
+    # Use socketio.emit(), not emit() else sends to orig socketio.on event.
+    socketio.emit('stream_text', parsed_text)
+
+
 @app.route("/image_file", methods=['POST'])
 def image_file():
     """Post image to tiru url."""
-    BLANK_BYTE_STR = base64.b64encode(b'\n').decode("utf-8")  # blank byte as utf-8 str
-    image_b64_str = request.get_json()['message']
-    image_data = "data:image/jpg;base64," + image_b64_str
-    image_stats = ""
+    broadcast_image(request_image_bytes())
+    return redirect(url_for('index'))
 
-    if not BLANK_BYTE_STR == image_b64_str:
-        image = base64_to_image(image_data)
-        image_stats = f"matrix: {image.shape[:2]}"
 
-    # Use socketio.emit(), not emit() else sends to orig socketio.on event.
-    socketio.emit('stream_image', {'data':image_data, 'stats':image_stats})
-    return redirect(url_for('index'))
+@app.route("/frame/<key>", methods=['GET'])
+def frame(key:str):
+    """Serve cached image by content key, w/ immutable cache headers.
+
+    With ?w=<width>&q=<quality>, images wider than w are downscaled and
+    encoded as JPEG of quality q. w is snapped up to adapt.WIDTHS and q
+    clipped to [10, 95], and each variant is encoded once and cached, so
+    clients w/ the same profile share it.
+    """
+    entry = IMAGE_CACHE.get(key)
+    width = request.args.get('w', type=int)
+    # Variants are only made of source images, w/ shape from its header
+    if entry is not None and width and 'source' not in entry:
+        # Snap to width buckets and clip quality, so arbitrary queries
+        # share variants, and can't flood the cache
+        width = adapt.bucket_width(width)
+        quality = int(np.clip(request.args.get(
+            'q', adapt.DEFAULT_PROFILE['quality'], type=int), 10, 95))
+        if entry['shape'][1] > width:
+            key = f'{key}.{width}.{quality}'
+    if key in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        if entry is None:
+            abort(404)
+        if key != entry['key']:
+            entry_ = IMAGE_CACHE.get(key)
+            if entry_ is None:
+                data = tpool.execute(
+                    adapt.variant, entry['data'], width, quality)
+                entry_ = {'key':key, 'data':data, 'mime':'image/jpeg',
+                          'shape':imgio.image_size(data),
+                          'source':entry['key']}
+                IMAGE_CACHE.put(entry_)
+            entry = entry_
+        response = app.response_class(entry['data'], mimetype=entry['mime'])
+    response.set_etag(key)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 
 @app.route("/text_file", methods=['POST'])
 def text_file():
     """Post text to tiru url."""
-    if 'text' not in session:
-        session['text'] = []
-    raw_text = request.get_json()['message']
-    session['text'] += [raw_text]
-    parsed_text = raw_text.replace('\n', '<br>')
-    # Use socketio.emit(), not emit() else sends to orig socketio.on event.
-    socketio.emit('stream_text', parsed_text)
+    broadcast_text(request.get_json()['message'])
     #return { 'statusCode': 200 }
     return redirect(url_for('index'))
 
 
+@socketio.on("post_image")
+@EVENT_SECONDS.time(event="post_image")
+def post_image(image_bytes:bytes):
+    """Post image over a persistent socket, same as /image_file."""
+    PAYLOAD_BYTES.observe(len(image_bytes), kind='recv post_image')
+    broadcast_image(image_bytes)
+
+
+@socketio.on("post_text")
+@EVENT_SECONDS.time(event="post_text")
+def post_text(raw_text:str):
+    """Post text over a persistent socket, same as /text_file."""
+    broadcast_text(raw_text)
+
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     """Renders the index.html template."""
-    if not {'text', 'image'}.issubset(session.keys()):
-        session['text'], session['image'] = [], []
-    # Use redis.. don't want to deal w/ cookies
-    debug = [f'image-state:{len(session["image"])}', f'text-state: {len(session["text"])}']
+    debug = [f'image-state:{HISTORY.count("image")}',
+             f'text-state: {HISTORY.count("text")}']
     return ENV.get_template("index.html").render(url_for=url_for, debug=debug)
 
 if __name__ == "__main__":
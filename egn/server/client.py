@@ -0,0 +1,164 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+
+URL = 'http://127.0.0.1:8100/'
+
+
+class Client:
+    """Persistent client for posting images and text to the egn server.
+
+    All requests share one keep-alive requests.Session, so there is no
+    connect per post. The send_* methods don't block: images go in a single
+    latest-wins slot, so if plots are produced faster than they can be
+    sent only the newest is posted, and texts are queued and posted as one
+    batch per round trip, by a background sender thread.
+
+    If socket is True, posts go over a persistent Socket.IO connection
+    (needs python-socketio client) instead of HTTP.
+
+    Usage:
+    .. code-block:: python
+
+        from egn.viz.plt import fig_bytes
+
+        with Client() as client:
+            width = client.profile()['width']
+            for i in range(epochs):
+                ...
+                client.send_image(bytes(fig_bytes(fig, width=width)))
+                client.send_text(f'epoch {i}: loss={loss:.3f}')
+
+    Args:
+        url: server url.
+        timeout: request timeout [s].
+        socket: post over Socket.IO connection if True, else HTTP.
+    """
+
+    def __init__(self, url:str=URL, timeout:float=5.0, socket:bool=False):
+        self.url = url if url.endswith('/') else url + '/'
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount(self.url, HTTPAdapter(pool_maxsize=2))
+        self.sio = None
+        if socket:
+            import socketio
+            self.sio = socketio.Client()
+            self.sio.connect(self.url.rstrip('/'))
+
+        self._cond = threading.Condition()
+        self._image = None      # latest pending image bytes
+        self._texts = []        # pending texts
+        self._busy = False
+        self._closed = False
+        self.n_sent = 0
+        self.n_dropped = 0
+        self.n_errors = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Blocking posts
+    def status(self) -> int:
+        """Server status code, 200 if running."""
+        return self.session.get(self.url + 'status',
+                                timeout=self.timeout).status_code
+
+    def profile(self) -> dict:
+        """Largest image 'width' and 'quality' negotiated by browsers.
+
+        Render figures at this width (i.e. fig_bytes(fig, width=...)) to
+        not send more pixels than any viewer displays.
+        """
+        return self.session.get(self.url + 'profiles',
+                                timeout=self.timeout).json()
+
+    def post_image(self, data:bytes):
+        """Post raw image bytes, returns response (None over socket)."""
+        if self.sio is not None:
+            return self.sio.emit('post_image', data)
+        headers = {'Content-Type': 'application/octet-stream'}
+        return self.session.post(self.url + 'image_file', data=data,
+                                 headers=headers, timeout=self.timeout,
+                                 allow_redirects=False)
+
+    def post_text(self, text:str):
+        """Post text, returns response (None over socket)."""
+        if self.sio is not None:
+            return self.sio.emit('post_text', text)
+        return self.session.post(self.url + 'text_file',
+                                 json={'message': text},
+                                 timeout=self.timeout, allow_redirects=False)
+
+    def post_texts(self, texts:list, sep:str='\n'):
+        """Post list of texts in a single request."""
+        return self.post_text(sep.join(texts))
+
+    # Non-blocking sends
+    def send_image(self, data:bytes) -> None:
+        """Queue image, replacing any image not yet sent."""
+        with self._cond:
+            if self._image is not None:
+                self.n_dropped += 1
+            self._image = data
+            self._cond.notify()
+
+    def send_text(self, text:str) -> None:
+        """Queue text, all queued texts are posted in one batch."""
+        with self._cond:
+            self._texts.append(text)
+            self._cond.notify()
+
+    def flush(self, timeout:float=None) -> bool:
+        """Block until queued items are sent, False if timed out."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not (self._busy or self._texts
+                             or self._image is not None),
+                timeout=timeout)
+
+    def close(self, timeout:float=None) -> None:
+        """Send queued items, and close connections."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self.session.close()
+        if self.sio is not None:
+            self.sio.disconnect()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._texts
+                                    or self._image is not None)
+                if self._closed:
+                    return
+                image, self._image = self._image, None
+                texts, self._texts = self._texts, []
+                self._busy = True
+            try:
+                if texts:
+                    self._send(self.post_texts, texts)
+                if image is not None:
+                    self._send(self.post_image, image)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _send(self, post, data) -> None:
+        try:
+            r = post(data)
+            if r is not None and r.status_code >= 400:
+                raise requests.HTTPError(f'{r.status_code}', response=r)
+            self.n_sent += 1
+        except Exception:  # any failure drops the item, not the sender
+            self.n_errors += 1
@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+
+def changed_tiles(prev:npt.NDArray, image:npt.NDArray, tile:int
+                  ) -> npt.NDArray[bool]:
+    """(ny, nx) mask of tiles w/ any pixel changed between same shape images.
+    """
+    h, w = image.shape[:2]
+    ny, nx = -(-h // tile), -(-w // tile)
+    diff = np.any(prev != image, axis=2) if image.ndim == 3 else prev != image
+    pad = np.zeros((ny * tile, nx * tile), dtype=bool)
+    pad[:h, :w] = diff
+    return pad.reshape(ny, tile, nx, tile).any(axis=(1, 3))
+
+
+def tile_runs(mask:npt.NDArray[bool]) -> list:
+    """Runs of changed tiles in each row, as (row, col_start, col_stop).
+
+    Indices are python ints, so messages built from them are JSON
+    serializable.
+    """
+    runs = []
+    for r, row in enumerate(mask):
+        edges = np.flatnonzero(np.diff(np.r_[0, row.astype(np.int8), 0]))
+        runs.extend((r, int(c0), int(c1))
+                    for c0, c1 in zip(edges[::2], edges[1::2]))
+    return runs
+
+
+class TileDiffer:
+    """Delta encoder of a stream of frames, as changed tiles of last frame.
+
+    Each frame is split into tile x tile px tiles and compared w/ the
+    previous frame. Only changed tiles are encoded, w/ adjacent changed
+    tiles in a row encoded together, so message size and client decode
+    time scale w/ the changed area. A full keyframe is sent for the first
+    frame, on a shape change, every keyframe_every frames, or if more than
+    max_changed of tiles changed.
+
+    Messages are dicts w/ 'seq', 'keyframe', 'shape' (h, w), 'mime', and
+    'tiles' list of [y, x, encoded bytes].
+
+    Args:
+        tile: tile size [px].
+        keyframe_every: max number of frames between keyframes.
+        max_changed: fraction of changed tiles above which a keyframe is sent.
+        quality: JPEG quality of tiles of JPEG frames. PNG frames get PNG
+            tiles.
+    """
+
+    def __init__(self, tile:int=64, keyframe_every:int=60,
+                 max_changed:float=0.5, quality:int=90):
+        self.tile = tile
+        self.keyframe_every = keyframe_every
+        self.max_changed = max_changed
+        self.quality = quality
+        self.reset()
+
+    def reset(self) -> None:
+        self.prev = None
+        self.mime = 'image/jpeg'
+        self.seq = -1
+        self.since_key = 0
+
+    def _encode(self, image:npt.NDArray) -> bytes:
+        if self.mime == 'image/png':
+            _, encoded = cv2.imencode(
+                '.png', image, [int(cv2.IMWRITE_PNG_COMPRESSION), 1])
+        else:
+            _, encoded = cv2.imencode(
+                '.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality])
+        return encoded.tobytes()
+
+    def _message(self, keyframe:bool, tiles:list) -> dict:
+        return {'seq': self.seq, 'keyframe': keyframe,
+                'shape': tuple(int(n) for n in self.prev.shape[:2]),
+                'mime': self.mime,
+                'tiles': tiles}
+
+    def keyframe(self) -> dict:
+        """Full frame message of last frame, i.e. for a new client."""
+        if self.prev is None:
+            return None
+        return self._message(True, [[0, 0, self._encode(self.prev)]])
+
+    def update(self, data:bytes, mime:str='image/jpeg') -> dict:
+        """Decode frame and return delta message vs previous frame.
+
+        Args:
+            data: encoded image bytes.
+            mime: mime type of data, png frames are sent as png tiles.
+
+        Returns message dict, w/ no tiles if frame is unchanged.
+        """
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8),
+                             cv2.IMREAD_COLOR)
+        prev, self.prev = self.prev, image
+        self.mime = 'image/png' if mime == 'image/png' else 'image/jpeg'
+        self.seq += 1
+        self.since_key += 1
+        if (prev is None or prev.shape != image.shape
+                or self.since_key >= self.keyframe_every):
+            self.since_key = 0
+            return self.keyframe()
+
+        mask = changed_tiles(prev, image, self.tile)
+        if mask.mean() > self.max_changed:
+            self.since_key = 0
+            return self.keyframe()
+        t = self.tile
+        tiles = [[r * t, c0 * t,
+                  self._encode(image[r * t:(r + 1) * t, c0 * t:c1 * t])]
+                 for r, c0, c1 in tile_runs(mask)]
+        return self._message(False, tiles)
@@ -1,8 +1,8 @@
 # For ezplt
 from sys import stdout
-from io import BytesIO
 import numpy as np
 import matplotlib.pyplot as plt
+from egn.viz.plt import fig_bytes
 pp = print
 
 
@@ -11,12 +11,15 @@ X = RAND.uniform(0, 1, 1000)
 Y = RAND.uniform(0, 1, 1000)
 
 
-def plt_buffer(fig):
-    """Raw bytes from plt to stdout."""
-    buffer = BytesIO()
-    fig.savefig(buffer, format='jpg', bbox_inches='tight', dpi=150)
-    buffer.seek(0)
-    stdout.buffer.write(buffer.getvalue())
+def plt_buffer(fig, fmt='jpg', quality=90, dpi=150, skip_unchanged=True):
+    """Raw bytes from plt to stdout, skips unchanged figures.
+
+    Renders once on the Agg canvas, see egn.viz.plt.fig_bytes.
+    """
+    data = fig_bytes(fig, fmt, quality, dpi, skip_unchanged)
+    if data is None:
+        return
+    stdout.buffer.write(data)
     stdout.flush()
 
 
@@ -0,0 +1,178 @@
+import os
+import copy
+import queue
+import threading
+import traceback
+import multiprocessing as mp
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+from argparse import ArgumentParser
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import ezplt
+from egn.viz.plt import fig_bytes
+import client
+from request import EZPLT_ADDRESS as ADDRESS, ezplt_authkey
+
+
+# Define globals
+URL = client.URL
+TIMEOUT = 10.0
+# Mutable ezplt values deep copied per snippet
+DATA_TYPES = (np.ndarray, np.random.RandomState, list, dict, set)
+
+
+def run_snippet(code:str, fmt:str='jpg', quality:int=90, dpi:float=150
+                ) -> list:
+    """Exec snippet in a copy of the ezplt namespace, returns encoded figures.
+
+    Each snippet gets its own namespace, w/ deep copies of the ezplt data
+    (i.e. RAND, X, Y) and a fresh fig, ax, and rcParams are restored after.
+    State outside the namespace (i.e. imported modules) is only isolated by
+    running each snippet in its own process, see EzpltPool. Only figures w/
+    plotted data are returned.
+    """
+    ns = {k: copy.deepcopy(v) if isinstance(v, DATA_TYPES) else v
+          for k, v in vars(ezplt).items() if k not in ('fig', 'ax')}
+    ns['fig'], ns['ax'] = ezplt.subplots()
+    try:
+        with plt.rc_context():
+            exec(compile(code, '<ezplt>', 'exec'), ns)
+            figs = [plt.figure(n) for n in plt.get_fignums()]
+            return [bytes(fig_bytes(fig, fmt, quality, dpi)) for fig in figs
+                    if any(ax.has_data() for ax in fig.axes)]
+    finally:
+        plt.close('all')
+
+
+def _worker(conn, url:str) -> None:
+    """Runs one snippet from conn, or returns if None is received."""
+    msg = conn.recv()
+    if msg is None:
+        return
+    code, post, kwargs = msg
+    try:
+        frames = run_snippet(code, **kwargs)
+        if post:
+            # Closed before the worker exits, w/ its sender thread
+            with client.Client(url) as c:
+                for frame in frames:
+                    c.post_image(frame).raise_for_status()
+            conn.send(('ok', len(frames)))
+        else:
+            conn.send(('ok', frames))
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+
+
+class EzpltPool:
+    """Pool of warm worker processes running ezplt snippets.
+
+    Workers are forked from this process after numpy, matplotlib and ezplt
+    are imported, so a snippet runs w/o interpreter startup or imports. Each
+    worker runs a single snippet and is replaced by a new fork, so no state
+    a snippet mutates (module globals, rcParams, np.random) reaches the next
+    one. A snippet that exceeds the timeout, or crashes its worker, has the
+    worker killed.
+
+    Args:
+        n_workers: number of worker processes.
+        timeout: max seconds per snippet.
+        url: egn server url figures are posted to.
+    """
+
+    def __init__(self, n_workers:int=2, timeout:float=TIMEOUT, url:str=URL):
+        self.timeout = timeout
+        self.url = url
+        self._ctx = mp.get_context('fork')
+        self._idle = queue.Queue()
+        for _ in range(n_workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> tuple:
+        conn, child_conn = self._ctx.Pipe()
+        proc = self._ctx.Process(
+            target=_worker, args=(child_conn, self.url), daemon=True)
+        proc.start()
+        return proc, conn
+
+    def run(self, code:str, post:bool=True, **kwargs) -> tuple:
+        """Run snippet on an idle worker.
+
+        Args:
+            code: python snippet.
+            post: post figures to server if True, else return them.
+            kwargs: fmt, quality, dpi passed to run_snippet.
+
+        Returns (status, result) tuple, status is 'ok', 'error' or 'timeout'.
+            result is number of figures posted, list of figure bytes, or
+            error message.
+        """
+        proc, conn = self._idle.get()
+        try:
+            conn.send((code, post, kwargs))
+            if conn.poll(self.timeout):
+                return conn.recv()
+            return 'timeout', f'Snippet exceeded {self.timeout}s.'
+        except (EOFError, OSError):
+            return 'error', 'Worker died.'
+        finally:
+            # Single use, replaced by a fork of the pristine daemon
+            proc.kill()
+            proc.join()
+            conn.close()
+            self._idle.put(self._spawn())
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            proc, conn = self._idle.get()
+            conn.send(None)
+            proc.join(1.0)
+
+
+def serve(pool:EzpltPool, address:str=ADDRESS) -> None:
+    """Accept snippets on unix socket, one thread per connection.
+
+    The socket is in a user only dir, and clients authenticate w/ a random
+    authkey the daemon writes to a user only file there on start, see
+    request.ezplt_authkey.
+    """
+    def handle(conn):
+        with conn:
+            while True:
+                try:
+                    msg = conn.recv()
+                except EOFError:
+                    return
+                conn.send(pool.run(**msg))
+
+    authkey = ezplt_authkey(address, new=True)
+    if os.path.exists(address):  # stale socket from killed daemon
+        os.unlink(address)
+    with Listener(address, authkey=authkey) as listener:
+        os.chmod(address, 0o600)
+        print(f"ezplt daemon on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError:  # wrong authkey, drop client
+                continue
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(
+        prog='ezplt_daemon', description='Warm ezplt snippet workers.')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT)
+    parser.add_argument('--url', type=str, default=URL)
+    parser.add_argument('--address', type=str, default=ADDRESS)
+    args = parser.parse_args()
+
+    pool = EzpltPool(args.workers, args.timeout, args.url)
+    try:
+        serve(pool, args.address)
+    finally:
+        pool.close()
@@ -0,0 +1,109 @@
+import time
+import eventlet
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
+
+
+class FramePool:
+    """Bounded worker pool w/ per-client latest-frame-wins queue.
+
+    Each client has a single pending frame slot. A frame that arrives while
+    the client's previous frame is still pending replaces it, and is counted
+    as dropped, so latency stays bounded under backpressure rather than
+    queuing up. Frames are processed in native threads (eventlet.tpool), at
+    most max_workers at a time, so the eventlet hub keeps serving clients.
+
+    Args:
+        process: fn(frame) -> (result, timings), timings is a dict of
+            stage name to seconds.
+        emit: fn(sid, result) to send result to client.
+        max_workers: max number of frames processed concurrently.
+        observe: optional fn(timings) called w/ timings of each frame.
+    """
+
+    def __init__(self, process, emit, max_workers:int=4, observe=None):
+        self.process = process
+        self.emit = emit
+        self.max_workers = max_workers
+        self.observe = observe
+        self._sem = Semaphore(max_workers)
+        self._pending = {}   # sid -> latest frame
+        self._active = set()  # sids w/ a running drain task
+        self.n_submitted = 0
+        self.n_processed = 0
+        self.n_dropped = 0
+        self.n_errors = 0
+        self.dropped = {}    # sid -> drop count
+        self.stage_sum = {}  # stage -> total seconds
+        self.stage_last = {}  # stage -> last seconds
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of clients w/ a pending frame."""
+        return len(self._pending)
+
+    @property
+    def active_clients(self) -> int:
+        """Number of clients w/ frames processing."""
+        return len(self._active)
+
+    def submit(self, sid:str, frame) -> None:
+        """Queue frame for client, replacing any pending frame."""
+        self.n_submitted += 1
+        if sid in self._pending:
+            self.n_dropped += 1
+            self.dropped[sid] = self.dropped.get(sid, 0) + 1
+        self._pending[sid] = frame
+        if sid not in self._active:
+            self._active.add(sid)
+            eventlet.spawn_n(self._drain, sid)
+
+    def discard(self, sid:str) -> None:
+        """Drop pending frame and stats of disconnected client."""
+        self._pending.pop(sid, None)
+        self.dropped.pop(sid, None)
+
+    def _drain(self, sid:str) -> None:
+        try:
+            while sid in self._pending:
+                with self._sem:
+                    frame = self._pending.pop(sid, None)
+                    if frame is None:
+                        break
+                    t0 = time.perf_counter()
+                    try:
+                        result, timings = tpool.execute(self.process, frame)
+                    except Exception as e:
+                        self.n_errors += 1
+                        print(f"Frame error for {sid}: {e}")
+                        continue
+                t1 = time.perf_counter()
+                self.emit(sid, result)
+                timings['emit'] = time.perf_counter() - t1
+                timings['total'] = time.perf_counter() - t0
+                self._record(timings)
+        finally:
+            self._active.discard(sid)
+
+    def _record(self, timings:dict) -> None:
+        self.n_processed += 1
+        for stage, dt in timings.items():
+            self.stage_sum[stage] = self.stage_sum.get(stage, 0.0) + dt
+            self.stage_last[stage] = dt
+        if self.observe is not None:
+            self.observe(timings)
+
+    def stats(self) -> dict:
+        """Queue depth, drop counts and per-stage timings [ms]."""
+        n = max(self.n_processed, 1)
+        return {
+            'queue_depth': self.queue_depth,
+            'active_clients': self.active_clients,
+            'max_workers': self.max_workers,
+            'submitted': self.n_submitted,
+            'processed': self.n_processed,
+            'dropped': self.n_dropped,
+            'errors': self.n_errors,
+            'dropped_by_client': dict(self.dropped),
+            'stage_mean_ms': {k: 1e3 * v / n for k, v in self.stage_sum.items()},
+            'stage_last_ms': {k: 1e3 * v for k, v in self.stage_last.items()}}
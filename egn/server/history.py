@@ -0,0 +1,66 @@
+import os
+import pickle
+from collections import deque
+path = os.path
+
+
+class History:
+    """Bounded in-process history of posted items, per channel.
+
+    Each channel (i.e. 'text', 'image') is a ring buffer of the last maxlen
+    items, so memory and per-request cost stay constant however long the
+    server is up. If spill_dir is given, items evicted from the ring are
+    appended to <spill_dir>/<channel>.pkl instead of discarded.
+
+    Args:
+        maxlen: max items kept in memory per channel.
+        spill_dir: optional directory to spill evicted items to.
+    """
+
+    def __init__(self, maxlen:int=100, spill_dir:str=None):
+        self.maxlen = maxlen
+        self.spill_dir = spill_dir
+        self._rings = {}
+        self._counts = {}
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def append(self, channel:str, item) -> int:
+        """Add item to channel, returns its sequence number."""
+        ring = self._rings.setdefault(channel, deque(maxlen=self.maxlen))
+        if len(ring) == self.maxlen and self.spill_dir is not None:
+            self._spill(channel, ring[0])
+        ring.append(item)
+        self._counts[channel] = self._counts.get(channel, 0) + 1
+        return self._counts[channel] - 1
+
+    def last(self, channel:str, n:int=None) -> list:
+        """Last n items of channel in memory, oldest first."""
+        ring = self._rings.get(channel, ())
+        n = len(ring) if n is None else min(n, len(ring))
+        return list(ring)[len(ring) - n:]
+
+    def count(self, channel:str) -> int:
+        """Total number of items ever appended to channel."""
+        return self._counts.get(channel, 0)
+
+    def channels(self) -> list:
+        return list(self._rings.keys())
+
+    def spill_fpath(self, channel:str) -> str:
+        return path.join(self.spill_dir, f'{channel}.pkl')
+
+    def _spill(self, channel:str, item) -> None:
+        with open(self.spill_fpath(channel), 'ab') as f:
+            pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def spilled(self, channel:str):
+        """Iterate over items spilled to disk for channel, oldest first."""
+        if self.spill_dir is None or not path.isfile(self.spill_fpath(channel)):
+            return
+        with open(self.spill_fpath(channel), 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
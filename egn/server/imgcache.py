@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from egn.hashing import digest  # content key of image bytes
+
+
+class ImageCache:
+    """Content addressed LRU cache of encoded images, bounded by size.
+
+    Entries are dicts w/ 'key', 'data' (encoded bytes), 'mime' and 'stats',
+    so a repeated image is neither probed nor stored twice. The least
+    recently used entries are evicted once total data exceeds max_bytes.
+
+    Args:
+        max_bytes: max total size of cached image data.
+    """
+
+    def __init__(self, max_bytes:int=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.n_hits = 0
+        self.n_misses = 0
+        self._entries = OrderedDict()
+
+    def __contains__(self, key:str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key:str) -> dict:
+        """Entry of key, marked as recently used, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.n_misses += 1
+            return None
+        self.n_hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, entry:dict) -> None:
+        """Add entry, evicting least recently used entries if full."""
+        key = entry['key']
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = entry
+        self.n_bytes += len(entry['data'])
+        while self.n_bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self.n_bytes -= len(old['data'])
+
+    def stats(self) -> dict:
+        return {'entries': len(self._entries), 'bytes': self.n_bytes,
+                'max_bytes': self.max_bytes, 'hits': self.n_hits,
+                'misses': self.n_misses}
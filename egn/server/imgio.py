@@ -0,0 +1,62 @@
+import struct
+
+
+JPEG_SOF = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def mime_type(data:bytes) -> str:
+    """Image mime type from magic bytes, defaults to jpeg."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if data[:2] == b'BM':
+        return 'image/bmp'
+    return 'image/jpeg'
+
+
+def _jpeg_size(data:bytes) -> tuple:
+    """(height, width) from JPEG start of frame (SOFn) segment."""
+    i, n = 2, len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in JPEG_SOF:
+            h, w = struct.unpack('>HH', data[i + 5:i + 9])
+            return h, w
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2  # standalone markers w/o length
+            continue
+        seg_len, = struct.unpack('>H', data[i + 2:i + 4])
+        i += 2 + seg_len
+    return None
+
+
+def image_size(data:bytes) -> tuple:
+    """Image (height, width) from header bytes, w/o decoding pixels.
+
+    Supports JPEG, PNG, GIF and BMP.
+
+    Args:
+        data: encoded image bytes.
+
+    Returns (height, width) tuple, or None if unknown format.
+    """
+    if data[:2] == b'\xff\xd8':
+        return _jpeg_size(data)
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        w, h = struct.unpack('>II', data[16:24])
+        return h, w
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        w, h = struct.unpack('<HH', data[6:10])
+        return h, w
+    if data[:2] == b'BM' and len(data) >= 26:
+        w, h = struct.unpack('<ii', data[18:26])
+        return abs(h), w
+    return None
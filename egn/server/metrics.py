@@ -0,0 +1,199 @@
+import sys
+import time
+import bisect
+import functools
+from collections import Counter as Tally
+from eventlet import patcher
+
+# Native threads, even if eventlet monkey patches threading
+threading = patcher.original('threading')
+
+
+# Latency buckets [s], and payload size buckets [bytes]
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5, 5.0)
+SIZE_BUCKETS = (1e2, 1e3, 1e4, 1e5, 1e6, 1e7)
+
+
+def _labels(names:tuple, values:tuple) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(f'{n}="{v}"' for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Metric:
+    """Base of metrics w/ Prometheus text exposition.
+
+    Args:
+        name: metric name.
+        doc: help string.
+        labels: label names.
+        fn: optional fn() -> value, read at scrape time, for unlabeled
+            metrics tracked elsewhere (i.e. queue depth).
+    """
+    kind = 'untyped'
+
+    def __init__(self, name:str, doc:str, labels:tuple=(), fn=None):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.fn = fn
+        self._values = {}
+
+    def _key(self, labels:dict) -> tuple:
+        return tuple(str(labels.get(n, '')) for n in self.labels)
+
+    def samples(self):
+        """Yield (suffix, label str, value)."""
+        if self.fn is not None:
+            self._values[()] = self.fn()
+        for key, value in self._values.items():
+            yield '', _labels(self.labels, key), value
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.doc}',
+                 f'# TYPE {self.name} {self.kind}']
+        lines += [f'{self.name}{suffix}{labels} {value:g}'
+                  for suffix, labels, value in self.samples()]
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, value:float=1.0, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value:float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """Cumulative bucket histogram w/ sum and count, per label values."""
+    kind = 'histogram'
+
+    def __init__(self, name:str, doc:str, labels:tuple=(),
+                 buckets:tuple=LATENCY_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value:float, **labels) -> None:
+        key = self._key(labels)
+        counts = self._values.get(key)
+        if counts is None:
+            # bucket counts, +Inf count, sum
+            counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def time(self, **labels):
+        """Decorator observing duration [s] of fn calls."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - t0, **labels)
+            return wrapper
+        return decorator
+
+    def samples(self):
+        for key, counts in self._values.items():
+            total = 0
+            for le, n in zip(self.buckets + ('+Inf',), counts[:-1]):
+                total += n
+                labels = _labels(self.labels + ('le',), key + (le,))
+                yield '_bucket', labels, total
+            yield '_sum', _labels(self.labels, key), counts[-1]
+            yield '_count', _labels(self.labels, key), total
+
+
+class Registry:
+    """Collection of metrics, rendered as Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric:Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.add(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.add(Gauge(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.add(Histogram(*args, **kwargs))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+class Sampler:
+    """Sampling profiler of all threads, as collapsed stack counts.
+
+    A native thread samples the stacks of all other threads every interval
+    seconds. The output of collapsed() is in the folded format read by
+    flamegraph.pl and speedscope. The eventlet hub runs in the main thread,
+    so its stack shows whichever green thread is running.
+
+    Args:
+        interval: seconds between samples.
+    """
+
+    def __init__(self, interval:float=0.005):
+        self.interval = interval
+        self.stacks = Tally()
+        self.n_samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({code.co_filename}:'
+                                 f'{code.co_firstlineno})')
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.n_samples += 1
+
+    def collapsed(self) -> str:
+        """Folded stacks, one 'frame;frame;... count' line per stack."""
+        return ''.join(f'{stack} {n}\n'
+                       for stack, n in self.stacks.most_common())
@@ -1,32 +1,90 @@
 from __future__ import annotations
 import sys
 import os
+import stat
+import secrets
+import tempfile
 import typing as typ
 import requests
 from argparse import ArgumentParser, FileType
 import base64
+from multiprocessing.connection import Client as Connect
 
 # Define globals
 URL = 'http://127.0.0.1:8100/'
+# Keep-alive session shared by calls, for use within python see client.Client
+SESSION = requests.Session()
+# Local (unix) socket of ezplt_daemon.py, in a per user runtime dir w/ the
+# daemon's authkey file
+EZPLT_DIR = os.path.join(
+    os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir(),
+    f'egn-{os.getuid()}')
+EZPLT_ADDRESS = os.path.join(EZPLT_DIR, 'ezplt.sock')
 
 
-# TODO: we want this to be used within python for visualization from .py
-# file editing.
-def image_file(byte_str:str, url:str) -> None:
+def image_file(byte_str:str, url:str) -> requests.Response:
     """Post image as base64 encoded string to server."""
     data = {'message': byte_str}
-    _ = requests.post(url, json=data)
+    return SESSION.post(url, json=data, allow_redirects=False)
 
 
-def text_file(text_str:str, url:str) -> None:
-    """Post image as base64 encoded string to server."""
+def image_bytes(byte_data:bytes, url:str) -> requests.Response:
+    """Post raw image bytes to server as octet-stream, w/o base64."""
+    headers = {'Content-Type': 'application/octet-stream'}
+    return SESSION.post(url, data=byte_data, headers=headers,
+                        allow_redirects=False)
+
+
+def text_file(text_str:str, url:str) -> requests.Response:
+    """Post text to server."""
     data = {'message':text_str}
-    _ = requests.post(url, json=data)
+    return SESSION.post(url, json=data, allow_redirects=False)
+
+
+def ezplt_dir(dpath:str=EZPLT_DIR) -> str:
+    """Create user only (0700) dir, or check an existing one is."""
+    os.makedirs(dpath, mode=0o700, exist_ok=True)
+    st = os.lstat(dpath)
+    if (not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid()
+            or st.st_mode & 0o077):
+        raise PermissionError(
+            f'{dpath} is not a dir accessible only to the current user.')
+    return dpath
+
+
+def ezplt_authkey(address:str=EZPLT_ADDRESS, new:bool=False) -> bytes:
+    """Authkey of ezplt daemon, from user only (0600) file next to socket.
+
+    If new, a random key is generated and replaces the file, done by the
+    daemon on start.
+    """
+    fpath = os.path.join(ezplt_dir(os.path.dirname(address)), 'ezplt.key')
+    if not new:
+        with open(fpath, 'rb') as f:
+            return f.read()
+    key = secrets.token_bytes(32)
+    tmp = f'{fpath}.{os.getpid()}'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    os.replace(tmp, fpath)
+    return key
+
+
+def ezplt_snippet(code:str, address:str=EZPLT_ADDRESS, post:bool=True,
+                  **kwargs) -> tuple:
+    """Run plot snippet on warm ezplt daemon, see ezplt_daemon.EzpltPool.run.
+
+    Returns (status, result) tuple.
+    """
+    with Connect(address, authkey=ezplt_authkey(address)) as conn:
+        conn.send(dict(code=code, post=post, **kwargs))
+        return conn.recv()
 
 
 def status(url:str) -> int:
     """Check if server is running."""
-    r = requests.get(url)
+    r = SESSION.get(url)
     return r.status_code
 
 
@@ -41,6 +99,9 @@ if __name__ == "__main__":
               '$ request.py -img ./img.jpg'
               '# To stream file as <stdin> use "-" as arg:\n'
               '$ cat img.jpg | request.py -img -\n'))
+    parser.add_argument(
+        '--b64', action='store_true', default=False,
+        help='Post -img as base64 encoded json, instead of raw bytes.')
     parser.add_argument(
         '-txt', '--text_file', type=FileType('r'))
     parser.add_argument(
@@ -57,15 +118,22 @@ if __name__ == "__main__":
     if args.image_file:
         url = URL + 'image_file'
         # args.img is file object io.BufferedReader
-        # convert to base64 str to send through json
+        # send raw bytes, base64 json only if --b64
         byte_data = args.image_file.read()  # bytes
-        byte_b64_str = base64.b64encode(byte_data).decode('utf-8') # base64 str
-        image_file(byte_b64_str, url=url)
+        if args.b64:
+            byte_b64_str = base64.b64encode(byte_data).decode('utf-8')
+            image_file(byte_b64_str, url=url)
+        else:
+            image_bytes(byte_data, url=url)
     elif args.text_file:
         url = URL + 'text_file'
         text_file(args.text_file.read(), url=url)
     elif args.ezplt_file:
-        print(args.ezplt_file.read())
+        try:
+            code, result = ezplt_snippet(args.ezplt_file.read())
+        except (ConnectionRefusedError, FileNotFoundError):
+            code, result = 'error', 'Start daemon: $ python ezplt_daemon.py'
+        print(result, file=sys.stdout if code == 'ok' else sys.stderr)
     elif args.url:
         print(URL, file=sys.stdout)
     elif args.status:
@@ -3,41 +3,148 @@ var socket = io.connect(
     io_param, {transports: ['websocket']}
 );
 
-var IMAGE_WIDTH = 640;
+// Max display width of images, fit to window
+var IMAGE_WIDTH = window.innerWidth - 20;
+// Image width and quality negotiated w/ server from viewport
+var PROFILE = null;
+
+function send_viewport() {
+    // Advertise viewport [device px] and network, see adapt.negotiate
+    var conn = navigator.connection || {};
+    IMAGE_WIDTH = window.innerWidth - 20;
+    socket.emit('viewport', {
+        width: Math.round(IMAGE_WIDTH * (window.devicePixelRatio || 1)),
+        downlink: conn.downlink, rtt: conn.rtt
+    });
+}
+
+var resize_timer = null;
+window.addEventListener('resize', function () {
+    clearTimeout(resize_timer);
+    resize_timer = setTimeout(send_viewport, 250);
+});
+
+socket.on('profile', function (profile) {
+    console.log("Profile", profile)
+    PROFILE = profile;
+});
 
 // Returns 'connect' data from test_connect function
 socket.on('connect', function () {
     console.log("Connected...!", socket.connected, 'at', io_param)
+    send_viewport();
     socket.on('disconnect', () => {
         console.log("Disconnected...!", socket.connected)
     })
 });
 
 
+// Object URL of last binary image, revoked when replaced
+var image_url = null;
+
+function image_src(image_dict) {
+    // Cached frames arrive as url, binary attachments as ArrayBuffer, and
+    // older posts as data URI str
+    if (image_dict.url) {
+        if (PROFILE === null) {
+            return image_dict.url;
+        }
+        return `${image_dict.url}?w=${PROFILE.width}&q=${PROFILE.quality}`;
+    }
+    if (typeof image_dict.data === 'string') {
+        return image_dict.data;
+    }
+    if (image_url !== null) {
+        URL.revokeObjectURL(image_url);
+    }
+    var blob = new Blob([image_dict.data], {type: image_dict.mime || 'image/jpeg'});
+    image_url = URL.createObjectURL(blob);
+    return image_url;
+}
+
+
 socket.on('stream_image', function (image_dict) {
     // For <img id="image_id" src=...>
     console.log("Received img!") 
-    // Create image 
+    var image_el = document.getElementById("image_id")  
+    image_el.style.display = '';
+    document.getElementById("canvas_id").style.display = 'none';
+    if (image_dict.stats === "") {
+        image_el.removeAttribute('src');
+        document.getElementById("image_text_id").innerHTML = "";
+        return;
+    }
+    // Create image, and size once loaded
     var image = new Image();
-    var _width = image.width;
-    var _height = image.height;
-    // Set source
-    if (image_dict.stats !== "") {
-        image.src = image_dict.data;
-        _width = IMAGE_WIDTH;
-        _height = image.height * IMAGE_WIDTH / image.width;;
+    image.onload = function () {
+        // Fit to window, w/o upscaling past device pixels
+        var _width = Math.min(
+            IMAGE_WIDTH, image.width / (window.devicePixelRatio || 1));
+        var _height = image.height * _width / image.width;
+        // Modify stats 
+        var image_str = image_dict.stats 
+        image_str += `; pixel: (${image.height}, ${image.width}) / `;
+        image_str += `(${_height.toFixed(1)}, ${_width.toFixed(1)})`;
+        // Add image to DOM 
+        image_el.setAttribute('src', image.src);
+        image_el.setAttribute('width', _width);
+        image_el.setAttribute('height', _height);
+        document.getElementById("image_text_id").innerHTML = image_str;
+        console.log(image_str)
+    };
+    image.src = image_src(image_dict);
+});
+
+
+// Seq of last delta frame drawn, and promise chain so frames draw in order
+var delta_seq = null;
+var delta_chain = Promise.resolve();
+// Deltas are dropped until a keyframe arrives. The server sends one on
+// connect, and the first frame of a stream is always a keyframe.
+var awaiting_keyframe = true;
+
+socket.on('stream_delta', function (delta) {
+    // Composite changed tiles of frame on <canvas id="canvas_id">
+    if (delta.keyframe) {
+        awaiting_keyframe = false;
+    } else if (awaiting_keyframe) {
+        return;
+    } else if (delta.seq !== delta_seq + 1) {
+        // Missed a frame, tiles are relative to a frame we don't have, so
+        // request a keyframe once, and drop deltas until it arrives
+        awaiting_keyframe = true;
+        socket.emit('keyframe');
+        return;
     }
-    // Modify stats 
-    var image_str = image_dict.stats 
-    image_str += `; pixel: (${image.height}, ${image.width}) / `;
-    image_str += `(${_height.toFixed(1)}, ${_width.toFixed(1)})`;
-    // Add image to DOM 
-    var image_el = document.getElementById("image_id")  
-    image_el.setAttribute('src', image.src);
-    image_el.setAttribute('width', _width);
-    image_el.setAttribute('height', _height);
-    document.getElementById("image_text_id").innerHTML = image_str;
-    console.log(image_str)
+    delta_seq = delta.seq;
+    var bitmaps = delta.tiles.map(function (t) {
+        return createImageBitmap(new Blob([t[2]], {type: delta.mime}));
+    });
+    delta_chain = delta_chain.then(function () {
+        return Promise.all(bitmaps);
+    }).then(function (bmps) {
+        var canvas = document.getElementById("canvas_id");
+        var h = delta.shape[0], w = delta.shape[1];
+        if (delta.keyframe && (canvas.width !== w || canvas.height !== h)) {
+            canvas.width = w;
+            canvas.height = h;
+        }
+        var _width = Math.min(IMAGE_WIDTH, w / (window.devicePixelRatio || 1));
+        canvas.style.width = `${_width}px`;
+        canvas.style.display = '';
+        document.getElementById("image_id").style.display = 'none';
+        var ctx = canvas.getContext('2d');
+        bmps.forEach(function (bmp, i) {
+            ctx.drawImage(bmp, delta.tiles[i][1], delta.tiles[i][0]);
+            bmp.close();
+        });
+        var image_str = delta.stats;
+        image_str += `; tiles: ${delta.tiles.length}`;
+        image_str += delta.keyframe ? ' (keyframe)' : '';
+        document.getElementById("image_text_id").innerHTML = image_str;
+    }).catch(function (err) {
+        console.log("Delta error", err);
+    });
 });
 
 
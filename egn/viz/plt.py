@@ -1,20 +1,127 @@
 # For ezplt
+import hashlib
+import weakref
 from sys import stdout
 from io import BytesIO
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+
+FORMATS = ('jpg', 'png', 'raw')
+# Render params and hash of last streamed buffer per figure, to skip
+# unchanged frames
+_LAST_HASH = weakref.WeakKeyDictionary()
+
 
 def null(*args, **kwargs):
     """To nullify print output."""
     return None
 
-def stream_plt(fig) -> None:
-    """Stream bytes from fig to stdout."""
-    buffer = BytesIO()
-    fig.savefig(buffer, format='jpg', bbox_inches='tight', dpi=150)
-    buffer.seek(0)
-    stdout.buffer.write(buffer.getvalue())
+
+def render_rgba(fig, dpi:float=None) -> memoryview:
+    """Draw fig once on Agg canvas, returns (h, w, 4) RGBA buffer w/o copy.
+
+    The memoryview is only valid until the figure is drawn again.
+    """
+    if dpi is not None and fig.dpi != dpi:
+        fig.set_dpi(dpi)
+    if not isinstance(fig.canvas, FigureCanvasAgg):
+        FigureCanvasAgg(fig)  # sets fig.canvas
+    fig.canvas.draw()
+    return memoryview(fig.canvas.buffer_rgba())
+
+
+def encode_rgba(buf:memoryview, fmt:str='jpg', quality:int=90):
+    """Encode (h, w, 4) RGBA buffer as jpg or png bytes, or raw RGBA.
+
+    Args:
+        buf: RGBA buffer, i.e. from render_rgba.
+        fmt: 'jpg', 'png' (fast, low compression), or 'raw' (no encode,
+            returns buf as is).
+        quality: JPEG quality [1, 95].
+
+    Returns bytes, or memoryview if raw.
+    """
+    if fmt == 'raw':
+        return buf
+    h, w = buf.shape[:2]
+    img = Image.frombuffer('RGBA', (w, h), buf, 'raw', 'RGBA', 0, 1)
+    out = BytesIO()
+    if fmt == 'jpg':
+        img.convert('RGB').save(out, format='JPEG', quality=quality)
+    elif fmt == 'png':
+        img.save(out, format='PNG', compress_level=1)
+    else:
+        raise ValueError(f'fmt must be one of {FORMATS}, got {fmt}.')
+    return out.getbuffer()
+
+
+def fig_bytes(fig, fmt:str='jpg', quality:int=90, dpi:float=150,
+              skip_unchanged:bool=False, width:int=None):
+    """Render and encode fig in a single draw.
+
+    Unlike savefig(bbox_inches='tight'), the figure is drawn once and not
+    cropped, and the pixels aren't copied before encoding.
+
+    Args:
+        fig: matplotlib figure.
+        fmt: 'jpg', 'png' or 'raw' RGBA (see encode_rgba).
+        quality: JPEG quality.
+        dpi: figure dpi, or None to keep fig.dpi.
+        skip_unchanged: return None if the render params (dpi, width, fmt,
+            quality) are the same as last call for fig, and fig isn't stale
+            or its pixels are the same.
+        width: render at width [px] instead of dpi, i.e. the width clients
+            negotiated w/ the server (client.Client.profile).
+
+    Returns encoded bytes-like, or None if skipped.
+    """
+    params = (dpi, width, fmt, quality)
+    if width is not None:
+        dpi = width / fig.get_figwidth()
+    last = _LAST_HASH.get(fig)
+    if skip_unchanged and not fig.stale and last and last[0] == params:
+        return None  # no artist or render param changed since last draw
+    buf = render_rgba(fig, dpi)
+    if skip_unchanged:
+        digest = hashlib.blake2b(buf, digest_size=16).digest()
+        if last == (params, digest):
+            return None
+        _LAST_HASH[fig] = (params, digest)
+    return encode_rgba(buf, fmt, quality)
+
+
+def stream_plt(fig, fmt:str='jpg', quality:int=90, dpi:float=150,
+               skip_unchanged:bool=True, tight:bool=False,
+               width:int=None) -> bool:
+    """Stream bytes from fig to stdout.
+
+    Args:
+        fig: matplotlib figure.
+        fmt: 'jpg', 'png' or 'raw' RGBA (see encode_rgba).
+        quality: JPEG quality.
+        dpi: figure dpi.
+        skip_unchanged: don't write frame if same as last for fig.
+        tight: use savefig(bbox_inches='tight') (slower, extra layout pass).
+        width: render at width [px] instead of dpi.
+
+    Returns True if frame was written.
+    """
+    if width is not None:
+        dpi = width / fig.get_figwidth()
+    if tight:
+        data = BytesIO()
+        fig.savefig(data, format=fmt, bbox_inches='tight', dpi=dpi)
+        data = data.getbuffer()
+    else:
+        data = fig_bytes(fig, fmt, quality, dpi, skip_unchanged)
+        if data is None:
+            return False
+    stdout.buffer.write(data)
     stdout.flush()
+    return True
 
 
 def subplots(nrows=1, ncols=1, dimx=10, dimy=7, **kwargs) -> tuple:
@@ -0,0 +1 @@
+# Weather
@@ -0,0 +1,213 @@
+"""EPW weather file reader w/ columnar on-disk cache."""
+
+import os
+import json
+from dataclasses import dataclass
+import numpy as np
+import numpy.typing as npt
+from egn.hashing import file_hash
+path = os.path
+
+
+CACHE_DIR = path.join(path.expanduser('~'), '.cache', 'egn', 'epw')
+
+# EPW data fields, in file order, w/ column dtype.
+EPW_COLUMNS = (
+    ('year', 'i'), ('month', 'i'), ('day', 'i'), ('hour', 'i'),
+    ('minute', 'i'), ('data_source', 'U'),
+    ('dry_bulb', 'f'),                  # [C]
+    ('dew_point', 'f'),                 # [C]
+    ('rel_humidity', 'f'),              # [%]
+    ('atm_pressure', 'f'),              # [Pa]
+    ('ext_hor_rad', 'f'),               # [Wh/m2]
+    ('ext_dir_norm_rad', 'f'),          # [Wh/m2]
+    ('hor_ir_sky', 'f'),                # [Wh/m2]
+    ('glo_hor_rad', 'f'),               # [Wh/m2]
+    ('dir_norm_rad', 'f'),              # [Wh/m2]
+    ('dif_hor_rad', 'f'),               # [Wh/m2]
+    ('glo_hor_illum', 'f'),             # [lux]
+    ('dir_norm_illum', 'f'),            # [lux]
+    ('dif_hor_illum', 'f'),             # [lux]
+    ('zenith_lum', 'f'),                # [Cd/m2]
+    ('wind_dir', 'f'),                  # [deg]
+    ('wind_spd', 'f'),                  # [m/s]
+    ('tot_sky_cvr', 'f'),               # [tenths]
+    ('opaq_sky_cvr', 'f'),              # [tenths]
+    ('visibility', 'f'),                # [km]
+    ('ceiling_hgt', 'f'),               # [m]
+    ('pres_weath_obs', 'f'),            # [-]
+    ('pres_weath_codes', 'U'),
+    ('precip_wtr', 'f'),                # [mm]
+    ('aerosol_opt_depth', 'f'),         # [thousandths]
+    ('snow_depth', 'f'),                # [cm]
+    ('days_since_snow', 'f'),           # [days]
+    ('albedo', 'f'),                    # [-]
+    ('liq_precip_depth', 'f'),          # [mm]
+    ('liq_precip_rate', 'f'),           # [hr]
+)
+_DTYPES = {'i': np.int32, 'f': np.float64, 'U': np.str_}
+
+
+@dataclass
+class EPW:
+    """EPW header and data as typed NumPy columns.
+
+    Columns are contiguous arrays (memory-mapped when loaded from cache),
+    accessed by name:
+        epw['dry_bulb']  # (8760,) float64 [C]
+
+    Args:
+        location: dict of LOCATION fields.
+        design_conditions: dict of DESIGN CONDITIONS source and heating,
+            cooling, extremes float arrays.
+        ground_temps: dict of GROUND TEMPERATURES depth, conductivity,
+            density, specific_heat (n,) and monthly temps (n, 12).
+        header: raw header lines.
+        columns: dict of column name to array.
+    """
+    location: dict
+    design_conditions: dict
+    ground_temps: dict
+    header: list
+    columns: dict
+
+    def __getitem__(self, key:str) -> npt.NDArray:
+        return self.columns[key]
+
+    def __len__(self) -> int:
+        return len(self.columns['dry_bulb'])
+
+
+def _floats(fields:list) -> npt.NDArray[np.float64]:
+    """Convert str fields to float, w/ nan for empty fields."""
+    return np.array([float(f) if f.strip() else np.nan for f in fields])
+
+
+def parse_location(line:str) -> dict:
+    """Parse LOCATION header line."""
+    f = line.strip().split(',')
+    return {
+        'city': f[1], 'state': f[2], 'country': f[3], 'source': f[4],
+        'wmo': f[5], 'latitude': float(f[6]), 'longitude': float(f[7]),
+        'time_zone': float(f[8]), 'elevation': float(f[9])}
+
+
+def parse_design_conditions(line:str) -> dict:
+    """Parse DESIGN CONDITIONS header line into heating, cooling, extremes."""
+    f = line.strip().split(',')
+    design = {'source': f[2] if len(f) > 2 else ''}
+    keys = ('Heating', 'Cooling', 'Extremes')
+    idx = [f.index(k) for k in keys if k in f] + [len(f)]
+    for i, j in zip(idx[:-1], idx[1:]):
+        design[f[i].lower()] = _floats(f[i + 1:j])
+    return design
+
+
+def parse_ground_temps(line:str) -> dict:
+    """Parse GROUND TEMPERATURES header line, 16 fields per depth."""
+    f = line.strip().split(',')
+    n = int(f[1]) if f[1].strip() else 0
+    vals = _floats(f[2:2 + (16 * n)]).reshape(n, 16)
+    return {
+        'depth': vals[:, 0], 'conductivity': vals[:, 1],
+        'density': vals[:, 2], 'specific_heat': vals[:, 3],
+        'temps': vals[:, 4:]}
+
+
+def _parse_header(header:list) -> tuple:
+    """Parse location, design conditions, ground temps from header lines."""
+    lines = {line.split(',', 1)[0]: line for line in header}
+    location = parse_location(lines['LOCATION'])
+    design = parse_design_conditions(lines.get('DESIGN CONDITIONS', ''))
+    ground = parse_ground_temps(lines.get('GROUND TEMPERATURES', 'G,0'))
+    return location, design, ground
+
+
+def parse_data(lines:list) -> dict:
+    """Parse EPW data rows into dict of typed columns.
+
+    All rows are tokenized in one split, then converted column-wise by
+    NumPy rather than per row.
+    """
+    n, m = len(lines), len(EPW_COLUMNS)
+    cells = np.array(','.join(lines).split(','))
+    assert cells.size == n * m, \
+        f"Expected {m} fields per EPW row, got {cells.size / n:.1f}"
+    cells = cells.reshape(n, m)
+    columns = {}
+    for i, (name, kind) in enumerate(EPW_COLUMNS):
+        col = cells[:, i]
+        if kind == 'f':
+            col = np.where(col == '', 'nan', col)
+        columns[name] = np.ascontiguousarray(col.astype(_DTYPES[kind]))
+    return columns
+
+
+def _cache_path(fpath:str, cache_dir:str) -> str:
+    stem = path.splitext(path.basename(fpath))[0]
+    return path.join(cache_dir, f'{stem}-{file_hash(fpath)}')
+
+
+def _write_cache(epw:EPW, cache_fpath:str) -> None:
+    """Write columns as one contiguous .npy per dtype, and header as json.
+
+    The json is written last, and marks the cache entry as complete.
+    """
+    os.makedirs(cache_fpath, exist_ok=True)
+    meta = {'header': epw.header, 'groups': {}}
+    for kind in ('i', 'f', 'U'):
+        names = [name for name, k in EPW_COLUMNS if k == kind]
+        arr = np.stack([epw.columns[name] for name in names])
+        tmp_fpath = path.join(cache_fpath, f'{kind}.tmp.npy')
+        np.save(tmp_fpath, arr)
+        os.replace(tmp_fpath, path.join(cache_fpath, f'{kind}.npy'))
+        meta['groups'][kind] = names
+    tmp_fpath = path.join(cache_fpath, 'meta.tmp.json')
+    with open(tmp_fpath, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_fpath, path.join(cache_fpath, 'meta.json'))
+
+
+def _read_cache(cache_fpath:str) -> EPW:
+    """Memory-map cached columns."""
+    with open(path.join(cache_fpath, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    columns = {}
+    for kind, names in meta['groups'].items():
+        arr = np.load(path.join(cache_fpath, f'{kind}.npy'), mmap_mode='r')
+        columns.update(zip(names, arr))
+    header = meta['header']
+    return EPW(*_parse_header(header), header=header, columns=columns)
+
+
+def read_epw(fpath:str, cache_dir:str=CACHE_DIR, use_cache:bool=True) -> EPW:
+    """Read EPW file, from cache if file contents unchanged.
+
+    Usage:
+    .. code-block:: python
+
+        epw = read_epw(epw_fpath)
+        temp_ext = epw['dry_bulb']  # (8760,) [C]
+        lat = epw.location['latitude']
+
+    Args:
+        fpath: EPW filepath.
+        cache_dir: directory of cache entries, keyed by file hash.
+        use_cache: read/write cache if True, else always parse.
+
+    Returns EPW.
+    """
+    cache_fpath = _cache_path(fpath, cache_dir) if use_cache else None
+    if use_cache and path.isfile(path.join(cache_fpath, 'meta.json')):
+        return _read_cache(cache_fpath)
+
+    with open(fpath, 'r', encoding='latin-1') as f:
+        lines = f.read().splitlines()
+    i = next(i for i, line in enumerate(lines)
+             if line.startswith('DATA PERIODS')) + 1
+    header, data = lines[:i], [line for line in lines[i:] if line]
+    epw = EPW(*_parse_header(header), header=header, columns=parse_data(data))
+
+    if use_cache:
+        _write_cache(epw, cache_fpath)
+    return epw
@@ -0,0 +1,53 @@
+# Image width and quality negotiation tests
+
+import numpy as np
+import cv2
+from egn.server import adapt
+
+
+def test_bucket_width():
+    """Test widths snap up to buckets, and cap at the largest."""
+    assert adapt.bucket_width(1) == 320
+    assert adapt.bucket_width(320) == 320
+    assert adapt.bucket_width(321) == 480
+    assert adapt.bucket_width(10_000) == adapt.WIDTHS[-1]
+
+
+def test_negotiate():
+    """Test quality from downlink and rtt, or forced and clipped."""
+    assert adapt.negotiate({}) == adapt.DEFAULT_PROFILE
+    assert adapt.negotiate({'width': 1000}) == {'width': 1280, 'quality': 90}
+    assert adapt.negotiate({'width': 500, 'downlink': 5.0}
+                           )['quality'] == 80
+    assert adapt.negotiate({'width': 500, 'downlink': 5.0, 'rtt': 500}
+                           )['quality'] == 70
+    assert adapt.negotiate({'width': 500, 'downlink': 0.1, 'rtt': 500}
+                           )['quality'] == 50
+    assert adapt.negotiate({'width': 500, 'quality': 200}
+                           ) == {'width': 640, 'quality': 95}
+
+    # Malformed client payloads fall back to defaults, w/o raising
+    assert adapt.negotiate({'width': '800', 'downlink': '5'}
+                           ) == {'width': 960, 'quality': 80}
+    for viewport in ({'width': None, 'quality': None},
+                     {'width': 'wide', 'downlink': 'fast', 'rtt': [1]},
+                     {'width': float('nan'), 'quality': 'inf'},
+                     None, 'viewport'):
+        assert adapt.negotiate(viewport) == adapt.DEFAULT_PROFILE
+    # Below the lowest downlink bound is the lowest quality
+    assert adapt.negotiate({'downlink': -1.0, 'rtt': None}
+                           ) == {'width': 640, 'quality': 50}
+
+
+def test_variant():
+    """Test downscale keeps aspect, and doesn't upscale."""
+    image = np.zeros((300, 600, 3), dtype=np.uint8)
+    assert adapt.resize_width(image, 200).shape == (100, 200, 3)
+    assert adapt.resize_width(image, 800) is image
+
+    data = cv2.imencode('.png', image)[1].tobytes()
+    variant = adapt.variant(data, 320, 50)
+    assert variant[:2] == b'\xff\xd8'
+    decoded = cv2.imdecode(np.frombuffer(variant, np.uint8),
+                           cv2.IMREAD_COLOR)
+    assert decoded.shape == (160, 320, 3)
@@ -0,0 +1,56 @@
+# Server client tests
+
+import os
+import sys
+import threading
+path = os.path
+
+SERVER_DIR = path.join(path.dirname(path.abspath(__file__)), '..', 'egn',
+                       'server')
+sys.path.insert(0, SERVER_DIR)
+import client  # noqa: E402
+
+
+def test_send_error(capsys):
+    """Test flush returns after a failing post, and sender keeps running."""
+    posted = []
+
+    def post_image(data):
+        if data == b'bad':
+            raise RuntimeError('not a requests error')
+        posted.append(data)
+
+    with client.Client('http://127.0.0.1:1') as c:
+        c.post_image = post_image
+        c.send_image(b'bad')
+        assert c.flush(timeout=5.0)
+        assert c.n_errors == 1 and c.n_sent == 0
+        c.send_image(b'good')
+        assert c.flush(timeout=5.0)
+        assert posted == [b'good'] and c.n_sent == 1
+    assert capsys.readouterr().out == ''
+
+
+def test_backpressure():
+    """Test latest image wins, and texts batch, while a post is in flight."""
+    posted, release = [], threading.Event()
+
+    def post_image(data):
+        posted.append(data)
+        release.wait(5.0)
+
+    with client.Client('http://127.0.0.1:1') as c:
+        c.post_image = post_image
+        c.post_texts = posted.append
+        c.send_image(b'0')
+        while not posted:  # sender blocked in first post
+            release.wait(0.01)
+        for data in (b'1', b'2', b'3'):
+            c.send_image(data)
+        c.send_text('a')
+        c.send_text('b')
+        assert not c.flush(timeout=0.05)
+        release.set()
+        assert c.flush(timeout=5.0)
+    assert posted == [b'0', ['a', 'b'], b'3']
+    assert c.n_sent == 3 and c.n_dropped == 2 and c.n_errors == 0
@@ -0,0 +1,85 @@
+# CSG SDF tests
+
+import numpy as np
+from egn.prob import csg, psdf
+
+
+def _grid(n=33):
+    x, y = np.meshgrid(np.linspace(-2, 2, n), np.linspace(-2, 2, n),
+                       indexing='ij')
+    return np.stack([x.ravel(), y.ravel()])  # (2, N)
+
+
+def _box(pts, center, half):
+    """Reference box SDF, positive inside."""
+    q = np.abs(pts - np.array(center)[:, None]) - np.array(half)[:, None]
+    outside = np.linalg.norm(np.maximum(q, 0.0), axis=0)
+    return -(outside + np.minimum(q.max(axis=0), 0.0))
+
+
+def test_primitives():
+    """Test sphere, box, plane SDFs match reference and circle_sdf."""
+    pts = _grid()
+    sph = csg.Sphere([0.5, 0.0], 1.0)
+    circ = psdf.circle_sdf(np.array([0.5, 0.0]), 1.0)
+    assert np.all(np.abs(sph(pts) - circ(pts)) < 1e-10)
+    # Far from origin, where |p|^2 - 2c.p + |c|^2 cancels
+    far = csg.Sphere([1e6, 1e6], 1e-3).compile()
+    assert np.abs(far(np.array([1e6 + 1e-3, 1e6]))) < 1e-9
+
+    box = csg.Box([0.0, 0.5], [1.0, 0.5])
+    assert np.all(np.abs(box(pts) - _box(pts, [0.0, 0.5], [1.0, 0.5])) < 1e-10)
+    assert np.abs(box(np.array([0.0, 0.5])) - 0.5) < 1e-10
+
+    pln = csg.Plane([0.0, 2.0], 1.0)  # y <= 1
+    assert np.all(np.abs(pln(pts) - (1.0 - pts[1])) < 1e-10)
+
+
+def test_combinators():
+    """Test union, intersection, subtraction and transforms."""
+    pts = _grid()
+    a_, b_ = csg.Sphere([0, 0], 1.0), csg.Box([1, 0], [0.5, 0.5])
+    a, b = a_(pts), b_(pts)
+    assert np.all(np.abs((a_ | b_)(pts) - np.maximum(a, b)) < 1e-10)
+    assert np.all(np.abs((a_ & b_)(pts) - np.minimum(a, b)) < 1e-10)
+    assert np.all(np.abs((a_ - b_)(pts) - np.minimum(a, -b)) < 1e-10)
+
+    # Smooth union bounds union from above, and matches far from the seam
+    sm = csg.SmoothUnion(a_, b_, k=0.2)(pts)
+    assert np.all(sm >= np.maximum(a, b) - 1e-10)
+    assert np.all(sm - np.maximum(a, b) <= 0.05 + 1e-10)
+
+    # Transforms: s sdf((p - t) / s)
+    t, s = np.array([0.5, -0.25]), 2.0
+    expr = (a_ - b_).scale(s).translate(t)
+    ref = (a_ - b_)((pts - t[:, None]) / s) * s
+    assert np.all(np.abs(expr(pts) - ref) < 1e-10)
+    pln = csg.Plane([1.0, 1.0], 0.5)
+    ref = pln((pts - t[:, None]) / s) * s
+    assert np.all(np.abs(pln.scale(s).translate(t)(pts) - ref) < 1e-10)
+
+
+def test_compile_shared():
+    """Test identical subtrees and primitives are evaluated once."""
+    pts = _grid()
+    sph = [csg.Sphere([x, 0.0], 0.2) for x in np.linspace(-1, 1, 10)]
+    shell = csg.Union(*sph) - csg.Box([0, 0], [2, 0.05])
+    scene = csg.Union(shell, shell.translate([0.0, 0.0]), sph[0])
+    fn = scene.compile(chunk_size=100)
+    assert fn.n_prims == 11
+    assert fn.n_regs == 11 + 3  # 2 unions, 1 subtract
+
+    ref = np.minimum(np.max([s(pts) for s in sph], axis=0),
+                     -_box(pts, [0, 0], [2, 0.05]))
+    ref = np.maximum(ref, sph[0](pts))
+    assert np.all(np.abs(fn(pts) - ref) < 1e-10)
+    dist = psdf.sample_grid(fn, [(-2, 2), (-2, 2)], (33, 33))
+    assert np.all(np.abs(dist.ravel() - ref) < 1e-10)
+
+
+def test_compile_3d():
+    """Test 3D scene of spheres and boxes."""
+    scene = csg.Sphere([0, 0, 0], 1.0) | csg.Box([2, 0, 0], [0.5, 0.5, 0.5])
+    fn = scene.compile()
+    pts = np.array([[0, 0, 0], [2, 0, 0], [1.5, 0, 0], [4, 0, 0]], float)
+    assert np.all(np.abs(fn(pts) - [1.0, 0.5, 0.0, -1.5]) < 1e-10)
@@ -0,0 +1,81 @@
+# Tile delta streaming tests
+
+import numpy as np
+import cv2
+from socketio import packet
+from egn.server import delta
+
+
+def _png(image:np.ndarray) -> bytes:
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def test_changed_tiles():
+    """Test tile mask of changed pixels, w/ partial edge tiles."""
+    prev = np.zeros((100, 150, 3), dtype=np.uint8)
+    image = prev.copy()
+    image[10, 10] = 1       # tile (0, 0)
+    image[99, 149] = 1      # partial tile (1, 2)
+    mask = delta.changed_tiles(prev, image, 64)
+    assert mask.shape == (2, 3)
+    assert np.array_equal(np.argwhere(mask), [[0, 0], [1, 2]])
+    assert not delta.changed_tiles(prev, prev, 64).any()
+
+
+def test_tile_runs():
+    """Test runs of adjacent changed tiles per row, as python ints."""
+    mask = np.array([[1, 1, 0, 1],
+                     [0, 0, 0, 0],
+                     [0, 1, 1, 1]], dtype=bool)
+    runs = delta.tile_runs(mask)
+    assert runs == [(0, 0, 2), (0, 3, 4), (2, 1, 4)]
+    assert all(type(i) is int for run in runs for i in run)
+
+
+def test_update():
+    """Test keyframe, delta of changed tiles, and unchanged frames."""
+    differ = delta.TileDiffer(tile=64, keyframe_every=10)
+    image = np.zeros((128, 192, 3), dtype=np.uint8)
+    assert differ.keyframe() is None
+
+    message = differ.update(_png(image), 'image/png')
+    assert message['keyframe'] and message['seq'] == 0
+    assert message['shape'] == (128, 192)
+    assert len(message['tiles']) == 1
+
+    changed = image.copy()
+    changed[70:80, 70:200] = 255
+    message = differ.update(_png(changed), 'image/png')
+    assert not message['keyframe'] and message['seq'] == 1
+    assert [t[:2] for t in message['tiles']] == [[64, 64]]
+    tile = cv2.imdecode(np.frombuffer(message['tiles'][0][2], np.uint8),
+                        cv2.IMREAD_COLOR)
+    assert np.array_equal(tile, changed[64:128, 64:192])
+
+    message = differ.update(_png(changed), 'image/png')
+    assert not message['keyframe'] and message['tiles'] == []
+
+    # Shape change forces a keyframe
+    message = differ.update(_png(changed[:64]), 'image/png')
+    assert message['keyframe'] and message['shape'] == (64, 192)
+
+
+def test_message_encode():
+    """Test delta message round trips through socket.io packet encoding."""
+    differ = delta.TileDiffer(tile=64)
+    image = np.zeros((128, 192, 3), dtype=np.uint8)
+    differ.update(_png(image), 'image/png')
+    image[0:10, 100:110] = 255
+    message = differ.update(_png(image), 'image/png')
+    assert message['tiles']
+
+    encoded = packet.Packet(packet.EVENT,
+                            data=['stream_delta', message]).encode()
+    decoded = packet.Packet(encoded_packet=encoded[0])
+    for attachment in encoded[1:]:
+        decoded.add_attachment(attachment)
+    event, data = decoded.data
+    assert event == 'stream_delta'
+    assert data['seq'] == message['seq']
+    assert list(data['shape']) == [128, 192]
+    assert data['tiles'] == [list(t) for t in message['tiles']]
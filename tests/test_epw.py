@@ -0,0 +1,50 @@
+# EPW reader tests
+
+import os
+import numpy as np
+from egn.weather import epw
+path = os.path
+
+
+EPW_FPATH = path.join(
+    path.dirname(path.abspath(__file__)), '..', 'resources',
+    'USA_AZ_Tucson-Davis-Monthan.AFB.722745_TMY3',
+    'USA_AZ_Tucson-Davis-Monthan.AFB.722745_TMY3.epw')
+
+
+def test_read_epw(tmp_path):
+    """Test EPW header and columns of bundled Tucson TMY3."""
+    wea = epw.read_epw(EPW_FPATH, cache_dir=str(tmp_path))
+
+    assert wea.location['wmo'] == '722745'
+    assert np.abs(wea.location['latitude'] - 32.167) < 1e-6
+    assert np.abs(wea.location['elevation'] - 809.0) < 1e-6
+    assert wea.design_conditions['heating'][0] == 12
+    assert wea.design_conditions['extremes'].shape == (15,)
+    ground = wea.ground_temps
+    assert np.all(np.abs(ground['depth'] - [0.5, 2.0, 4.0]) < 1e-6)
+    assert ground['temps'].shape == (3, 12)
+    assert np.abs(ground['temps'][0, 0] - 12.94) < 1e-6
+
+    assert len(wea) == 8760
+    assert wea['hour'].dtype == np.int32
+    assert wea['hour'][0] == 1 and wea['hour'][-1] == 24
+    assert np.abs(wea['dry_bulb'][0] - 5.6) < 1e-6
+    assert np.abs(wea['liq_precip_rate'][0] - 1.0) < 1e-6
+    assert wea['pres_weath_codes'][0] == '999999999'
+
+
+def test_read_epw_cache(tmp_path):
+    """Test EPW cache is memory-mapped and matches parsed columns."""
+    wea = epw.read_epw(EPW_FPATH, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+
+    wea_ = epw.read_epw(EPW_FPATH, cache_dir=str(tmp_path))
+    assert isinstance(wea_['dry_bulb'], np.memmap)
+    assert wea_.location == wea.location
+    for name, col in wea.columns.items():
+        assert np.array_equal(col, wea_[name]), name
+
+    # Bypass cache
+    wea_ = epw.read_epw(EPW_FPATH, cache_dir=str(tmp_path), use_cache=False)
+    assert not isinstance(wea_['dry_bulb'], np.memmap)
@@ -0,0 +1,128 @@
+# ezplt daemon tests
+
+import os
+import sys
+import stat
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client as Connect
+import pytest
+path = os.path
+
+SERVER_DIR = path.join(path.dirname(path.abspath(__file__)), '..', 'egn',
+                       'server')
+sys.path.insert(0, SERVER_DIR)
+import ezplt  # noqa: E402
+import ezplt_daemon  # noqa: E402
+import request  # noqa: E402
+
+
+def _mode(fpath:str) -> int:
+    return stat.S_IMODE(os.lstat(fpath).st_mode)
+
+
+def test_ezplt_authkey(tmp_path):
+    """Test random authkey in user only file, in user only dir."""
+    address = str(tmp_path / 'run' / 'ezplt.sock')
+    key = request.ezplt_authkey(address, new=True)
+    assert len(key) == 32
+    assert _mode(path.dirname(address)) == 0o700
+    assert _mode(path.join(path.dirname(address), 'ezplt.key')) == 0o600
+    assert request.ezplt_authkey(address) == key
+    assert request.ezplt_authkey(address, new=True) != key
+
+    os.chmod(path.dirname(address), 0o755)
+    with pytest.raises(PermissionError):
+        request.ezplt_authkey(address)
+
+
+def test_run_snippet():
+    """Test figures w/ data are returned, and ezplt data is not mutated."""
+    x = ezplt.X.copy()
+    state = ezplt.RAND.get_state()[1].copy()
+    frames = ezplt_daemon.run_snippet('X[:] = 0; RAND.uniform(); ax.plot(X)')
+    assert len(frames) == 1 and frames[0][:2] == b'\xff\xd8'
+    assert (ezplt.X == x).all()
+    assert (ezplt.RAND.get_state()[1] == state).all()
+    assert ezplt_daemon.run_snippet('x = 1') == []
+
+
+def test_pool_isolation():
+    """Test state mutated by a snippet does not reach the next one."""
+    pool = ezplt_daemon.EzpltPool(n_workers=1, timeout=10.0)
+    try:
+        status, frames = pool.run(
+            'import ezplt, numpy; ezplt.Y[:] = 0; ezplt.Z = 1; '
+            'numpy.pi = 3; ax.plot(X, Y)', post=False)
+        assert status == 'ok' and len(frames) == 1
+        status, result = pool.run(
+            'import ezplt, numpy\n'
+            'assert ezplt.Y.any() and not hasattr(ezplt, "Z")\n'
+            'assert numpy.pi > 3.14', post=False)
+        assert (status, result) == ('ok', [])
+    finally:
+        pool.close()
+
+
+def test_pool_post():
+    """Test figures are posted to the server from the worker."""
+    posted = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            posted.append((self.path, self.rfile.read(
+                int(self.headers['Content-Length']))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/'
+    pool = ezplt_daemon.EzpltPool(n_workers=1, timeout=10.0, url=url)
+    try:
+        assert pool.run('ax.plot(X)') == ('ok', 1)
+        assert len(posted) == 1 and posted[0][0] == '/image_file'
+        assert posted[0][1][:2] == b'\xff\xd8'
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+def test_pool_timeout():
+    """Test timed out worker is killed and replaced."""
+    pool = ezplt_daemon.EzpltPool(n_workers=1, timeout=0.5)
+    try:
+        assert pool.run('import time; time.sleep(10)',
+                        post=False)[0] == 'timeout'
+        assert pool.run('raise ValueError', post=False)[0] == 'error'
+        assert pool.run('ax.plot(X)', post=False)[0] == 'ok'
+    finally:
+        pool.close()
+
+
+def test_serve(tmp_path):
+    """Test snippets over socket, only w/ the daemon's authkey."""
+    address = str(tmp_path / 'run' / 'ezplt.sock')
+    pool = ezplt_daemon.EzpltPool(n_workers=1, timeout=10.0)
+    threading.Thread(target=ezplt_daemon.serve, args=(pool, address),
+                     daemon=True).start()
+    try:
+        for _ in range(100):
+            if path.exists(address):
+                break
+            time.sleep(0.05)
+        assert _mode(address) == 0o600
+        status, frames = request.ezplt_snippet(
+            'ax.plot(X)', address, post=False)
+        assert status == 'ok' and len(frames) == 1
+        with pytest.raises(AuthenticationError):
+            Connect(address, authkey=b'egn-ezplt')
+        # Still serving after a rejected client
+        assert request.ezplt_snippet('x = 1', address, post=False)[0] == 'ok'
+    finally:
+        pool.close()
@@ -0,0 +1,54 @@
+# Frame pool tests
+
+import eventlet
+from egn.server import frames
+
+
+def _wait(cond, timeout:float=5.0) -> None:
+    """Yield to the eventlet hub until cond() or timeout."""
+    with eventlet.Timeout(timeout):
+        while not cond():
+            eventlet.sleep(0.01)
+
+
+def test_latest_frame_wins():
+    """Test pending frame is replaced and counted as dropped."""
+    emitted = []
+    pool = frames.FramePool(
+        process=lambda frame: (frame * 2, {'process': 0.0}),
+        emit=lambda sid, result: emitted.append((sid, result)),
+        max_workers=1)
+    # Submitted w/o yielding, so only the first and last frames are drained
+    for i in range(5):
+        pool.submit('a', i)
+    pool.submit('b', 10)
+    assert pool.queue_depth == 2 and pool.active_clients == 2
+    _wait(lambda: pool.n_processed == 2)
+    assert sorted(emitted) == [('a', 8), ('b', 20)]
+    assert pool.n_dropped == 4 and pool.dropped == {'a': 4}
+
+    stats = pool.stats()
+    assert stats['queue_depth'] == 0 and stats['active_clients'] == 0
+    assert stats['submitted'] == 6 and stats['processed'] == 2
+    assert set(stats['stage_mean_ms']) == {'process', 'emit', 'total'}
+
+    pool.discard('a')
+    assert pool.dropped == {}
+
+
+def test_frame_error():
+    """Test failing frame is counted, and later frames still processed."""
+    emitted, observed = [], []
+
+    def process(frame):
+        if frame == 'bad':
+            raise ValueError('bad frame')
+        return frame, {}
+
+    pool = frames.FramePool(process, lambda sid, result: emitted.append(result),
+                            observe=observed.append)
+    pool.submit('a', 'bad')
+    _wait(lambda: pool.n_errors == 1)
+    pool.submit('a', 1)
+    _wait(lambda: pool.n_processed == 1)
+    assert emitted == [1] and len(observed) == 1
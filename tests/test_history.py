@@ -0,0 +1,26 @@
+# Server history tests
+
+from egn.server import history
+
+
+def test_ring():
+    """Test bounded ring per channel, w/ total counts."""
+    h = history.History(maxlen=3)
+    assert [h.append('text', i) for i in range(5)] == [0, 1, 2, 3, 4]
+    h.append('image', 'a')
+    assert h.last('text') == [2, 3, 4]
+    assert h.last('text', 2) == [3, 4] and h.last('text', 10) == [2, 3, 4]
+    assert h.last('missing') == [] and h.count('missing') == 0
+    assert h.count('text') == 5 and h.count('image') == 1
+    assert h.channels() == ['text', 'image']
+    assert list(h.spilled('text')) == []
+
+
+def test_spill(tmp_path):
+    """Test evicted items are spilled to disk, oldest first."""
+    h = history.History(maxlen=2, spill_dir=str(tmp_path / 'spill'))
+    for i in range(5):
+        h.append('image', {'key': str(i)})
+    assert [e['key'] for e in h.spilled('image')] == ['0', '1', '2']
+    assert [e['key'] for e in h.last('image')] == ['3', '4']
+    assert list(h.spilled('text')) == []
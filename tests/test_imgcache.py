@@ -0,0 +1,47 @@
+# Image cache tests
+
+from egn import hashing
+from egn.osm import cache
+from egn.weather import epw
+from egn.server import imgcache
+
+
+def _entry(key:str, n:int) -> dict:
+    return {'key': key, 'data': b'x' * n, 'mime': 'image/jpeg', 'stats': ''}
+
+
+def test_digest():
+    """Test content key is stable, and differs w/ content."""
+    assert imgcache.digest(b'abc') == imgcache.digest(b'abc')
+    assert imgcache.digest(b'abc') != imgcache.digest(b'abd')
+    assert len(imgcache.digest(b'')) == 32
+
+
+def test_file_hash(tmp_path):
+    """Test file caches and image cache share one content hash."""
+    data = bytes(range(256)) * 10_000
+    fpath = tmp_path / 'data.bin'
+    fpath.write_bytes(data)
+    assert cache.file_hash is epw.file_hash is hashing.file_hash
+    assert hashing.file_hash(str(fpath)) == imgcache.digest(data)
+
+
+def test_lru():
+    """Test least recently used entries evicted past max_bytes."""
+    cache = imgcache.ImageCache(max_bytes=30)
+    for key in 'abc':
+        cache.put(_entry(key, 10))
+    assert len(cache) == 3 and cache.n_bytes == 30
+    assert cache.get('a')['key'] == 'a'  # a now most recent
+    cache.put(_entry('b', 10))           # repost doesn't add bytes
+    assert cache.n_bytes == 30
+    cache.put(_entry('d', 10))
+    assert 'c' not in cache and all(k in cache for k in 'abd')
+    assert cache.get('c') is None
+    assert (cache.n_hits, cache.n_misses) == (1, 1)
+
+    # Entry larger than cache is kept alone
+    cache.put(_entry('e', 100))
+    assert len(cache) == 1 and 'e' in cache
+    assert cache.stats() == {'entries': 1, 'bytes': 100, 'max_bytes': 30,
+                             'hits': 1, 'misses': 1}
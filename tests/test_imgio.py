@@ -0,0 +1,33 @@
+# Image header probing tests
+
+import struct
+import numpy as np
+import cv2
+from egn.server import imgio
+
+
+def _encode(ext:str, image:np.ndarray, params:list=()) -> bytes:
+    return cv2.imencode(ext, image, list(params))[1].tobytes()
+
+
+def test_image_size():
+    """Test (height, width) from JPEG, PNG, GIF and BMP headers."""
+    image = np.zeros((37, 53, 3), dtype=np.uint8)
+    for data in (_encode('.jpg', image),
+                 _encode('.jpg', image, [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]),
+                 _encode('.png', image),
+                 _encode('.bmp', image),
+                 b'GIF89a' + struct.pack('<HH', 53, 37) + b'\x00' * 8):
+        assert imgio.image_size(data) == (37, 53)
+    assert imgio.image_size(b'not an image') is None
+    # Truncated header
+    assert imgio.image_size(_encode('.jpg', image)[:20]) is None
+
+
+def test_mime_type():
+    """Test mime type from magic bytes, w/ jpeg default."""
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    assert imgio.mime_type(_encode('.png', image)) == 'image/png'
+    assert imgio.mime_type(_encode('.bmp', image)) == 'image/bmp'
+    assert imgio.mime_type(b'GIF87a') == 'image/gif'
+    assert imgio.mime_type(_encode('.jpg', image)) == 'image/jpeg'
@@ -0,0 +1,57 @@
+# Monte Carlo occupancy tests
+
+import math
+import numpy as np
+from egn.prob import csg, mc, psdf
+
+
+def _phi(x):
+    """Standard normal CDF."""
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def test_occupancy_plane():
+    """Test occupancy and gradient of half plane x <= 0 vs analytic.
+
+    Given eps ~ N(0, s^2), P(x + eps <= 0) = Phi(-x / s), and
+    dP/dx = -pdf(x / s) / s.
+    """
+    sdf = csg.Plane([1.0, 0.0], 0.0).compile()
+    s = 0.2
+    xs = np.array([-0.1, 0.0, 0.2])
+    pts = np.stack([xs, np.zeros(3)])
+    occ = mc.occupancy(sdf, pts, s, n_samples=200_000, rng=0, grad=True,
+                       chunk_size=10_000)
+    assert occ.prob.shape == (3,) and occ.grad.shape == (2, 3)
+
+    prob_ = np.array([_phi(-x / s) for x in xs])
+    assert np.all(np.abs(occ.prob - prob_) < 5 * occ.stderr + 1e-6)
+    grad_ = -np.exp(-0.5 * (xs / s) ** 2) / (math.sqrt(2 * math.pi) * s)
+    assert np.all(np.abs(occ.grad[0] - grad_) < 0.05), occ.grad
+    assert np.all(np.abs(occ.grad[1]) < 0.05), occ.grad
+
+
+def test_occupancy_circle():
+    """Test occupancy of circle center, P(|eps| <= r) = 1 - exp(-r^2/2s^2).
+    """
+    sdf = psdf.circle_sdf(np.array([0.0, 0.0]), 1.0)
+    occ = mc.occupancy(sdf, np.zeros(2), 0.5, n_samples=100_000, rng=1)
+    prob_ = 1.0 - np.exp(-1.0 / (2.0 * 0.25))
+    assert np.abs(occ.prob[0] - prob_) < 5 * occ.stderr[0]
+    assert occ.grad is None
+
+    # Seeded draws are reproducible, and anisotropic cov accepted
+    cov = np.array([[0.25, 0.1], [0.1, 0.09]])
+    occ_a = mc.occupancy(sdf, np.zeros(2), cov, n_samples=1000, rng=2)
+    occ_b = mc.occupancy(sdf, np.zeros(2), cov, n_samples=1000,
+                         rng=np.random.default_rng(2))
+    assert occ_a.prob[0] == occ_b.prob[0]
+
+
+def test_sdf_grad():
+    """Test finite difference SDF gradient is unit normal."""
+    sdf = csg.Sphere([0.0, 0.0, 0.0], 1.0).compile()
+    pts = np.array([[2.0, 0.0, 0.0], [0.0, 0.0, -0.5]]).T
+    grad = mc.sdf_grad(sdf, pts)
+    assert grad.shape == (3, 2)
+    assert np.all(np.abs(grad - [[-1, 0], [0, 0], [0, 1]]) < 1e-6)
@@ -0,0 +1,65 @@
+# Metrics and profiler tests
+
+import time
+from egn.server import metrics
+
+
+def test_render():
+    """Test Prometheus text of counters, gauges and histograms."""
+    reg = metrics.Registry()
+    c = reg.counter('c_total', 'A counter.', ('route',))
+    g = reg.gauge('g', 'A gauge.', fn=lambda: 7)
+    h = reg.histogram('h_seconds', 'A histogram.', ('event',),
+                      buckets=(0.1, 1.0))
+    c.inc(route='/a')
+    c.inc(2, route='/a')
+    for value in (0.05, 0.5, 5.0):
+        h.observe(value, event='x')
+    assert reg.render().splitlines() == [
+        '# HELP c_total A counter.',
+        '# TYPE c_total counter',
+        'c_total{route="/a"} 3',
+        '# HELP g A gauge.',
+        '# TYPE g gauge',
+        'g 7',
+        '# HELP h_seconds A histogram.',
+        '# TYPE h_seconds histogram',
+        'h_seconds_bucket{event="x",le="0.1"} 1',
+        'h_seconds_bucket{event="x",le="1.0"} 2',
+        'h_seconds_bucket{event="x",le="+Inf"} 3',
+        'h_seconds_sum{event="x"} 5.55',
+        'h_seconds_count{event="x"} 3']
+
+
+def test_time():
+    """Test decorator observes duration, also when fn raises."""
+    h = metrics.Histogram('h', '', ('event',))
+
+    @h.time(event='x')
+    def fn(fail):
+        if fail:
+            raise ValueError
+        return 1
+
+    assert fn(False) == 1
+    try:
+        fn(True)
+    except ValueError:
+        pass
+    _, _, count = list(h.samples())[-1]
+    assert count == 2
+
+
+def test_sampler():
+    """Test sampler collects stacks of other threads, in folded format."""
+    sampler = metrics.Sampler(interval=0.001)
+    sampler.start()
+    t0 = time.perf_counter()
+    while sampler.n_samples < 5 and time.perf_counter() - t0 < 5.0:
+        sum(range(1000))
+    sampler.stop()
+    assert not sampler.running and sampler.n_samples >= 5
+    lines = sampler.collapsed().splitlines()
+    assert any('test_sampler' in line for line in lines)
+    stack, n = lines[0].rsplit(' ', 1)
+    assert int(n) >= 1 and ';' in stack
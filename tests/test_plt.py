@@ -0,0 +1,37 @@
+# Figure streaming tests
+
+from io import BytesIO
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from PIL import Image
+from egn.viz import plt as vplt
+
+
+def test_fig_bytes():
+    """Test single draw encoders and skipping of unchanged figures."""
+    fig, ax = vplt.subplots(dimx=4, dimy=3)
+    line, = ax[0].plot(np.arange(10))
+
+    raw = vplt.fig_bytes(fig, 'raw', dpi=50)
+    assert raw.shape == (150, 200, 4)
+    for fmt in ('jpg', 'png'):
+        img = Image.open(BytesIO(vplt.fig_bytes(fig, fmt, dpi=50)))
+        assert img.size == (200, 150)
+
+    assert vplt.fig_bytes(fig, dpi=50, skip_unchanged=True) is not None
+    assert vplt.fig_bytes(fig, dpi=50, skip_unchanged=True) is None
+    # Stale, but same pixels
+    line.set_ydata(np.arange(10))
+    assert vplt.fig_bytes(fig, dpi=50, skip_unchanged=True) is None
+    line.set_ydata(np.arange(10)[::-1])
+    assert vplt.fig_bytes(fig, dpi=50, skip_unchanged=True) is not None
+
+    # Unchanged fig, but new render params
+    for kwargs in (dict(dpi=100), dict(width=800), dict(width=800, fmt='png'),
+                   dict(width=800, fmt='png', quality=50)):
+        data = vplt.fig_bytes(fig, skip_unchanged=True, **kwargs)
+        assert data is not None
+    assert Image.open(BytesIO(data)).size == (800, 600)
+    assert vplt.fig_bytes(fig, skip_unchanged=True, width=800, fmt='png',
+                          quality=50) is None
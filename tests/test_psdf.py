@@ -1,7 +1,7 @@
 # pSDF tests
 
 import numpy as np
-from thiru import psdf
+from egn.prob import psdf
 
 
 def _vec(*args):
@@ -35,3 +35,35 @@ def test_point_sdf():
     assert np.abs(sdf - 1.0) < 1e-6, sdf
 
 
+def test_sdf_batch():
+    """Test SDFs evaluate (d, N) and (N, d) point batches per point."""
+    pts = np.array([[0, 0], [1, 0], [3, 4]], dtype=float)  # (N, d)
+    pt_sdf = psdf.point_sdf(_vec(0, 0))
+    sdf = pt_sdf(pts)
+    assert sdf.shape == (3,), sdf.shape
+    assert np.all(np.abs(sdf - [0.0, 1.0, 5.0]) < 1e-6), sdf
+    assert np.all(np.abs(pt_sdf(pts.T) - sdf) < 1e-10)
+    assert np.abs(pt_sdf(np.array([3.0, 4.0])) - 5.0) < 1e-6
+
+    circ_sdf = psdf.circle_sdf(_vec(0, 0), 2.0)
+    sdf = circ_sdf(pts.T)
+    assert np.all(np.abs(sdf - [2.0, 1.0, -3.0]) < 1e-6), sdf
+
+
+def test_sample_grid():
+    """Test chunked lattice sampling matches full grid evaluation."""
+    circ_sdf = psdf.circle_sdf(_vec(0.5, 0), 1.0)
+    bounds, shape = [(-2, 2), (-1, 1)], (41, 21)
+    dist = psdf.sample_grid(circ_sdf, bounds, shape, chunk_size=100)
+    assert dist.shape == shape
+
+    x, y = np.meshgrid(np.linspace(-2, 2, 41), np.linspace(-1, 1, 21),
+                       indexing='ij')
+    dist_ = 1.0 - np.hypot(x - 0.5, y)
+    assert np.all(np.abs(dist - dist_) < 1e-10)
+
+    # 3D
+    sph_sdf = psdf.point_sdf(_vec(0, 0, 0))
+    dist = psdf.sample_grid(sph_sdf, [(-1, 1)] * 3, (5, 5, 5), chunk_size=7)
+    assert np.abs(dist[2, 2, 2]) < 1e-10
+    assert np.abs(dist[0, 0, 0] - np.sqrt(3)) < 1e-10
@@ -0,0 +1,198 @@
+# Server route and socket event tests
+
+import os
+import io
+import sys
+import base64
+import numpy as np
+import cv2
+import eventlet
+path = os.path
+
+# Server modules are flat scripts, imported as app.py does
+SERVER_DIR = path.join(path.dirname(path.abspath(__file__)), '..', 'egn',
+                       'server')
+sys.path.insert(0, SERVER_DIR)
+import app  # noqa: E402
+import history  # noqa: E402
+import imgcache  # noqa: E402
+
+
+def _jpg(width:int=320, height:int=240, value:int=0) -> bytes:
+    image = np.full((height, width, 3), value, dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def _reset():
+    """Fresh server state, the handlers read the module globals."""
+    app.HISTORY = history.History()
+    app.IMAGE_CACHE = imgcache.ImageCache()
+    app.LAST_IMAGE_KEY = None
+    app.PROFILES.clear()
+
+
+def test_image_file():
+    """Test raw, multipart and base64 json posts store the same image."""
+    _reset()
+    client = app.app.test_client()
+    data = _jpg(64, 48)
+    key = imgcache.digest(data)
+    for kwargs in (
+            dict(data=data,
+                 headers={'Content-Type': 'application/octet-stream'}),
+            dict(data={'file': (io.BytesIO(data), 'img.jpg')},
+                 content_type='multipart/form-data'),
+            dict(json={'message': base64.b64encode(data).decode()})):
+        app.LAST_IMAGE_KEY = None
+        assert client.post('/image_file', **kwargs).status_code == 302
+        entry = app.HISTORY.last('image', 1)[0]
+        assert entry['key'] == key and entry['data'] == data
+        assert entry['shape'] == (48, 64) and entry['mime'] == 'image/jpeg'
+    assert app.HISTORY.count('image') == 3 and len(app.IMAGE_CACHE) == 1
+
+
+def test_image_event():
+    """Test socket image frame is processed at the client's width."""
+    _reset()
+    client = app.socketio.test_client(app.app)
+    client.emit('viewport', {'width': 300, 'quality': 50})
+    client.get_received()
+    uri = 'data:image/jpeg;base64,' + base64.b64encode(
+        _jpg(800, 600)).decode()
+    client.emit('image', uri)
+    received = []
+    with eventlet.Timeout(5.0):
+        while not received:
+            eventlet.sleep(0.01)
+            received = client.get_received()
+    assert received[0]['name'] == 'processed_image'
+    _, data = received[0]['args'][0].split(',')
+    image = cv2.imdecode(np.frombuffer(base64.b64decode(data), np.uint8),
+                         cv2.IMREAD_GRAYSCALE)
+    assert image.shape == (240, 320)
+    client.disconnect()
+
+
+def test_replay():
+    """Test new clients get recent history, from server not cookies."""
+    _reset()
+    http = app.app.test_client()
+    for i in range(12):
+        http.post('/text_file', json={'message': f'line {i}\nend'})
+    http.post('/image_file', data=_jpg(),
+              headers={'Content-Type': 'application/octet-stream'})
+    assert http.get('/').headers.get('Set-Cookie') is None
+
+    client = app.socketio.test_client(app.app)
+    received = client.get_received()
+    texts = [r['args'][0] for r in received if r['name'] == 'stream_text']
+    images = [r['args'][0] for r in received if r['name'] == 'stream_image']
+    assert texts == [f'line {i}<br>end' for i in range(2, 12)]
+    assert len(images) == 1 and images[0]['url'].startswith('/frame/')
+    client.disconnect()
+
+
+def test_repost():
+    """Test repost of current image is ignored, older image not stored twice.
+    """
+    _reset()
+    client = app.app.test_client()
+    headers = {'Content-Type': 'application/octet-stream'}
+    a, b = _jpg(value=0), _jpg(value=255)
+    for data in (a, a, b, a):
+        client.post('/image_file', data=data, headers=headers)
+    keys = [e['key'] for e in app.HISTORY.last('image')]
+    assert keys == [imgcache.digest(x) for x in (a, b, a)]
+    assert len(app.IMAGE_CACHE) == 2
+
+
+def test_profiles():
+    """Test viewport negotiation, and largest profile over clients."""
+    _reset()
+    http = app.app.test_client()
+    assert http.get('/profiles').get_json() == {'clients': 0, 'width': 640,
+                                                'quality': 90}
+    clients = [app.socketio.test_client(app.app) for _ in range(2)]
+    for client, viewport in zip(clients, (
+            {'width': 1000, 'downlink': 0.1}, {'width': 300})):
+        client.get_received()
+        client.emit('viewport', viewport)
+        received = client.get_received()
+        assert received[0]['name'] == 'profile'
+    assert received[0]['args'][0] == {'width': 320, 'quality': 90}
+    assert http.get('/profiles').get_json() == {'clients': 2, 'width': 1280,
+                                                'quality': 90}
+    for client in clients:
+        client.disconnect()
+    assert app.PROFILES == {}
+
+
+def test_metrics():
+    """Test /metrics exposes route latency and server gauges."""
+    _reset()
+    client = app.app.test_client()
+    client.get('/status')
+    r = client.get('/metrics')
+    assert r.status_code == 200 and r.mimetype == 'text/plain'
+    text = r.get_data(as_text=True)
+    assert ('egn_http_request_seconds_count{route="/status",method="GET",'
+            'status="200"}') in text
+    assert 'egn_image_cache_entries 0' in text
+
+    # State changes are POST only
+    for action in ('start', 'stop', 'clear'):
+        assert client.get(f'/profile/{action}').status_code == 405
+    assert not app.PROFILER.running
+    assert client.get('/profile/stacks').status_code == 200
+    assert client.post('/profile/start').get_json() == {'running': True}
+    client.get('/status')
+    r = client.post('/profile/stop')
+    assert r.status_code == 200 and not app.PROFILER.running
+    assert client.get('/profile/missing').status_code == 404
+
+
+def test_keyframe_wo_delta():
+    """Test keyframe request is ignored when not in delta mode."""
+    _reset()
+    assert app.DELTA is None
+    client = app.socketio.test_client(app.app)
+    client.get_received()
+    client.emit('keyframe')
+    assert client.get_received() == []
+    client.disconnect()
+
+
+def test_frame_variants():
+    """Test /frame serves source and bucketed width/quality variants."""
+    _reset()
+    client = app.app.test_client()
+    data = _jpg(800, 600)
+    client.post('/image_file', data=data,
+                headers={'Content-Type': 'application/octet-stream'})
+    key = imgcache.digest(data)
+
+    r = client.get(f'/frame/{key}')
+    assert r.status_code == 200 and r.data == data
+    assert r.headers['ETag'] == f'"{key}"'
+    assert client.get(f'/frame/{key}',
+                      headers={'If-None-Match': f'"{key}"'}).status_code == 304
+    assert client.get('/frame/missing').status_code == 404
+
+    # Arbitrary w and q snap to one variant, w/ server side bounds
+    n_entries = len(app.IMAGE_CACHE)
+    etags = set()
+    for w, q in [(300, 500), (301, 95), (320, 99)]:
+        r = client.get(f'/frame/{key}?w={w}&q={q}')
+        assert r.status_code == 200 and r.mimetype == 'image/jpeg'
+        etags.add(r.headers['ETag'])
+    assert etags == {f'"{key}.320.95"'}
+    assert len(app.IMAGE_CACHE) == n_entries + 1
+    image = cv2.imdecode(np.frombuffer(r.data, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape[:2] == (240, 320)
+
+    # Variant key w/ query is served as is, not a 500
+    r = client.get(f'/frame/{key}.320.95?w=100')
+    assert r.status_code == 200 and r.headers['ETag'] == f'"{key}.320.95"'
+    # No variant if image is narrower than the width bucket
+    r = client.get(f'/frame/{key}?w=1000')
+    assert r.headers['ETag'] == f'"{key}"'